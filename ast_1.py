@@ -4,11 +4,15 @@ from abc import ABC, abstractmethod
 from interpreter_token import Token
 
 class Expr(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor):
         pass
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
@@ -17,10 +21,12 @@ class Literal(Expr):
 
 # Represents 'true' or 'false'
 class BooleanLiteral(Literal):
-    pass
+    __slots__ = ()
 
 # Represents 'nil'
 class NilLiteral(Literal):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(None)
 
@@ -29,20 +35,22 @@ class NilLiteral(Literal):
 
 # Represents number literals (integers and floats)
 class NumberLiteral(Literal):
-    pass
+    __slots__ = ()
 
     def accept(self, visitor):
         return visitor.visit_number_literal_expr(self)
 
 # Represents string literals
 class StringLiteral(Literal):
-    pass
+    __slots__ = ()
 
     def accept(self, visitor):
         return visitor.visit_string_literal_expr(self)
 
 # Represents an expression grouped in parentheses
 class Grouping(Expr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
 
@@ -51,6 +59,8 @@ class Grouping(Expr):
 
 # Represents a unary operation (e.g., -value, !condition)
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+
     def __init__(self, operator: Token, right: Expr):
         self.operator = operator
         self.right = right
@@ -60,6 +70,8 @@ class Unary(Expr):
 
 # Represents a binary operation (e.g., a + b, a - b)
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
@@ -68,6 +80,195 @@ class Binary(Expr):
     def accept(self, visitor):
         return visitor.visit_binary_expr(self)
 
+def _immutable(self, *args):
+    raise AttributeError(f"{type(self).__name__} is frozen")
+
+def _restore(self, state):
+    # Unpickling and copying set attributes directly instead of through __setattr__.
+    if isinstance(state, tuple):
+        state = {**(state[0] or {}), **state[1]}
+    for name, value in state.items():
+        object.__setattr__(self, name, value)
+
+# Frozen variant of each node class (and of Token), swapped in by freeze().
+_FROZEN = {}
+for _cls in (Literal, BooleanLiteral, NilLiteral, NumberLiteral, StringLiteral, Grouping, Unary, Binary, Token):
+    _frozen = type("Frozen" + _cls.__name__, (_cls,), {"__slots__": (), "__module__": __name__, "__setattr__": _immutable, "__delattr__": _immutable, "__setstate__": _restore})
+    _FROZEN[_cls] = _frozen
+    globals()[_frozen.__name__] = _frozen
+del _cls, _frozen
+
+def freeze(expr):
+    """Makes the tree under *expr*, operator tokens included, immutable in place.
+
+    Each node is switched to a frozen subclass whose attributes cannot be set
+    or deleted, so isinstance() checks and visitors work unchanged. Token
+    lines are resolved first since they are otherwise cached lazily. Returns
+    *expr*.
+    """
+    frozen = _FROZEN_CLASSES
+    pending = [expr]
+    while pending:
+        node = pending.pop()
+        if type(node) in frozen:
+            continue
+        operator = getattr(node, "operator", None)
+        if operator is not None and type(operator) not in frozen:
+            operator.line
+            operator.__class__ = _FROZEN[type(operator)]
+        for child in ("left", "right", "expression"):
+            child = getattr(node, child, None)
+            if child is not None:
+                pending.append(child)
+        node.__class__ = _FROZEN[type(node)]
+    return expr
+
+def frozen_class(cls):
+    """Returns the frozen subclass of the node (or Token) class *cls*."""
+    return _FROZEN[cls]
+
+def frozen_node(cls, *args):
+    """Returns a frozen *cls* node (or Token) made from *args*."""
+    node = cls(*args)
+    node.__class__ = _FROZEN[cls]
+    return node
+
+def constant_key(value):
+    """Returns a key under which equal constants of the same type pool together.
+
+    repr() keeps falsy values such as 0.0 and -0.0 (which compare equal) apart.
+    """
+    return type(value), value if value else repr(value)
+
+# Shared, immutable literal nodes handed out by every NodeFactory.
+TRUE = frozen_node(BooleanLiteral, True)
+FALSE = frozen_node(BooleanLiteral, False)
+NIL = frozen_node(NilLiteral)
+
+class NodeFactory:
+    """Builds immutable, hash-consed nodes.
+
+    Nodes come out frozen (see freeze()), true/false/nil are the TRUE, FALSE
+    and NIL singletons, and a structurally equal literal, Grouping, Unary or
+    Binary is only ever built once, so equal subtrees are shared. Children
+    passed in must come from the same factory; intern() converts any tree.
+    Operator tokens are shared per kind and carry no position. Nodes stay
+    alive as long as the factory does.
+    """
+
+    def __init__(self):
+        self._nodes = {}
+        self._operators = {}
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def _operator(self, token):
+        operator = self._operators.get(token.type)
+        if operator is None:
+            operator = self._operators.setdefault(token.type, frozen_node(Token, token.type, token.lexeme))
+        return operator
+
+    def _literal(self, cls, value):
+        key = (cls, *constant_key(value))
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes.setdefault(key, frozen_node(cls, value))
+        return node
+
+    def boolean(self, value):
+        return TRUE if value else FALSE
+
+    def nil(self):
+        return NIL
+
+    def number(self, value):
+        return self._literal(NumberLiteral, value)
+
+    def string(self, value):
+        return self._literal(StringLiteral, value)
+
+    def grouping(self, expression):
+        key = (Grouping, expression)
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes.setdefault(key, frozen_node(Grouping, expression))
+        return node
+
+    def unary(self, operator, right):
+        key = (Unary, operator.type, right)
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes.setdefault(key, frozen_node(Unary, self._operator(operator), right))
+        return node
+
+    def binary(self, left, operator, right):
+        key = (Binary, left, operator.type, right)
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes.setdefault(key, frozen_node(Binary, left, self._operator(operator), right))
+        return node
+
+    def literal(self, value):
+        return self._literal(Literal, value)
+
+    def intern(self, expr):
+        """Returns the factory's node for a tree equal to *expr*."""
+        return rebuild(expr, self)
+
+def rebuild(expr, nodes):
+    """Replays the tree under *expr* into the builder *nodes*, bottom-up and without recursion.
+
+    *nodes* provides number(value), string(value), boolean(value), nil(),
+    literal(value), grouping(expression), unary(operator, right) and
+    binary(left, operator, right), each returning what stands for the new
+    node; a NodeFactory is one. Returns what the builder made for *expr*.
+    """
+    results = []
+    pending = [(expr, False)]
+    while pending:
+        node, ready = pending.pop()
+        if isinstance(node, Binary):
+            if ready:
+                right = results.pop()
+                results.append(nodes.binary(results.pop(), node.operator, right))
+            else:
+                pending += ((node, True), (node.right, False), (node.left, False))
+        elif isinstance(node, Unary):
+            if ready:
+                results.append(nodes.unary(node.operator, results.pop()))
+            else:
+                pending += ((node, True), (node.right, False))
+        elif isinstance(node, Grouping):
+            if ready:
+                results.append(nodes.grouping(results.pop()))
+            else:
+                pending += ((node, True), (node.expression, False))
+        elif isinstance(node, BooleanLiteral):
+            results.append(nodes.boolean(node.value))
+        elif isinstance(node, NilLiteral):
+            results.append(nodes.nil())
+        elif isinstance(node, NumberLiteral):
+            results.append(nodes.number(node.value))
+        elif isinstance(node, StringLiteral):
+            results.append(nodes.string(node.value))
+        else:
+            results.append(nodes.literal(node.value))
+    return results.pop()
+
+_FROZEN_CLASSES = frozenset(_FROZEN.values())
+
+class ExprNodes:
+    """The node builder (see rebuild()) that makes plain Expr nodes."""
+    number = NumberLiteral
+    string = StringLiteral
+    boolean = BooleanLiteral
+    nil = NilLiteral
+    literal = Literal
+    grouping = Grouping
+    unary = Unary
+    binary = Binary
+
 class Visitor(ABC):
     @abstractmethod
     def visit_literal_expr(self, expr: Literal):
@@ -0,0 +1,253 @@
+# ast_wire.py
+
+import struct
+
+from ast_1 import BooleanLiteral, Binary, ExprNodes, Grouping, Literal, NilLiteral, NumberLiteral, StringLiteral, Unary, constant_key, frozen_class, frozen_node
+from flat_ast import (BINARY, BOOLEAN, GROUPING, LAST_LITERAL, LITERAL, NIL, NUMBER, OPERATOR_LEXEMES, STRING, UNARY,
+                      FlatTree)
+from interpreter_token import Token, TokenType
+
+# Layout of format version 1:
+#
+#   magic b"LXA", version byte
+#   varint constant count, then each constant as a type byte and its value:
+#     float: 8 bytes little-endian IEEE 754; int: zigzag varint;
+#     str: varint byte length and UTF-8; True, False, None: nothing
+#   varint node count, then one varint tag per node in post-order (children
+#   first, root last). The low 3 bits of a tag are the node kind (flat_ast
+#   numbering); the rest is the constant index of a literal or the operator
+#   code of a Unary or Binary.
+#
+# Operator codes are fixed by the format, not taken from TokenType values,
+# so adding token types does not change what a version 1 stream means.
+MAGIC = b"LXA"
+VERSION = 1
+
+# The operators and their lexemes; an operator's code is its position here
+# (OPERATOR_CODES). script_cache stores operators by the same codes.
+OPERATORS = tuple((type, OPERATOR_LEXEMES[type]) for type in (
+    TokenType.BANG,
+    TokenType.BANG_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+    TokenType.MINUS,
+    TokenType.PLUS,
+    TokenType.STAR,
+    TokenType.DIVIDE,
+))
+# TokenType is an IntEnum, so FlatTree operator values look codes up here too.
+OPERATOR_CODES = {type: code for code, (type, _) in enumerate(OPERATORS)}
+# Immutable, position-free operator tokens shared by every decoded tree.
+_OPERATOR_TOKENS = tuple(frozen_node(Token, type, lexeme) for type, lexeme in OPERATORS)
+
+_FLOAT, _INT, _STR, _TRUE, _FALSE, _NONE = range(6)
+_DOUBLE = struct.Struct("<d")
+
+# Node kind by class, frozen variants included; other subclasses are looked up with isinstance().
+_KINDS = {BooleanLiteral: BOOLEAN, NilLiteral: NIL, NumberLiteral: NUMBER, StringLiteral: STRING,
+          Literal: LITERAL, Grouping: GROUPING, Unary: UNARY, Binary: BINARY}
+_KINDS.update({frozen_class(cls): kind for cls, kind in _KINDS.items()})
+
+def _kind(node):
+    for cls in (Binary, Unary, Grouping, BooleanLiteral, NilLiteral, NumberLiteral, StringLiteral, Literal):
+        if isinstance(node, cls):
+            return _KINDS[cls]
+    raise TypeError(f"Cannot serialize {type(node).__name__}")
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        try:
+            byte = data[pos]
+        except IndexError:
+            raise ValueError("Truncated AST data") from None
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def _write_constants(out, constants):
+    _write_varint(out, len(constants))
+    for value in constants:
+        if value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif value is None:
+            out.append(_NONE)
+        elif type(value) is float:
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(value)
+        elif type(value) is int:
+            out.append(_INT)
+            _write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+        elif type(value) is str:
+            encoded = value.encode("utf-8", "surrogatepass")
+            out.append(_STR)
+            _write_varint(out, len(encoded))
+            out += encoded
+        else:
+            raise TypeError(f"Cannot serialize a {type(value).__name__} literal")
+
+def _write_tags(out, tags):
+    _write_varint(out, len(tags))
+    if max(tags, default=0) < 0x80:
+        out += bytes(tags)
+        return
+    for tag in tags:
+        if tag < 0x80:
+            out.append(tag)
+        else:
+            _write_varint(out, tag)
+
+def dumps(expr):
+    """Serializes an Expr tree or a FlatTree to bytes.
+
+    Operator tokens are reduced to their kind; literal values, including
+    -0.0, NaN and any str, round-trip exactly.
+    """
+    if isinstance(expr, FlatTree):
+        return _dumps_flat(expr)
+    pool = {}
+    constants = []
+    tags = []
+    kinds = _KINDS
+    codes = OPERATOR_CODES
+    # A pre-order walk that takes right children first is the post-order reversed.
+    pending = [expr]
+    while pending:
+        node = pending.pop()
+        kind = kinds.get(type(node))
+        if kind is None:
+            kind = _kind(node)
+        if kind == BINARY:
+            tags.append(BINARY | codes[node.operator.type] << 3)
+            pending.append(node.left)
+            pending.append(node.right)
+        elif kind == UNARY:
+            tags.append(UNARY | codes[node.operator.type] << 3)
+            pending.append(node.right)
+        elif kind == GROUPING:
+            tags.append(GROUPING)
+            pending.append(node.expression)
+        else:
+            value = node.value
+            key = constant_key(value)
+            index = pool.get(key)
+            if index is None:
+                index = pool[key] = len(constants)
+                constants.append(value)
+            tags.append(kind | index << 3)
+    tags.reverse()
+    # Renumber the constants by first use in post-order, as a FlatTree pools
+    # them, so equal trees encode to the same bytes whatever form they are in.
+    order = {}
+    for position, tag in enumerate(tags):
+        kind = tag & 7
+        if kind <= LAST_LITERAL:
+            index = order.get(tag >> 3)
+            if index is None:
+                index = order[tag >> 3] = len(order)
+            tags[position] = kind | index << 3
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write_constants(out, [constants[index] for index in order])
+    _write_tags(out, tags)
+    return bytes(out)
+
+def _dumps_flat(tree):
+    codes = OPERATOR_CODES
+    tags = [kind | (left if kind <= LAST_LITERAL else codes[operator] if kind != GROUPING else 0) << 3
+            for kind, operator, left in zip(tree.kinds[:tree.root + 1], tree.operators, tree.lefts)]
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write_constants(out, tree.constants)
+    _write_tags(out, tags)
+    return bytes(out)
+
+def _read_header(data):
+    if data[:3] != MAGIC:
+        raise ValueError("Not serialized AST data")
+    if len(data) < 4 or data[3] != VERSION:
+        raise ValueError(f"Unsupported AST format version {data[3] if len(data) > 3 else None}")
+    count, pos = _read_varint(data, 4)
+    constants = []
+    for _ in range(count):
+        if pos >= len(data):
+            raise ValueError("Truncated AST data")
+        type = data[pos]
+        pos += 1
+        if type == _FLOAT:
+            if pos + 8 > len(data):
+                raise ValueError("Truncated AST data")
+            constants.append(_DOUBLE.unpack_from(data, pos)[0])
+            pos += 8
+        elif type == _STR:
+            size, pos = _read_varint(data, pos)
+            if pos + size > len(data):
+                raise ValueError("Truncated AST data")
+            constants.append(str(data[pos:pos + size], "utf-8", "surrogatepass"))
+            pos += size
+        elif type == _INT:
+            value, pos = _read_varint(data, pos)
+            constants.append(value >> 1 if not value & 1 else -((value + 1) >> 1))
+        elif type <= _NONE:
+            constants.append((None, None, None, True, False, None)[type])
+        else:
+            raise ValueError(f"Unknown constant type {type}")
+    return constants, pos
+
+def loads(data, nodes=ExprNodes):
+    """Rebuilds a tree serialized by dumps() with the node builder *nodes* (see ast_1.rebuild()).
+
+    Operator tokens are shared, frozen tokens with a kind and lexeme but no
+    position.
+    """
+    constants, pos = _read_header(data)
+    count, pos = _read_varint(data, pos)
+    literals = (nodes.number, nodes.string, nodes.boolean, None, nodes.literal)
+    nil, grouping, unary, binary = nodes.nil, nodes.grouping, nodes.unary, nodes.binary
+    operators = _OPERATOR_TOKENS
+    stack = []
+    push, pop = stack.append, stack.pop
+    try:
+        for _ in range(count):
+            tag = data[pos]
+            pos += 1
+            if tag >= 0x80:
+                tag, pos = _read_varint(data, pos - 1)
+            kind = tag & 7
+            if kind == BINARY:
+                right = pop()
+                push(binary(pop(), operators[tag >> 3], right))
+            elif kind == NIL:
+                push(nil())
+            elif kind <= LAST_LITERAL:
+                push(literals[kind](constants[tag >> 3]))
+            elif kind == UNARY:
+                push(unary(operators[tag >> 3], pop()))
+            elif kind == GROUPING:
+                push(grouping(pop()))
+            else:
+                raise ValueError(f"Unknown node kind {kind}")
+    except IndexError:
+        raise ValueError("Truncated or malformed AST data") from None
+    if len(stack) != 1 or pos != len(data):
+        raise ValueError("Malformed AST data")
+    return stack[0]
+
+def loads_flat(data):
+    """Rebuilds a tree serialized by dumps() as a FlatTree."""
+    tree = FlatTree()
+    tree.root = loads(data, tree)
+    return tree
@@ -0,0 +1,38 @@
+# benchmarks/bench_ast_wire.py
+#
+# Serializes parsed expression trees one by one, as when shipping them to
+# worker processes, with pickle and with the ast_wire format. Pickle is
+# timed both on parsed trees (whose tokens carry their positions and
+# source) and on trees already stripped to position-free tokens.
+# Usage: python benchmarks/bench_ast_wire.py [expressions]
+
+import os
+import pickle
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import ast_wire
+from parser import Parser
+from scanner import Scanner
+from bench_parser import flat_expression
+from bench_scanner import best_of
+
+def main(argv):
+    count = int(argv[0]) if argv else 5_000
+    trees = [Parser(Scanner(flat_expression(8, seed)).scan_tokens()).parse() for seed in range(count)]
+    stripped = [ast_wire.loads(ast_wire.dumps(tree)) for tree in trees]
+    print(f"expressions={count}")
+    cases = (
+        ("pickle", trees, lambda tree: pickle.dumps(tree, pickle.HIGHEST_PROTOCOL), pickle.loads),
+        ("pickle stripped", stripped, lambda tree: pickle.dumps(tree, pickle.HIGHEST_PROTOCOL), pickle.loads),
+        ("ast_wire", trees, ast_wire.dumps, ast_wire.loads),
+    )
+    for name, inputs, dumps, loads in cases:
+        blobs = [dumps(tree) for tree in inputs]
+        encode = best_of(3, lambda: [dumps(tree) for tree in inputs])
+        decode = best_of(3, lambda: [loads(blob) for blob in blobs])
+        size = sum(map(len, blobs))
+        print(f"{name:16} {size / count:8.1f} bytes/expr  dumps {encode / count * 1e6:6.2f} us  loads {decode / count * 1e6:6.2f} us")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,36 @@
+# benchmarks/bench_bulk_scan.py
+#
+# Times the classic scanner on inputs dominated by long string literals,
+# comment blocks and whitespace runs.
+# Usage: python benchmarks/bench_bulk_scan.py [kib ...]
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scanner import Scanner
+
+LICENSE = ("Permission is hereby granted, free of charge, to any person obtaining a copy\n"
+           "of this software and associated documentation files (the \"Software\").\n")
+
+def workloads(kib):
+    size = kib * 1024
+    yield "string", '"' + ("lorem ipsum dolor " * (size // 18)) + '"'
+    yield "escaped string", '"' + ('say \\"hi\\"\\t' * (size // 12)) + '"'
+    yield "block comment", "/*\n" + LICENSE * (size // len(LICENSE)) + "*/ x"
+    yield "line comments", ("// " + LICENSE.splitlines()[0] + "\n") * (size // 80) + "x"
+    yield "whitespace", ("    \t  \n" * (size // 8)) + "x"
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [256, 1024]
+    print(f"{'KiB':>6} {'workload':>16} {'seconds':>9} {'MiB/s':>8}")
+    for kib in sizes:
+        for name, source in workloads(kib):
+            started = time.perf_counter()
+            Scanner(source).scan_tokens()
+            seconds = time.perf_counter() - started
+            print(f"{kib:>6} {name:>16} {seconds:>9.4f} {len(source) / seconds / (1024 * 1024):>8.2f}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
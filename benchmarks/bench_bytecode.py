@@ -0,0 +1,65 @@
+# benchmarks/bench_bytecode.py
+#
+# Evaluates the same expressions over and over with the tree-walking
+# Interpreter, with Interpreter.interpret_flat() on FlatTrees, and as
+# bytecode on the VM, for arithmetic-, comparison- and string-heavy
+# expressions. Also reports the one-off compile cost.
+# Usage: python benchmarks/bench_bytecode.py [expressions] [repeats]
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from bytecode import VM, compile_bytecode
+from flat_ast import FlatTree
+from interpreter import Interpreter
+from parser import Parser
+from scanner import Scanner
+from bench_scanner import best_of
+
+def arithmetic(rng):
+    parts = [str(rng.randint(1, 99))]
+    for _ in range(15):
+        parts += [rng.choice("+-*/"), str(rng.randint(1, 99))]
+    return " ".join(parts)
+
+def comparison(rng):
+    # Four comparisons of sums, joined by == and !=.
+    comparisons = [f"{rng.randint(1, 99)} + {rng.randint(1, 99)} {rng.choice(['<', '<=', '>', '>='])} {rng.randint(1, 99)}"
+                   for _ in range(4)]
+    return " ".join(part for comparison in comparisons for part in (rng.choice(["==", "!="]), comparison))[3:]
+
+def string(rng):
+    words = [f'"{rng.choice(["a", "bc", "def"])}"' for _ in range(8)]
+    return f'{" + ".join(words[:4])} == {" + ".join(words[4:])}'
+
+def repeat(evaluate, inputs, times):
+    for _ in range(times):
+        for item in inputs:
+            evaluate(item)
+
+def main(argv):
+    count = int(argv[0]) if argv else 200
+    times = int(argv[1]) if len(argv) > 1 else 100
+    evaluations = count * times
+    interpreter = Interpreter()
+    vm = VM()
+    print(f"expressions={count} evaluations={evaluations}")
+    for kind in (arithmetic, comparison, string):
+        rng = random.Random(0)
+        trees = [Parser(Scanner(kind(rng)).scan_tokens()).parse() for _ in range(count)]
+        flats = [FlatTree.from_expr(tree) for tree in trees]
+        chunks = [compile_bytecode(tree) for tree in trees]
+        baseline = None
+        for name, evaluate, inputs in (("interpret", interpreter.interpret, trees),
+                                       ("interpret_flat", interpreter.interpret_flat, flats),
+                                       ("bytecode VM", vm.run, chunks)):
+            seconds = best_of(3, lambda: repeat(evaluate, inputs, times))
+            baseline = baseline or seconds
+            print(f"{kind.__name__:10} {name:16} {seconds / evaluations * 1e6:7.2f} us/eval  {baseline / seconds:5.2f}x")
+        seconds = best_of(3, lambda: [compile_bytecode(tree) for tree in trees])
+        print(f"{kind.__name__:10} {'compile':16} {seconds / count * 1e6:7.2f} us/expression")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
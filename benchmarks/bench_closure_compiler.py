@@ -0,0 +1,49 @@
+# benchmarks/bench_closure_compiler.py
+#
+# Evaluates the same parsed expressions over and over with the tree-walking
+# Interpreter, with Interpreter.interpret_flat() on FlatTrees, and as
+# compiled closures, and reports what compiling costs once.
+# Usage: python benchmarks/bench_closure_compiler.py [expressions] [repeats]
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from closure_compiler import compile_closure
+from flat_ast import FlatTree
+from interpreter import Interpreter
+from parser import Parser
+from scanner import Scanner
+from bench_parser import flat_expression
+from bench_scanner import best_of
+
+def repeat(evaluate, inputs, times):
+    for _ in range(times):
+        for item in inputs:
+            try:
+                evaluate(item)
+            except RuntimeError:
+                pass
+
+def main(argv):
+    count = int(argv[0]) if argv else 200
+    times = int(argv[1]) if len(argv) > 1 else 100
+    trees = [Parser(Scanner(flat_expression(16, seed)).scan_tokens()).parse() for seed in range(count)]
+    flats = [FlatTree.from_expr(tree) for tree in trees]
+    compiled = [compile_closure(tree) for tree in trees]
+    nodes = sum(map(len, flats))
+    evaluations = count * times
+    print(f"expressions={count} nodes/expression={nodes / count:.1f} evaluations={evaluations}")
+    interpreter = Interpreter()
+    baseline = None
+    for name, evaluate, inputs in (("interpret", interpreter.interpret, trees),
+                                   ("interpret_flat", interpreter.interpret_flat, flats),
+                                   ("closures", lambda function: function(), compiled)):
+        seconds = best_of(3, lambda: repeat(evaluate, inputs, times))
+        baseline = baseline or seconds
+        print(f"{name:16} {seconds / evaluations * 1e6:7.2f} us/eval  {baseline / seconds:5.2f}x")
+    seconds = best_of(3, lambda: [compile_closure(tree) for tree in trees])
+    print(f"{'compile':16} {seconds / count * 1e6:7.2f} us/expression")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
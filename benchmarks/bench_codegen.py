@@ -0,0 +1,71 @@
+# benchmarks/bench_codegen.py
+#
+# Evaluates the same arithmetic expressions over and over with the
+# tree-walking Interpreter, as compiled closures, as generated Python
+# functions, and, for reference, as the plain Python expressions with no
+# type checks. Also reports the one-off cost of generating and compiling,
+# with and without the code object cache.
+# Usage: python benchmarks/bench_codegen.py [expressions] [repeats]
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import codegen
+from closure_compiler import compile_closure
+from interpreter import Interpreter
+from parser import Parser
+from scanner import Scanner
+from bench_scanner import best_of
+
+def arithmetic_expression(operands, seed):
+    rng = random.Random(seed)
+    parts = [str(rng.randint(1, 99))]
+    for _ in range(operands - 1):
+        parts += [rng.choice("+-*"), str(rng.randint(1, 99))]
+    return " ".join(parts)
+
+def native(source):
+    # Numbers become default arguments so CPython cannot fold the expression away.
+    parts = source.split()
+    names = {index: f"a{index}" for index in range(0, len(parts), 2)}
+    parameters = ", ".join(f"{name}={parts[index]}" for index, name in names.items())
+    body = " ".join(names.get(index, part) for index, part in enumerate(parts))
+    return eval(f"lambda {parameters}: {body}")
+
+def repeat(functions, times):
+    for _ in range(times):
+        for function in functions:
+            function()
+
+def main(argv):
+    count = int(argv[0]) if argv else 200
+    times = int(argv[1]) if len(argv) > 1 else 100
+    sources = [arithmetic_expression(16, seed) for seed in range(count)]
+    trees = [Parser(Scanner(source).scan_tokens()).parse() for source in sources]
+    interpreter = Interpreter()
+    evaluations = count * times
+    print(f"expressions={count} evaluations={evaluations}")
+    cases = (
+        ("interpret", [lambda tree=tree: interpreter.interpret(tree) for tree in trees]),
+        ("closures", [compile_closure(tree) for tree in trees]),
+        ("codegen", [codegen.compile_python(tree) for tree in trees]),
+        ("native Python", [native(source) for source in sources]),
+    )
+    baseline = None
+    for name, functions in cases:
+        seconds = best_of(3, lambda: repeat(functions, times))
+        baseline = baseline or seconds
+        print(f"{name:16} {seconds / evaluations * 1e6:7.2f} us/eval  {baseline / seconds:5.2f}x")
+
+    def compile_uncached():
+        codegen.code_for.cache_clear()
+        for tree in trees:
+            codegen.compile_python(tree)
+    uncached = best_of(3, compile_uncached)
+    cached = best_of(3, lambda: [codegen.compile_python(tree) for tree in trees])
+    print(f"{'compile':16} {uncached / count * 1e6:7.1f} us/expression, {cached / count * 1e6:.1f} us with cached code")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+# benchmarks/bench_constant_folding.py
+#
+# Evaluates the same sources over and over through a Pipeline backed by a
+# ParseCache, with and without constant folding of the cached trees, and
+# reports what folding costs once per tree. Each source pairs a
+# literal-only subtree with a division by zero, which folding must leave
+# in place, so every evaluation raises.
+# Usage: python benchmarks/bench_constant_folding.py [expressions] [repeats]
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from optimizer import fold_constants
+from parse_cache import ParseCache
+from parser import Parser
+from pipeline import Pipeline
+from scanner import Scanner
+from bench_parser import flat_expression
+from bench_scanner import best_of
+
+def repeat(pipeline, sources, times):
+    for _ in range(times):
+        for source in sources:
+            try:
+                pipeline.evaluate(source)
+            except RuntimeError:
+                pass
+
+def main(argv):
+    count = int(argv[0]) if argv else 200
+    times = int(argv[1]) if len(argv) > 1 else 100
+    sources = [f"({flat_expression(16, seed)}) + (1 / 0)" for seed in range(count)]
+    evaluations = count * times
+    print(f"expressions={count} evaluations={evaluations}")
+    baseline = None
+    for name, optimize in (("unfolded", False), ("folded", True)):
+        pipeline = Pipeline(cache=ParseCache(optimize=optimize))
+        repeat(pipeline, sources, 1)  # Fill the cache
+        seconds = best_of(3, lambda: repeat(pipeline, sources, times))
+        baseline = baseline or seconds
+        print(f"{name:10} {seconds / evaluations * 1e6:7.2f} us/eval  {baseline / seconds:5.2f}x")
+    trees = [Parser(Scanner(source).scan_tokens()).parse() for source in sources]
+    seconds = best_of(3, lambda: [fold_constants(tree) for tree in trees])
+    print(f"{'fold':10} {seconds / count * 1e6:7.2f} us/expression")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
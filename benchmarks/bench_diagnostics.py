@@ -0,0 +1,72 @@
+# benchmarks/bench_diagnostics.py
+#
+# Validates a batch of generated scripts, each with a few stray characters:
+# with the default scanner, which stops at the first error; with it again,
+# re-scanning from the line after each error until the end is reached; and
+# with errors="collect", which reports every error in one pass. Resuming
+# after the reported line skips any further errors on that line.
+# Usage: python benchmarks/bench_diagnostics.py [scripts] [lines]
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scanner import Scanner
+from bench_scanner import best_of, generate_source
+
+def make_batch(scripts, lines):
+    rng = random.Random(2)
+    batch = []
+    for seed in range(scripts):
+        source = list(generate_source(lines, seed))
+        for _ in range(rng.randint(0, 3)):
+            source.insert(rng.randrange(len(source)), "@")
+        batch.append("".join(source))
+    return batch
+
+def first_errors(batch):
+    found = 0
+    for source in batch:
+        try:
+            Scanner(source).scan_buffer()
+        except Exception:
+            found += 1
+    return found
+
+def rescanned_errors(batch):
+    found = 0
+    for source in batch:
+        while True:
+            try:
+                Scanner(source).scan_buffer()
+                break
+            except Exception as error:
+                found += 1
+                # Resume scanning after the reported line.
+                line = int(str(error).split("line ")[1].split(":")[0])
+                source = source.split("\n", line)[-1] if source.count("\n") >= line else ""
+    return found
+
+def all_errors(batch):
+    found = 0
+    for source in batch:
+        scanner = Scanner(source, errors="collect")
+        scanner.scan_buffer()
+        found += len(scanner.diagnostics)
+    return found
+
+def main(argv):
+    scripts = int(argv[0]) if argv else 500
+    lines = int(argv[1]) if len(argv) > 1 else 40
+    batch = make_batch(scripts, lines)
+    print(f"scripts={scripts} lines={lines}")
+    cases = (("raise (first error)", first_errors), ("raise (re-scan each)", rescanned_errors),
+             ("collect (all errors)", all_errors))
+    for name, func in cases:
+        found = func(batch)
+        seconds = best_of(3, lambda: func(batch))
+        print(f"{name:22} errors={found:5}  {seconds * 1000:8.1f} ms  {scripts / seconds:9.0f} scripts/s")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
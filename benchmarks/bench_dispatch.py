@@ -0,0 +1,89 @@
+# benchmarks/bench_dispatch.py
+#
+# Times binary operator evaluation on a mix of operator and operand types:
+# the former if/elif chain over the operator with isinstance() checks
+# (reproduced below), against Interpreter._binary()'s handler table keyed
+# on the operator and operand types.
+# Usage: python benchmarks/bench_dispatch.py [repeats]
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from interpreter import Interpreter
+from interpreter_token import TokenType
+from bench_scanner import best_of
+
+def elif_chain(operator, left, right):
+    if operator is TokenType.PLUS:
+        if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+            return left + right
+        elif isinstance(left, str) and isinstance(right, str):
+            return left + right
+        raise RuntimeError("+")
+    elif operator is TokenType.MINUS:
+        if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+            return left - right
+        raise RuntimeError("-")
+    elif operator is TokenType.STAR:
+        if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+            return left * right
+        raise RuntimeError("*")
+    elif operator is TokenType.DIVIDE:
+        if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+            if right == 0:
+                raise RuntimeError("Division by zero.")
+            return left / right
+        raise RuntimeError("/")
+    elif operator is TokenType.GREATER:
+        if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
+            raise RuntimeError(">")
+        return left > right
+    elif operator is TokenType.GREATER_EQUAL:
+        if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
+            raise RuntimeError(">=")
+        return left >= right
+    elif operator is TokenType.LESS:
+        if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
+            raise RuntimeError("<")
+        return left < right
+    elif operator is TokenType.LESS_EQUAL:
+        if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
+            raise RuntimeError("<=")
+        return left <= right
+    elif operator is TokenType.EQUAL_EQUAL:
+        return right is None if left is None else left == right
+    elif operator is TokenType.BANG_EQUAL:
+        return right is not None if left is None else not left == right
+    return None
+
+OPERANDS = {
+    TokenType.PLUS: [(1, 2), (1.5, 2), ("a", "b")],
+    TokenType.MINUS: [(5, 3), (2.5, 1.0)],
+    TokenType.STAR: [(4, 3), (1.5, 2)],
+    TokenType.DIVIDE: [(10, 4), (1.5, 0.5)],
+    TokenType.GREATER: [(3, 2)],
+    TokenType.GREATER_EQUAL: [(3, 2.5)],
+    TokenType.LESS: [(1, 2)],
+    TokenType.LESS_EQUAL: [(True, 2)],
+    TokenType.EQUAL_EQUAL: [(1, 1), ("a", "b"), (None, None)],
+    TokenType.BANG_EQUAL: [(1, 2), (True, None)],
+}
+
+def run(binary, cases, times):
+    for _ in range(times):
+        for operator, left, right in cases:
+            binary(operator, left, right)
+
+def main(argv):
+    times = int(argv[0]) if argv else 20_000
+    cases = [(operator, left, right) for operator, pairs in OPERANDS.items() for left, right in pairs]
+    calls = len(cases) * times
+    baseline = None
+    for name, binary in (("elif chain", elif_chain), ("handler table", Interpreter()._binary)):
+        seconds = best_of(5, lambda: run(binary, cases, times))
+        baseline = baseline or seconds
+        print(f"{name:14} {seconds / calls * 1e9:6.0f} ns/operation  {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
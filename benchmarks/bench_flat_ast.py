@@ -0,0 +1,51 @@
+# benchmarks/bench_flat_ast.py
+#
+# Compares Expr trees with FlatTree arrays: memory held per node for one
+# long expression, and the time to parse and evaluate many short ones. The
+# long expression is also evaluated flat; as a tree it is too deep for the
+# recursive Interpreter.
+# Usage: python benchmarks/bench_flat_ast.py [operands]
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from interpreter import Interpreter
+from parser import Parser
+from scanner import Scanner
+from bench_node_memory import retained
+from bench_parser import flat_expression
+from bench_scanner import best_of
+
+def evaluate_short(sources, flat):
+    interpreter = Interpreter()
+    evaluate = interpreter.interpret_flat if flat else interpreter.interpret
+    for tokens in sources:
+        parser = Parser(tokens, "iterative")
+        try:
+            evaluate(parser.parse_flat() if flat else parser.parse())
+        except RuntimeError:
+            pass
+
+def main(argv):
+    operands = int(argv[0]) if argv else 500_000
+    tokens = Scanner(" + ".join(str(n % 97 + 1) for n in range(operands))).scan_tokens()
+    tree, tree_size = retained(lambda: Parser(tokens, "iterative").parse())
+    del tree
+    flat, flat_size = retained(lambda: Parser(tokens, "iterative").parse_flat())
+    nodes = len(flat)
+    print(f"operands={operands} nodes={nodes}")
+    for name, size in (("Expr tree", tree_size), ("FlatTree", flat_size)):
+        print(f"memory   {name:10} {size / 1024:9.0f} KiB  {size / nodes:6.1f} bytes/node")
+    seconds = best_of(3, lambda: Interpreter().interpret_flat(flat))
+    print(f"evaluate FlatTree   {seconds * 1000:8.1f} ms  {seconds / nodes * 1e9:6.0f} ns/node")
+
+    sources = [Scanner(flat_expression(5, seed)).scan_tokens() for seed in range(20_000)]
+    baseline = None
+    for name, flat in (("Expr tree", False), ("FlatTree", True)):
+        seconds = best_of(3, lambda: evaluate_short(sources, flat))
+        baseline = baseline or seconds
+        print(f"short    {name:10} {seconds * 1000:8.1f} ms  {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,44 @@
+# benchmarks/bench_nesting.py
+#
+# Parses deeply nested expressions (parentheses, prefix chains and
+# right-nested sums) with every parser engine at increasing depths. The
+# recursive engines stop at the interpreter's recursion limit; the
+# iterative engine keeps going.
+# Usage: python benchmarks/bench_nesting.py [max_depth]
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from parser import Parser
+from scanner import Scanner
+
+SHAPES = {
+    "parens": lambda depth: "(" * depth + "1" + ")" * depth,
+    "bangs": lambda depth: "!" * depth + "true",
+    "sums": lambda depth: "(1 + " * depth + "1" + ")" * depth,
+}
+
+def parse_time(tokens, engine):
+    started = time.perf_counter()
+    try:
+        Parser(tokens, engine).parse()
+    except RecursionError:
+        return "RecursionError"
+    return f"{(time.perf_counter() - started) * 1000:.1f} ms"
+
+def main(argv):
+    max_depth = int(argv[0]) if argv else 1_000_000
+    print(f"recursion limit={sys.getrecursionlimit()}")
+    print(f"{'shape':7} {'depth':>8} " + " ".join(f"{engine:>15}" for engine in Parser.ENGINES))
+    for name, make in SHAPES.items():
+        depth = 10
+        while depth <= max_depth:
+            tokens = Scanner(make(depth), "regex").scan_tokens()
+            times = [parse_time(tokens, engine) for engine in Parser.ENGINES]
+            print(f"{name:7} {depth:8} " + " ".join(f"{result:>15}" for result in times))
+            depth *= 10
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
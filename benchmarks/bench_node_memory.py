@@ -0,0 +1,69 @@
+# benchmarks/bench_node_memory.py
+#
+# Reports the memory held per AST node for a corpus of generated expressions,
+# as plain parser trees and after hash-consing them with a NodeFactory (the
+# factory's own tables included). Token lists are scanned up front, so the
+# operator tokens and literal values the trees share with them are not counted.
+# Usage: python benchmarks/bench_node_memory.py [expressions]
+
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ast_1 import Binary, Grouping, NodeFactory, Unary
+from parser import Parser
+from scanner import Scanner
+from bench_parser import flat_expression
+
+def corpus(count, seed=0):
+    rng = random.Random(seed)
+    sources = []
+    for _ in range(count):
+        source = flat_expression(rng.randint(2, 8), rng.randrange(1_000))
+        if rng.random() < 0.3:
+            source = f"({source}) {rng.choice(['==', '!=', '>'])} ({flat_expression(2, rng.randrange(100))})"
+        sources.append(source)
+    return sources
+
+def count_nodes(expr):
+    count, pending = 0, [expr]
+    while pending:
+        node = pending.pop()
+        count += 1
+        if isinstance(node, Binary):
+            pending += (node.left, node.right)
+        elif isinstance(node, Unary):
+            pending.append(node.right)
+        elif isinstance(node, Grouping):
+            pending.append(node.expression)
+    return count
+
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, size
+
+def main(argv):
+    count = int(argv[0]) if argv else 20_000
+    token_lists = [Scanner(source).scan_tokens() for source in corpus(count)]
+    plain, plain_size = retained(lambda: [Parser(tokens).parse() for tokens in token_lists])
+    nodes = sum(count_nodes(tree) for tree in plain)
+    del plain
+    factory = NodeFactory()
+    def build():
+        return [factory.intern(Parser(tokens).parse()) for tokens in token_lists]
+    (shared, factory), shared_size = retained(lambda: (build(), factory))
+    print(f"expressions={count} nodes={nodes} distinct nodes={len(factory)}")
+    for name, size in (("plain trees", plain_size), ("hash-consed", shared_size)):
+        print(f"{name:12} {size / 1024:9.0f} KiB  {size / nodes:6.1f} bytes/node")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
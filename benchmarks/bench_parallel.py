@@ -0,0 +1,30 @@
+# benchmarks/bench_parallel.py
+#
+# Reports Scanner.scan_parallel() speedup over an in-process scan_buffer()
+# for several worker counts. Pools are started before timing.
+# Usage: python benchmarks/bench_parallel.py [lines] [workers ...]
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scanner import Scanner
+from bench_scanner import generate_source, best_of
+
+def main(argv):
+    lines = int(argv[0]) if argv else 200_000
+    counts = [int(arg) for arg in argv[1:]] or sorted({1, 2, 4, os.cpu_count() or 1})
+    source = generate_source(lines)
+    print(f"lines={lines} MiB={len(source) / (1024 * 1024):.2f} cores={os.cpu_count()}")
+    serial = best_of(3, lambda: Scanner(source).scan_buffer())
+    print(f"{'workers':>8} {'seconds':>8} {'speedup':>8}")
+    print(f"{'serial':>8} {serial:>8.3f} {1:>7.2f}x")
+    for workers in counts:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(abs, range(workers)))  # Start the workers
+            seconds = best_of(3, lambda: Scanner(source).scan_parallel(workers, executor=pool, min_chunk_size=1))
+        print(f"{workers:>8} {seconds:>8.3f} {serial / seconds:>7.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,46 @@
+# benchmarks/bench_parse_cache.py
+#
+# Evaluates a workload that repeats a few thousand distinct expressions,
+# parsing every time versus taking trees from a ParseCache (warm, and with a
+# cache too small to hold the working set).
+# Usage: python benchmarks/bench_parse_cache.py [count] [distinct]
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from parse_cache import ParseCache
+from pipeline import Pipeline
+from bench_parser import flat_expression
+from bench_scanner import best_of
+
+def main(argv):
+    count = int(argv[0]) if argv else 100_000
+    distinct = int(argv[1]) if len(argv) > 1 else 2_000
+    rng = random.Random(0)
+    expressions = [flat_expression(rng.randint(2, 12), seed) for seed in range(distinct)]
+    sources = [rng.choice(expressions) for _ in range(count)]
+    cached = ParseCache(maxsize=distinct)
+    undersized = ParseCache(maxsize=distinct // 2)
+    print(f"expressions={count} distinct={distinct}")
+    baseline = None
+    for name, pipeline in (("no cache", Pipeline()), ("cache", Pipeline(cache=cached)),
+                           ("half-size cache", Pipeline(cache=undersized))):
+        evaluate = pipeline.evaluate
+        def run():
+            for source in sources:
+                try:
+                    evaluate(source)
+                except RuntimeError:
+                    pass
+        seconds = best_of(3, run)
+        baseline = baseline or seconds
+        print(f"{name:16} {seconds / count * 1e6:8.2f} us/expr  {baseline / seconds:5.2f}x")
+    for name, cache in (("cache", cached), ("half-size cache", undersized)):
+        info = cache.info()
+        print(f"{name:16} hit rate {info.hits / (info.hits + info.misses):6.1%}  "
+              f"{info.currsize} entries  {info.bytes / 1024:.0f} KiB")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,53 @@
+# benchmarks/bench_parse_many.py
+#
+# Parses a batch of newline-separated expressions, some of them malformed,
+# with one Scanner/Parser run per line versus one scan and parse_many().
+# Usage: python benchmarks/bench_parse_many.py [expressions]
+
+import io
+import os
+import random
+import sys
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from parser import ParseError, Parser
+from scanner import Scanner
+from bench_parser import flat_expression
+from bench_scanner import best_of
+
+def per_line(source):
+    expressions, errors = [], []
+    # parse() prints every error; keep that out of the timings' output.
+    with redirect_stdout(io.StringIO()):
+        for line in source.split("\n"):
+            try:
+                expressions.append(Parser(Scanner(line).scan_tokens()).parse())
+            except ParseError as error:
+                expressions.append(None)
+                errors.append(error)
+    return expressions, errors
+
+def batch(source):
+    return Parser(Scanner(source).scan_tokens()).parse_many()
+
+def main(argv):
+    count = int(argv[0]) if argv else 50_000
+    rng = random.Random(0)
+    lines = []
+    for seed in range(count):
+        line = flat_expression(rng.randint(1, 8), seed)
+        if rng.random() < 0.05:
+            line += rng.choice([" +", " )", " 1"])
+        lines.append(line)
+    source = "\n".join(lines)
+    assert [error.message for error in per_line(source)[1]] == [error.message for error in batch(source).errors]
+    print(f"expressions={count}")
+    baseline = None
+    for name, func in (("run per line", per_line), ("parse_many", batch)):
+        seconds = best_of(3, lambda: func(source))
+        baseline = baseline or seconds
+        print(f"{name:13} {seconds * 1000:8.1f} ms  {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,41 @@
+# benchmarks/bench_parser.py
+#
+# Parses pre-scanned token lists with the recursive-descent and Pratt parser
+# engines: one long, flat, operator-heavy expression and many short ones.
+# Usage: python benchmarks/bench_parser.py [operands]
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from parser import Parser
+from scanner import Scanner
+from bench_scanner import best_of
+
+OPERATORS = ["+", "-", "*", "/", "<", ">=", "==", "!="]
+
+def flat_expression(operands, seed=0):
+    rng = random.Random(seed)
+    parts = [str(rng.randint(1, 99))]
+    for _ in range(operands - 1):
+        parts.append(rng.choice(OPERATORS))
+        parts.append(rng.choice(["-", "!", ""]) + str(rng.randint(1, 99)))
+    return " ".join(parts)
+
+def main(argv):
+    operands = int(argv[0]) if argv else 20_000
+    cases = {
+        "flat": [Scanner(flat_expression(operands)).scan_tokens()],
+        "short": [Scanner(flat_expression(5, seed)).scan_tokens() for seed in range(operands // 5)],
+    }
+    print(f"operands={operands}")
+    for name, token_lists in cases.items():
+        baseline = None
+        for engine in Parser.ENGINES:
+            seconds = best_of(5, lambda: [Parser(tokens, engine).parse() for tokens in token_lists])
+            baseline = baseline or seconds
+            print(f"{name:6} {engine:10} {seconds * 1000:8.1f} ms  {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,53 @@
+# benchmarks/bench_pipeline.py
+#
+# Measures the per-expression overhead of evaluating many short expressions,
+# building a fresh Scanner/Parser/Interpreter each time versus reusing the
+# calling thread's pooled Pipeline. "setup" times only the construction or
+# reset of the three objects; "evaluate" runs the whole pipeline.
+# Usage: python benchmarks/bench_pipeline.py [count]
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from interpreter import Interpreter
+from parser import Parser
+from pipeline import get_pipeline
+from scanner import Scanner
+from bench_scanner import best_of
+
+EXPRESSIONS = ["1 + 2 * 3", '"a" + "b"', "!(4 >= 2)", "nil == false", "-(10 / 4)"]
+
+def fresh_setup(sources):
+    for source in sources:
+        Scanner(source), Parser([]), Interpreter()
+
+def pooled_setup(sources):
+    pipeline = get_pipeline()
+    scanner, parser = pipeline.scanner, pipeline.parser
+    for source in sources:
+        scanner.reset(source), parser.reset([]), pipeline.interpreter
+
+def fresh(sources):
+    for source in sources:
+        Interpreter().interpret(Parser(Scanner(source).scan_tokens()).parse())
+
+def pooled(sources):
+    evaluate = get_pipeline().evaluate
+    for source in sources:
+        evaluate(source)
+
+def main(argv):
+    count = int(argv[0]) if argv else 100_000
+    sources = (EXPRESSIONS * (count // len(EXPRESSIONS) + 1))[:count]
+    print(f"expressions={count}")
+    for stage, cases in (("setup", (("fresh objects", fresh_setup), ("pooled pipeline", pooled_setup))),
+                         ("evaluate", (("fresh objects", fresh), ("pooled pipeline", pooled)))):
+        baseline = None
+        for name, func in cases:
+            seconds = best_of(3, lambda: func(sources))
+            baseline = baseline or seconds
+            print(f"{stage:9} {name:16} {seconds / count * 1e6:8.2f} us/expr  {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
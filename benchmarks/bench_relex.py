@@ -0,0 +1,43 @@
+# benchmarks/bench_relex.py
+#
+# Simulates typing into a large file: each keystroke is applied with
+# Scanner.relex() and compared against re-scanning the whole file.
+# Usage: python benchmarks/bench_relex.py [lines]
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scanner import Scanner
+from bench_scanner import generate_source
+
+def main(argv):
+    lines = int(argv[0]) if argv else 50_000
+    source = generate_source(lines)
+    rng = random.Random(1)
+    keystrokes = 200
+    # Type at line starts, so the edits never land inside an escape sequence.
+    line_starts = [0] + [index + 1 for index, char in enumerate(source) if char == "\n"]
+    positions = [rng.choice(line_starts) for _ in range(keystrokes)]
+
+    started = time.perf_counter()
+    buffer = Scanner(source).scan_buffer()
+    full = time.perf_counter() - started
+
+    scanner = Scanner(source)
+    started = time.perf_counter()
+    for position in positions:
+        # Type a character, then delete it again, like a correcting keystroke.
+        buffer = scanner.relex(buffer, position, 0, "x")
+        buffer = scanner.relex(buffer, position, 1, "")
+    incremental = (time.perf_counter() - started) / (2 * keystrokes)
+
+    print(f"lines={lines} tokens={len(buffer)}")
+    print(f"full rescan        {full * 1000:9.2f} ms")
+    print(f"relex per edit     {incremental * 1000:9.2f} ms")
+    print(f"speedup            {full / incremental:9.1f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,49 @@
+# benchmarks/bench_scan_file.py
+#
+# Compares reading + decoding a script file before scanning with scanning
+# the memory-mapped UTF-8 bytes in place.
+# Usage: python benchmarks/bench_scan_file.py [lines ...]
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scanner import Scanner
+from bench_scanner import generate_source
+
+def scan_decoded(path):
+    with open(path, encoding='utf-8') as file:
+        return Scanner(file.read()).scan_buffer()
+
+def scan_mapped(path):
+    return Scanner.from_file(path).scan_buffer()
+
+def measure(func, path):
+    started = time.perf_counter()
+    func(path)
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    func(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [20_000, 100_000]
+    print(f"{'lines':>8} {'MiB':>7} {'mode':>8} {'seconds':>8} {'peak MiB':>9}")
+    for lines in sizes:
+        with tempfile.NamedTemporaryFile('w', suffix='.lox', delete=False, encoding='utf-8') as file:
+            file.write(generate_source(lines))
+        try:
+            mib = os.path.getsize(file.name) / (1024 * 1024)
+            for mode, func in (("decoded", scan_decoded), ("mmap", scan_mapped)):
+                seconds, peak = measure(func, file.name)
+                print(f"{lines:>8} {mib:>7.2f} {mode:>8} {seconds:>8.3f} {peak / (1024 * 1024):>9.2f}")
+        finally:
+            os.unlink(file.name)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
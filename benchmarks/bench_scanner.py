@@ -0,0 +1,55 @@
+# benchmarks/bench_scanner.py
+#
+# Compares scanner engines on large generated sources.
+# Usage: python benchmarks/bench_scanner.py [lines ...]
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scanner import Scanner
+
+STATEMENTS = [
+    'var total_{n} = (count_{n} + {i}) * {f} / 2.5;',
+    'if (total_{n} >= {i} and !done) print "value: \\"{n}\\"";',
+    '// running comment number {n} with some words in it',
+    'while (x_{n} != nil) {{ x_{n} = x_{n} - 1; }}',
+    '/* block comment {n}\n   spanning two lines */ result = a <= b == true;',
+    'print "a moderately long string literal used for line {n}";',
+]
+
+def generate_source(lines, seed=0):
+    """Builds a deterministic pseudo-Lox program with the given number of lines."""
+    rng = random.Random(seed)
+    out = []
+    for n in range(lines):
+        template = rng.choice(STATEMENTS)
+        out.append(template.format(n=n, i=rng.randint(0, 10000), f=rng.random()))
+    return "\n".join(out)
+
+def best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10_000, 100_000]
+    print(f"{'lines':>8} {'MiB':>7} {'engine':>8} {'tokens':>9} {'seconds':>8} {'MiB/s':>7} {'speedup':>8}")
+    for lines in sizes:
+        source = generate_source(lines)
+        mib = len(source) / (1024 * 1024)
+        baseline = None
+        for engine in Scanner.ENGINES:
+            count = len(Scanner(source, engine=engine).scan_tokens())
+            seconds = best_of(3, lambda: Scanner(source, engine=engine).scan_tokens())
+            baseline = baseline or seconds
+            print(f"{lines:>8} {mib:>7.2f} {engine:>8} {count:>9} {seconds:>8.3f} "
+                  f"{mib / seconds:>7.2f} {baseline / seconds:>7.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
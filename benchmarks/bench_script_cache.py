@@ -0,0 +1,44 @@
+# benchmarks/bench_script_cache.py
+#
+# Loads a generated script of one expression per line without the cache
+# (scan and parse every time), with a cold cache (parse and write the cache
+# file) and with a warm one, next to the time it takes just to read the
+# cache file.
+# Usage: python benchmarks/bench_script_cache.py [lines]
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import script_cache
+from bench_parser import flat_expression
+from bench_scanner import best_of
+
+def read(path):
+    with open(path, "rb") as file:
+        file.read()
+
+def main(argv):
+    lines = int(argv[0]) if argv else 10_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "script.lox")
+        with open(path, "w") as file:
+            file.write("\n".join(flat_expression(8, seed) for seed in range(lines)))
+        cached = script_cache.cache_path(path)
+
+        def cold():
+            if os.path.exists(cached):
+                os.remove(cached)
+            script_cache.load_script(path)
+
+        uncached = best_of(3, lambda: script_cache.load_script(path, use_cache=False))
+        written = best_of(3, cold)
+        warm = best_of(5, lambda: script_cache.load_script(path))
+        raw = best_of(5, lambda: read(cached))
+        print(f"lines={lines} source={os.path.getsize(path)} bytes cache={os.path.getsize(cached)} bytes")
+        for name, seconds in [("no cache", uncached), ("cold cache", written), ("warm cache", warm), ("read cache file", raw)]:
+            print(f"{name:16} {seconds * 1000:8.1f} ms  {uncached / seconds:6.1f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,54 @@
+# benchmarks/bench_token_sets.py
+#
+# Times the token-class membership test the parser makes at every operator
+# position: the old varargs _match() loop, a literal list, a frozenset over
+# TokenType, and an integer bitmask over the kind values.
+# Usage: python benchmarks/bench_token_sets.py [tokens]
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from interpreter_token import TokenType
+from parser import Parser
+from scanner import Scanner
+from bench_parser import flat_expression
+from bench_scanner import best_of
+
+COMPARISONS = (TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL)
+COMPARISON_SET = frozenset(COMPARISONS)
+COMPARISON_MASK = sum(1 << kind for kind in COMPARISONS)
+
+def varargs(parser, count):
+    for parser.current in range(count):
+        parser._match(*COMPARISONS)
+
+def literal_list(parser, count):
+    tokens = parser.tokens
+    for index in range(count):
+        tokens[index].type in [TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL]
+
+def frozen_set(parser, count):
+    tokens = parser.tokens
+    for index in range(count):
+        tokens[index].type in COMPARISON_SET
+
+def bitmask(parser, count):
+    tokens = parser.tokens
+    for index in range(count):
+        COMPARISON_MASK >> tokens[index].type & 1
+
+def main(argv):
+    operands = int(argv[0]) if argv else 100_000
+    tokens = Scanner(flat_expression(operands)).scan_tokens()
+    count = len(tokens) - 1
+    print(f"tokens={count}")
+    baseline = None
+    for name, check in [("varargs", varargs), ("list", literal_list), ("frozenset", frozen_set), ("bitmask", bitmask)]:
+        parser = Parser(tokens)
+        seconds = best_of(5, lambda: check(parser, count))
+        baseline = baseline or seconds
+        print(f"{name:10} {seconds * 1000:8.1f} ms  {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,40 @@
+# benchmarks/bench_token_stream.py
+#
+# Parses one large generated expression into a FlatTree from a file-like
+# source, scanning into a token list first versus streaming tokens from
+# Scanner.iter_tokens() through the parser's TokenStream window. Reports
+# time and peak traced memory.
+# Usage: python benchmarks/bench_token_stream.py [operands]
+
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from parser import Parser
+from scanner import Scanner
+from bench_parser import flat_expression
+from bench_scanner import best_of
+
+def listed(source):
+    return Parser(Scanner(io.StringIO(source)).scan_tokens(), "iterative").parse_flat()
+
+def streamed(source):
+    return Parser(Scanner(io.StringIO(source)).iter_tokens(), "iterative").parse_flat()
+
+def main(argv):
+    operands = int(argv[0]) if argv else 200_000
+    source = flat_expression(operands)
+    print(f"operands={operands} source={len(source) / 1e6:.1f} MB")
+    for name, func in (("token list", listed), ("token stream", streamed)):
+        seconds = best_of(3, lambda: func(source))
+        # Traced separately: tracing slows allocation down several times over.
+        tracemalloc.start()
+        tree = func(source)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:13} {seconds * 1000:8.1f} ms  peak {peak / 2**20:7.1f} MiB  ({len(tree)} nodes)")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
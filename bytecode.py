@@ -0,0 +1,218 @@
+# bytecode.py
+
+from ast_1 import constant_key, rebuild
+from flat_ast import FlatTree
+from interpreter import Interpreter
+from interpreter_token import TokenType
+
+# Instructions are two bytes, an opcode and an argument, as in CPython's
+# wordcode. Only CONSTANT, UNARY and BINARY use their argument; an argument
+# over 255 is spread over EXTENDED_ARG prefixes carrying its high bytes.
+OPCODES = (
+    "CONSTANT",       # push constants[arg]
+    "ADD",            # pop b, pop a, push a + b
+    "SUBTRACT",
+    "MULTIPLY",
+    "DIVIDE",
+    "GREATER",
+    "GREATER_EQUAL",
+    "LESS",
+    "LESS_EQUAL",
+    "EQUAL",
+    "NOT_EQUAL",
+    "NEGATE",         # pop a, push -a
+    "NOT",            # pop a, push not truthy(a)
+    "UNARY",          # other unary operator: pop a, push unary(TokenType(arg), a)
+    "BINARY",         # other binary operator: pop b, pop a, push binary(TokenType(arg), a, b)
+    "EXTENDED_ARG",
+)
+(CONSTANT, ADD, SUBTRACT, MULTIPLY, DIVIDE, GREATER, GREATER_EQUAL, LESS, LESS_EQUAL,
+ EQUAL, NOT_EQUAL, NEGATE, NOT, UNARY, BINARY, EXTENDED_ARG) = range(len(OPCODES))
+
+_BINARY_OPCODES = {
+    TokenType.PLUS: ADD,
+    TokenType.MINUS: SUBTRACT,
+    TokenType.STAR: MULTIPLY,
+    TokenType.DIVIDE: DIVIDE,
+    TokenType.GREATER: GREATER,
+    TokenType.GREATER_EQUAL: GREATER_EQUAL,
+    TokenType.LESS: LESS,
+    TokenType.LESS_EQUAL: LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: EQUAL,
+    TokenType.BANG_EQUAL: NOT_EQUAL,
+}
+_UNARY_OPCODES = {TokenType.MINUS: NEGATE, TokenType.BANG: NOT}
+# Operator kind of each opcode that has one, for the Interpreter fallbacks.
+_OPERATORS = [None] * len(OPCODES)
+for _type, _opcode in [*_BINARY_OPCODES.items(), *_UNARY_OPCODES.items()]:
+    _OPERATORS[_opcode] = _type
+
+class Chunk:
+    """Compiled bytecode for one expression: the instructions and their constant pool."""
+
+    __slots__ = ("code", "constants")
+
+    def __init__(self, code, constants):
+        self.code = code
+        self.constants = constants
+
+    def __len__(self):
+        return len(self.code) // 2
+
+class _Emitter:
+    """The node builder (see ast_1.rebuild()) that appends instructions.
+
+    rebuild() calls it children first, which is the order a stack machine
+    evaluates in, so each node simply emits its own instruction.
+    """
+
+    def __init__(self):
+        self.code = bytearray()
+        self.constants = []
+        self._constant_indexes = {}
+
+    def _emit(self, opcode, arg=0):
+        if arg > 0xff:
+            # High bytes first, each in its own EXTENDED_ARG.
+            shift = (arg.bit_length() - 1) // 8 * 8
+            while shift:
+                self.code += bytes((EXTENDED_ARG, arg >> shift & 0xff))
+                shift -= 8
+        self.code += bytes((opcode, arg & 0xff))
+
+    def _constant(self, value):
+        key = constant_key(value)
+        index = self._constant_indexes.get(key)
+        if index is None:
+            index = self._constant_indexes[key] = len(self.constants)
+            self.constants.append(value)
+        self._emit(CONSTANT, index)
+
+    number = string = boolean = literal = _constant
+
+    def nil(self):
+        self._constant(None)
+
+    def grouping(self, expression):
+        pass
+
+    def unary(self, operator, right):
+        opcode = _UNARY_OPCODES.get(operator.type)
+        if opcode is None:
+            self._emit(UNARY, operator.type)
+        else:
+            self._emit(opcode)
+
+    def binary(self, left, operator, right):
+        opcode = _BINARY_OPCODES.get(operator.type)
+        if opcode is None:
+            self._emit(BINARY, operator.type)
+        else:
+            self._emit(opcode)
+
+def compile_bytecode(expr):
+    """Compiles an Expr tree (or a FlatTree) to a Chunk, without recursion."""
+    emitter = _Emitter()
+    if isinstance(expr, FlatTree):
+        expr.to_expr(emitter)
+    else:
+        rebuild(expr, emitter)
+    return Chunk(bytes(emitter.code), tuple(emitter.constants))
+
+def disassemble(chunk):
+    """Returns a listing of *chunk*, one instruction per line, as offset, name and argument."""
+    lines = []
+    extended = 0
+    for offset in range(0, len(chunk.code), 2):
+        opcode, arg = chunk.code[offset], chunk.code[offset + 1] | extended
+        name = OPCODES[opcode] if opcode < len(OPCODES) else f"<{opcode}>"
+        if opcode == EXTENDED_ARG:
+            extended = arg << 8
+            lines.append(f"{offset:6} {name:14} {chunk.code[offset + 1]}")
+            continue
+        extended = 0
+        if opcode == CONSTANT:
+            lines.append(f"{offset:6} {name:14} {arg} ({chunk.constants[arg]!r})")
+        elif opcode in (UNARY, BINARY):
+            lines.append(f"{offset:6} {name:14} {arg} ({TokenType(arg).name})")
+        else:
+            lines.append(f"{offset:6} {name}")
+    return "\n".join(lines)
+
+class VM:
+    """A stack machine that runs Chunks.
+
+    Results and RuntimeError messages match Interpreter().interpret() on the
+    compiled tree: operand pairs the inline fast paths do not cover (mixed or
+    wrong types, division by zero) go through the Interpreter's own
+    operator code.
+    """
+
+    def __init__(self):
+        interpreter = Interpreter()
+        self._unary = interpreter._unary
+        self._binary = interpreter._binary
+
+    def run(self, chunk):
+        """Evaluates *chunk* and returns the value of its expression."""
+        constants = chunk.constants
+        unary, binary, operators = self._unary, self._binary, _OPERATORS
+        numbers = (int, float)
+        stack = []
+        push, pop = stack.append, stack.pop
+        extended = 0
+        code = iter(chunk.code)
+        for opcode, arg in zip(code, code):
+            if opcode == CONSTANT:
+                push(constants[arg | extended])
+                extended = 0
+            elif opcode <= LESS_EQUAL:
+                b = pop()
+                a = pop()
+                if a.__class__ in numbers and b.__class__ in numbers:
+                    if opcode == ADD:
+                        push(a + b)
+                    elif opcode == SUBTRACT:
+                        push(a - b)
+                    elif opcode == MULTIPLY:
+                        push(a * b)
+                    elif opcode == DIVIDE and b:
+                        push(a / b)
+                    elif opcode == GREATER:
+                        push(a > b)
+                    elif opcode == GREATER_EQUAL:
+                        push(a >= b)
+                    elif opcode == LESS:
+                        push(a < b)
+                    elif opcode == LESS_EQUAL:
+                        push(a <= b)
+                    else:
+                        push(binary(operators[opcode], a, b))
+                elif opcode == ADD and a.__class__ is str and b.__class__ is str:
+                    push(a + b)
+                else:
+                    push(binary(operators[opcode], a, b))
+            elif opcode == EQUAL:
+                b = pop()
+                a = pop()
+                push(b is None if a is None else a == b)
+            elif opcode == NOT_EQUAL:
+                b = pop()
+                a = pop()
+                push(b is not None if a is None else not a == b)
+            elif opcode == NEGATE:
+                a = pop()
+                push(-a if a.__class__ in numbers else unary(TokenType.MINUS, a))
+            elif opcode == NOT:
+                a = pop()
+                push(a is None or a is False)
+            elif opcode == EXTENDED_ARG:
+                extended = (extended | arg) << 8
+            elif opcode == BINARY:
+                b = pop()
+                push(binary(TokenType(arg | extended), pop(), b))
+                extended = 0
+            else:
+                push(unary(TokenType(arg | extended), pop()))
+                extended = 0
+        return pop()
@@ -0,0 +1,137 @@
+# closure_compiler.py
+
+from operator import ge, gt, le, lt, mul, sub
+
+from ast_1 import rebuild
+from flat_ast import FlatTree
+from interpreter import Interpreter
+from interpreter_token import TokenType
+
+# Interpreter's operator methods cover every case the closures' fast paths
+# do not (mixed or wrong operand types, division by zero, unknown
+# operators), so results and error messages stay the same.
+_interpreter = Interpreter()
+_unary = _interpreter._unary
+_binary = _interpreter._binary
+
+_NUMBERS = frozenset((int, float))
+
+def compile_closure(expr):
+    """Compiles an Expr tree (or a FlatTree) into a function of no arguments that evaluates it.
+
+    Each node becomes a closure with its operator already chosen, so
+    calling the result repeatedly skips visitor dispatch and operator
+    decoding. It returns what Interpreter().interpret(expr) would and
+    raises the same RuntimeErrors. Compiling is iterative, but evaluation
+    nests one call per level, so very deep trees can still exhaust the
+    recursion limit; see Interpreter.interpret_flat() for those.
+    """
+    if isinstance(expr, FlatTree):
+        return expr.to_expr(ClosureNodes)
+    return rebuild(expr, ClosureNodes)
+
+def _constant(value):
+    def evaluate():
+        return value
+    return evaluate
+
+def _arithmetic(type, apply):
+    # Builds the binary node maker for an arithmetic or comparison operator
+    # whose fast path takes two int or float operands.
+    def make(left, right):
+        def evaluate():
+            a = left()
+            b = right()
+            if a.__class__ in _NUMBERS and b.__class__ in _NUMBERS:
+                return apply(a, b)
+            return _binary(type, a, b)
+        return evaluate
+    return make
+
+def _plus(left, right):
+    def evaluate():
+        a = left()
+        b = right()
+        if a.__class__ in _NUMBERS and b.__class__ in _NUMBERS or a.__class__ is str and b.__class__ is str:
+            return a + b
+        return _binary(TokenType.PLUS, a, b)
+    return evaluate
+
+def _divide(left, right):
+    def evaluate():
+        a = left()
+        b = right()
+        if a.__class__ in _NUMBERS and b.__class__ in _NUMBERS and b:
+            return a / b
+        return _binary(TokenType.DIVIDE, a, b)
+    return evaluate
+
+def _equal(left, right):
+    def evaluate():
+        a = left()
+        b = right()
+        return b is None if a is None else a == b
+    return evaluate
+
+def _not_equal(left, right):
+    def evaluate():
+        a = left()
+        b = right()
+        return b is not None if a is None else not a == b
+    return evaluate
+
+_BINARIES = {
+    TokenType.PLUS: _plus,
+    TokenType.MINUS: _arithmetic(TokenType.MINUS, sub),
+    TokenType.STAR: _arithmetic(TokenType.STAR, mul),
+    TokenType.DIVIDE: _divide,
+    TokenType.GREATER: _arithmetic(TokenType.GREATER, gt),
+    TokenType.GREATER_EQUAL: _arithmetic(TokenType.GREATER_EQUAL, ge),
+    TokenType.LESS: _arithmetic(TokenType.LESS, lt),
+    TokenType.LESS_EQUAL: _arithmetic(TokenType.LESS_EQUAL, le),
+    TokenType.EQUAL_EQUAL: _equal,
+    TokenType.BANG_EQUAL: _not_equal,
+}
+
+class ClosureNodes:
+    """The node builder (see ast_1.rebuild()) that makes evaluating closures."""
+
+    number = string = boolean = literal = staticmethod(_constant)
+
+    @staticmethod
+    def nil():
+        return _constant(None)
+
+    @staticmethod
+    def grouping(expression):
+        # A grouping only decides the shape of the tree; its value is its expression's.
+        return expression
+
+    @staticmethod
+    def unary(operator, right):
+        type = operator.type
+        if type is TokenType.MINUS:
+            def evaluate():
+                value = right()
+                if value.__class__ in _NUMBERS:
+                    return -value
+                return _unary(TokenType.MINUS, value)
+        elif type is TokenType.BANG:
+            def evaluate():
+                value = right()
+                return value is None or value is False
+        else:
+            def evaluate():
+                return _unary(type, right())
+        return evaluate
+
+    @staticmethod
+    def binary(left, operator, right):
+        make = _BINARIES.get(operator.type)
+        if make is not None:
+            return make(left, right)
+        type = operator.type
+        def evaluate():
+            a = left()
+            return _binary(type, a, right())
+        return evaluate
@@ -0,0 +1,161 @@
+# codegen.py
+
+import math
+from functools import lru_cache
+
+from ast_1 import rebuild
+from flat_ast import FlatTree
+from interpreter import Interpreter
+from interpreter_token import TokenType
+
+_interpreter = Interpreter()
+
+# Names the generated function gets as default arguments, so it reads them
+# as fast locals. binary() and unary() are Interpreter's operator methods,
+# which handle every case the inline fast paths do not (mixed or wrong
+# operand types, division by zero, unknown operators) with the same
+# results and error messages.
+_DEFAULTS = "N=N, binary=binary, unary=unary, T=TokenType"
+_GLOBALS = {"N": frozenset((int, float)), "binary": _interpreter._binary,
+            "unary": _interpreter._unary, "TokenType": TokenType}
+
+# Binary operators with an inline fast path for two int or float operands.
+_ARITHMETIC = {
+    TokenType.MINUS: "-",
+    TokenType.STAR: "*",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+}
+
+class _Source:
+    """The node builder (see ast_1.rebuild()) that emits one assignment per operator node.
+
+    Each method returns an operand: the text of a Python expression that is
+    a temporary or a constant, and the class of the value if it is known.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+
+    def _constant(self, value):
+        cls = type(value)
+        if cls in (int, str, bool, type(None)) or cls is float and math.isfinite(value):
+            try:
+                text = repr(value)
+            except ValueError:  # An int over sys.get_int_max_str_digits() digits
+                pass
+            else:
+                if text.startswith("-"):
+                    text = f"({text})"
+                return text, cls
+        # Values without an exact literal spelling (NaN, infinities, huge
+        # ints, other types) are passed in by name.
+        name = f"k{len(self.constants)}"
+        self.constants[name] = value
+        return name, cls
+
+    number = string = boolean = literal = _constant
+
+    def nil(self):
+        return "None", type(None)
+
+    def grouping(self, expression):
+        return expression
+
+    def _assign(self, text):
+        name = f"t{len(self.lines)}"
+        self.lines.append(f"    {name} = {text}")
+        return name, None
+
+    # The tests below are decided here for constants, whose class is known;
+    # that also avoids "1.__class__" and "'a' is None" in the source.
+
+    @staticmethod
+    def _is_number(operand):
+        text, cls = operand
+        if cls is None:
+            return f"{text}.__class__ in N"
+        return str(cls is int or cls is float)
+
+    @staticmethod
+    def _is_str(operand):
+        text, cls = operand
+        if cls is None:
+            return f"{text}.__class__ is str"
+        return str(cls is str)
+
+    @staticmethod
+    def _is_none(operand):
+        text, cls = operand
+        if cls is None:
+            return f"{text} is None"
+        return str(cls is type(None))
+
+    def _numbers(self, left, right):
+        checks = [check for check in (self._is_number(left), self._is_number(right)) if check != "True"]
+        return " and ".join(checks) or "True"
+
+    def unary(self, operator, right):
+        value = right[0]
+        if operator.type is TokenType.MINUS:
+            return self._assign(f"-{value} if {self._is_number(right)} else unary(T.MINUS, {value})")
+        if operator.type is TokenType.BANG:
+            cls = right[1]
+            if cls is None:
+                return self._assign(f"{value} is None or {value} is False")
+            return self._assign(f"not {value}" if cls is bool else str(cls is type(None)))
+        return self._assign(f"unary(T.{operator.type.name}, {value})")
+
+    def binary(self, left, operator, right):
+        type = operator.type
+        a, b = left[0], right[0]
+        slow = f"binary(T.{type.name}, {a}, {b})"
+        if type in _ARITHMETIC:
+            return self._assign(f"{a} {_ARITHMETIC[type]} {b} if {self._numbers(left, right)} else {slow}")
+        if type is TokenType.PLUS:
+            strings = f"{self._is_str(left)} and {self._is_str(right)}"
+            return self._assign(f"{a} + {b} if {self._numbers(left, right)} or {strings} else {slow}")
+        if type is TokenType.DIVIDE:
+            return self._assign(f"{a} / {b} if {self._numbers(left, right)} and {b} else {slow}")
+        if type is TokenType.EQUAL_EQUAL:
+            return self._assign(f"{self._is_none(right)} if {self._is_none(left)} else {a} == {b}")
+        if type is TokenType.BANG_EQUAL:
+            return self._assign(f"not {self._is_none(right)} if {self._is_none(left)} else not {a} == {b}")
+        # Operands are evaluated first, as the Interpreter does, even though nothing uses them.
+        return self._assign(slow)
+
+def to_python(expr):
+    """Lowers an Expr tree (or a FlatTree) to the source of a Python function named evaluate.
+
+    Returns the source and a dict of the constants it takes by name. Each
+    operator node is one assignment to a temporary, in evaluation order,
+    so the function has no nesting however deep the tree is.
+    """
+    source = _Source()
+    if isinstance(expr, FlatTree):
+        result = expr.to_expr(source)
+    else:
+        result = rebuild(expr, source)
+    parameters = ", ".join([*(f"{name}={name}" for name in source.constants), _DEFAULTS])
+    lines = [f"def evaluate({parameters}):", *source.lines, f"    return {result[0]}"]
+    return "\n".join(lines) + "\n", source.constants
+
+@lru_cache(maxsize=1024)
+def code_for(source):
+    """Returns the code object for the source made by to_python(), compiling each distinct source once."""
+    return compile(source, "<expression>", "exec")
+
+def compile_python(expr):
+    """Compiles an Expr tree (or a FlatTree) to a Python function of no arguments that evaluates it.
+
+    The result returns what Interpreter().interpret(expr) would and raises
+    the same RuntimeErrors. Code objects are cached by generated source
+    (see code_for()), so structurally equal trees compile once.
+    """
+    source, constants = to_python(expr)
+    namespace = dict(_GLOBALS, **constants)
+    exec(code_for(source), namespace)
+    return namespace["evaluate"]
@@ -0,0 +1,129 @@
+# flat_ast.py
+
+from array import array
+
+from ast_1 import ExprNodes, constant_key, rebuild
+from interpreter_token import TOKEN_TYPES, Token, TokenType
+
+# Node kinds. Literal kinds come first so evaluators can test for them with one comparison.
+NUMBER, STRING, BOOLEAN, NIL, LITERAL, GROUPING, UNARY, BINARY = range(8)
+LAST_LITERAL = LITERAL
+
+# Lexemes of the Unary and Binary operators.
+OPERATOR_LEXEMES = {
+    TokenType.BANG: "!",
+    TokenType.BANG_EQUAL: "!=",
+    TokenType.EQUAL_EQUAL: "==",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+    TokenType.MINUS: "-",
+    TokenType.PLUS: "+",
+    TokenType.STAR: "*",
+    TokenType.DIVIDE: "/",
+}
+
+class FlatTree:
+    """An expression tree stored as parallel arrays instead of Expr objects.
+
+    Node i has a kind (kinds[i]) and, for Unary and Binary nodes, the
+    TokenType value of its operator (operators[i]). lefts[i] holds the
+    left operand of a Binary, the expression of a Grouping, or for literals
+    the index of the value in the constants pool; rights[i] holds the
+    operand of a Unary and the right operand of a Binary. Unused slots are
+    -1 (0 for operators). Equal constants are pooled once.
+
+    The builder methods (number(), binary(), ...) append a node and return
+    its index, so a FlatTree can be filled by Parser.parse_flat() or by
+    ast_1.rebuild(). Children always come before their parent and the root
+    is the last node, so evaluating the nodes in order is a post-order walk.
+    Operator tokens are reduced to their kind; positions are not kept.
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.operators = array('B')
+        self.lefts = array('i')
+        self.rights = array('i')
+        self.constants = []
+        self._constant_indexes = {}
+        self.root = -1
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def _append(self, kind, operator, left, right):
+        self.kinds.append(kind)
+        self.operators.append(operator)
+        self.lefts.append(left)
+        self.rights.append(right)
+        return len(self.kinds) - 1
+
+    def _constant(self, value):
+        key = constant_key(value)
+        index = self._constant_indexes.get(key)
+        if index is None:
+            index = self._constant_indexes[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def number(self, value):
+        return self._append(NUMBER, 0, self._constant(value), -1)
+
+    def string(self, value):
+        return self._append(STRING, 0, self._constant(value), -1)
+
+    def boolean(self, value):
+        return self._append(BOOLEAN, 0, self._constant(value), -1)
+
+    def nil(self):
+        return self._append(NIL, 0, self._constant(None), -1)
+
+    def literal(self, value):
+        return self._append(LITERAL, 0, self._constant(value), -1)
+
+    def grouping(self, expression):
+        return self._append(GROUPING, 0, expression, -1)
+
+    def unary(self, operator, right):
+        return self._append(UNARY, operator.type, -1, right)
+
+    def binary(self, left, operator, right):
+        return self._append(BINARY, operator.type, left, right)
+
+    @classmethod
+    def from_expr(cls, expr):
+        """Returns a FlatTree holding the tree under *expr*."""
+        tree = cls()
+        tree.root = rebuild(expr, tree)
+        return tree
+
+    def to_expr(self, nodes=ExprNodes):
+        """Materializes the tree as Expr nodes made by the builder *nodes*.
+
+        Operator tokens carry only their kind and lexeme, one token per kind.
+        """
+        kinds, operators, lefts, rights, constants = self.kinds, self.operators, self.lefts, self.rights, self.constants
+        literals = (nodes.number, nodes.string, nodes.boolean, None, nodes.literal)
+        tokens = {}
+        built = []
+        for index in range(self.root + 1):
+            kind = kinds[index]
+            if kind == NIL:
+                node = nodes.nil()
+            elif kind <= LAST_LITERAL:
+                node = literals[kind](constants[lefts[index]])
+            elif kind == GROUPING:
+                node = nodes.grouping(built[lefts[index]])
+            else:
+                operator = tokens.get(operators[index])
+                if operator is None:
+                    type = TOKEN_TYPES[operators[index]]
+                    operator = tokens[type] = Token(type, OPERATOR_LEXEMES.get(type, type.name))
+                if kind == UNARY:
+                    node = nodes.unary(operator, built[rights[index]])
+                else:
+                    node = nodes.binary(built[lefts[index]], operator, built[rights[index]])
+            built.append(node)
+        return built[self.root]
@@ -1,12 +1,116 @@
 # interpreter.py
 
+from itertools import product
+from operator import add, ge, gt, le, lt, mul, neg, not_, sub
+
 from ast_1 import Visitor, BooleanLiteral, NilLiteral, NumberLiteral, StringLiteral, Grouping, Unary, Binary
-from interpreter_token import TokenType
+from interpreter_token import TOKEN_TYPES, TokenType
+from flat_ast import BINARY, LAST_LITERAL, UNARY
+
+# Operator semantics as handlers looked up by operator and operand types.
+# bool is a number here, as in Python (true + 1 is 2, -true is -1), and is
+# listed with the number types so its handlers are in the tables up front.
+_NUMBER_TYPES = (int, float, bool)
+_SEEDED_TYPES = (*_NUMBER_TYPES, str, type(None))
+
+def _is_number(cls):
+    # Subclasses (an IntEnum, say) count as what they derive from.
+    return cls in _NUMBER_TYPES or issubclass(cls, (int, float))
+
+def _divide(left, right):
+    if right == 0:
+        raise RuntimeError("Division by zero.")
+    return left / right
+
+def _type_error(message):
+    def fail(left, right):
+        raise RuntimeError(f"{message} Got '{type(left)}' and '{type(right)}'.")
+    return fail
+
+def _equal(left, right):
+    return right is None if left is None else left == right
+
+def _not_equal(left, right):
+    return right is not None if left is None else not left == right
+
+def _no_binary(left, right):
+    return None
+
+# Per operator: the handler for two numbers, and the one for any other operand types.
+_NUMBER_OPERATORS = {
+    TokenType.PLUS: (add, _type_error("Operands must be either both numbers or both strings for '+' operator.")),
+    TokenType.MINUS: (sub, _type_error("Operands must be numbers for '-' operator.")),
+    TokenType.STAR: (mul, _type_error("Operands must be numbers for '*' operator.")),
+    TokenType.DIVIDE: (_divide, _type_error("Operands must be numbers for '/' operator.")),
+    TokenType.GREATER: (gt, _type_error("Operands must be numbers for '>' operator.")),
+    TokenType.GREATER_EQUAL: (ge, _type_error("Operands must be numbers for '>=' operator.")),
+    TokenType.LESS: (lt, _type_error("Operands must be numbers for '<' operator.")),
+    TokenType.LESS_EQUAL: (le, _type_error("Operands must be numbers for '<=' operator.")),
+}
+
+def _resolve_binary(operator, left, right):
+    """Returns the handler for *operator* applied to operands of classes *left* and *right*."""
+    handlers = _NUMBER_OPERATORS.get(operator)
+    if handlers is not None:
+        if _is_number(left) and _is_number(right):
+            return handlers[0]
+        if operator is TokenType.PLUS and issubclass(left, str) and issubclass(right, str):
+            return add
+        return handlers[1]
+    if operator is TokenType.EQUAL_EQUAL:
+        return _equal
+    if operator is TokenType.BANG_EQUAL:
+        return _not_equal
+    return _no_binary
+
+def _negate_error(right):
+    raise RuntimeError("Operand must be a number for '-' operator.")
+
+def _resolve_unary(operator, right):
+    """Returns the handler for *operator* applied to an operand of class *right*."""
+    if operator is TokenType.MINUS:
+        return neg if _is_number(right) else _negate_error
+    if operator is TokenType.BANG:
+        # Only nil and false are falsey.
+        if right is bool:
+            return not_
+        return (lambda value: True) if right is type(None) else (lambda value: False)
+    return lambda value: None
+
+# (operator, left class, right class) -> handler, and (operator, class) ->
+# handler for unary operators. Both start with every pair of the common
+# types and cache whatever else gets resolved.
+_BINARY_HANDLERS = {(operator, left, right): _resolve_binary(operator, left, right)
+                    for operator in (*_NUMBER_OPERATORS, TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL)
+                    for left, right in product(_SEEDED_TYPES, repeat=2)}
+_UNARY_HANDLERS = {(operator, cls): _resolve_unary(operator, cls)
+                   for operator in (TokenType.MINUS, TokenType.BANG) for cls in _SEEDED_TYPES}
 
 class Interpreter(Visitor):
     def interpret(self, expression):
         return self.visit(expression)
 
+    def interpret_flat(self, tree):
+        """Evaluates a FlatTree without building Expr nodes or recursing.
+
+        Nodes are laid out children first, so one pass with a value stack
+        evaluates operands in the same order, with the same errors, as
+        interpret() on the equivalent tree.
+        """
+        constants = tree.constants
+        unary, binary = self._unary, self._binary
+        stack = []
+        push, pop = stack.append, stack.pop
+        for kind, operator, left in zip(tree.kinds[:tree.root + 1], tree.operators, tree.lefts):
+            if kind <= LAST_LITERAL:
+                push(constants[left])
+            elif kind == BINARY:
+                right = pop()
+                push(binary(TOKEN_TYPES[operator], pop(), right))
+            elif kind == UNARY:
+                push(unary(TOKEN_TYPES[operator], pop()))
+        return pop()
+
     def visit(self, expr):
         return expr.accept(self)
 
@@ -29,74 +133,23 @@ class Interpreter(Visitor):
         return self.visit(grouping.expression)
 
     def visit_unary_expr(self, unary: Unary):
-        right = self.visit(unary.right)
-        operator_type = unary.operator.type
-
-        if operator_type is TokenType.MINUS:
-            if isinstance(right, (int, float)):
-                return -right
-            raise RuntimeError("Operand must be a number for '-' operator.")
-        elif operator_type is TokenType.BANG:
-            return not self._is_truthy(right)
-        return None
+        return self._unary(unary.operator.type, self.visit(unary.right))
 
     def visit_binary_expr(self, binary: Binary):
         left = self.visit(binary.left)
         right = self.visit(binary.right)
-        operator = binary.operator.type
-
-        if operator is TokenType.PLUS:
-            if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                return left + right
-            elif isinstance(left, str) and isinstance(right, str):
-                return left + right
-            raise RuntimeError(f"Operands must be either both numbers or both strings for '+' operator. Got '{type(left)}' and '{type(right)}'.")
-        elif operator is TokenType.MINUS:
-            if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                return left - right
-            raise RuntimeError(f"Operands must be numbers for '-' operator. Got '{type(left)}' and '{type(right)}'.")
-        elif operator is TokenType.STAR:
-            if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                return left * right
-            raise RuntimeError(f"Operands must be numbers for '*' operator. Got '{type(left)}' and '{type(right)}'.")
-        elif operator is TokenType.DIVIDE:
-            if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                if right == 0:
-                    raise RuntimeError("Division by zero.")
-                return left / right
-            raise RuntimeError(f"Operands must be numbers for '/' operator. Got '{type(left)}' and '{type(right)}'.")
-        elif operator is TokenType.GREATER:
-            if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
-                raise RuntimeError(f"Operands must be numbers for '>' operator. Got '{type(left)}' and '{type(right)}'.")
-            return left > right
-        elif operator is TokenType.GREATER_EQUAL:
-            if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
-                raise RuntimeError(f"Operands must be numbers for '>=' operator. Got '{type(left)}' and '{type(right)}'.")
-            return left >= right
-        elif operator is TokenType.LESS:
-            if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
-                raise RuntimeError(f"Operands must be numbers for '<' operator. Got '{type(left)}' and '{type(right)}'.")
-            return left < right
-        elif operator is TokenType.LESS_EQUAL:
-            if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
-                raise RuntimeError(f"Operands must be numbers for '<=' operator. Got '{type(left)}' and '{type(right)}'.")
-            return left <= right
-        elif operator is TokenType.EQUAL_EQUAL:
-            return self._is_equal(left, right)
-        elif operator is TokenType.BANG_EQUAL:
-            return not self._is_equal(left, right)
-        return None
-
-    def _is_truthy(self, value):
-        if value is None:
-            return False
-        if isinstance(value, bool):
-            return value
-        return True
-
-    def _is_equal(self, a, b):
-        if a is None and b is None:
-            return True
-        if a is None:
-            return False
-        return a == b
\ No newline at end of file
+        return self._binary(binary.operator.type, left, right)
+
+    def _unary(self, operator_type, right):
+        key = (operator_type, type(right))
+        handler = _UNARY_HANDLERS.get(key)
+        if handler is None:
+            handler = _UNARY_HANDLERS[key] = _resolve_unary(*key)
+        return handler(right)
+
+    def _binary(self, operator, left, right):
+        key = (operator, type(left), type(right))
+        handler = _BINARY_HANDLERS.get(key)
+        if handler is None:
+            handler = _BINARY_HANDLERS[key] = _resolve_binary(*key)
+        return handler(left, right)
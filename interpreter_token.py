@@ -1,8 +1,13 @@
 # interpreter_token.py
 
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
+
+class TokenType(IntEnum):
+    # Token kinds are small ints, so sets and dicts keyed on them hash in C
+    # and a kind fits in a byte or a bitmask; they still print as names.
+    __str__ = Enum.__str__
+    __format__ = Enum.__format__
 
-class TokenType(Enum):
     LEFT_PAREN = auto()
     RIGHT_PAREN = auto()
     LEFT_BRACE = auto()
@@ -44,12 +49,49 @@ class TokenType(Enum):
     VAR = auto()
     WHILE = auto()
 
+    # Lexical problem recorded by a scanner that collects diagnostics
+    ERROR = auto()
+
+# TokenType members indexed by their value, so a stored kind maps back in one lookup.
+TOKEN_TYPES = [None] * (max(TokenType) + 1)
+for _type in TokenType:
+    TOKEN_TYPES[_type] = _type
+del _type
+
 class Token:
-    def __init__(self, type, lexeme, line, literal=None):
+    """A scanned token.
+
+    Scanners record the token's start/end offsets and a shared LineIndex
+    instead of a line number; the line is looked up the first time it is
+    asked for. Tokens built with an explicit line keep it as given.
+    """
+
+    __slots__ = ("type", "lexeme", "literal", "start", "end", "line_index", "_line")
+
+    def __init__(self, type, lexeme, line=None, literal=None, start=None, end=None, line_index=None):
         self.type = type
         self.lexeme = lexeme
-        self.line = line
+        self._line = line
         self.literal = literal
+        self.start = start
+        self.end = end
+        self.line_index = line_index
+
+    @property
+    def line(self):
+        if self._line is None and self.line_index is not None:
+            self._line = self.line_index.line(self.start)
+        return self._line
+
+    @line.setter
+    def line(self, line):
+        self._line = line
+
+    @property
+    def column(self):
+        if self.line_index is None:
+            return None
+        return self.line_index.column(self.start)
 
     def __repr__(self):
         return f'{self.type} {self.lexeme} {self.literal}'
@@ -0,0 +1,52 @@
+# line_index.py
+
+import re
+from array import array
+from bisect import bisect_left
+
+_NEWLINE = re.compile('\n')
+_BYTES_NEWLINE = re.compile(b'\n')
+
+class LineIndex:
+    """Maps source offsets to line and column numbers.
+
+    The offsets of the newlines from *start* on are collected into an array
+    the first time a position is asked for and looked up with bisect, so
+    scanning itself never counts lines. *first_line* is the line number at
+    *start*. Bytes sources (including mmap and memoryview) are indexed by
+    byte offset.
+    """
+
+    def __init__(self, source, start=0, first_line=1):
+        self.source = source
+        self.start = start
+        self.first_line = first_line
+        self._newlines = None
+
+    def _build(self):
+        pattern = _NEWLINE if isinstance(self.source, str) else _BYTES_NEWLINE
+        self._newlines = array('q', [m.start() for m in pattern.finditer(self.source, self.start)])
+        return self._newlines
+
+    def newlines(self):
+        """Returns the ascending offsets of the newlines from *start* on."""
+        newlines = self._newlines
+        if newlines is None:
+            newlines = self._build()
+        return newlines
+
+    def line(self, offset):
+        """Returns the line number of the character at *offset*."""
+        newlines = self._newlines
+        if newlines is None:
+            newlines = self._build()
+        return self.first_line + bisect_left(newlines, offset)
+
+    def column(self, offset):
+        """Returns the 1-based column of the character at *offset*."""
+        newlines = self._newlines
+        if newlines is None:
+            newlines = self._build()
+        index = bisect_left(newlines, offset)
+        line_start = newlines[index - 1] + 1 if index else self.start
+        return offset - line_start + 1
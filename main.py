@@ -1,4 +1,8 @@
+import sys
+
+from interpreter import Interpreter
 from scanner import Scanner
+from script_cache import load_script
 
 def run(source):
     scanner = Scanner(source)
@@ -6,6 +10,31 @@ def run(source):
     for token in tokens:
         print(token)
 
+def run_file(path, use_cache=True):
+    """Evaluates each expression of the script at *path* and returns the values.
+
+    Parse and runtime errors are printed and leave None in place of the
+    value. The parsed script is cached next to it (see script_cache).
+    """
+    trees, errors = load_script(path, use_cache)
+    for error in errors:
+        print(error)
+    interpreter = Interpreter()
+    values = []
+    for tree in trees:
+        value = None
+        if tree is not None:
+            try:
+                value = interpreter.interpret_flat(tree)
+            except RuntimeError as error:
+                print(error)
+        values.append(value)
+    return values
+
 if __name__ == "__main__":
-    code = ""  # Empty input
-    run(code)
\ No newline at end of file
+    if len(sys.argv) > 1:
+        for value in run_file(sys.argv[1]):
+            print(value)
+    else:
+        code = ""  # Empty input
+        run(code)
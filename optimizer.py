@@ -0,0 +1,67 @@
+# optimizer.py
+
+from ast_1 import ExprNodes, Literal, rebuild
+from interpreter import Interpreter
+
+_interpreter = Interpreter()
+
+class ConstantFolder:
+    """A node builder (see ast_1.rebuild()) that folds constant operations as it builds.
+
+    Unary and Binary nodes whose operands are literals are evaluated and
+    replaced by a literal of the result, and Grouping nodes are dropped, as
+    the tree's shape already carries their meaning. Operations that raise
+    (a RuntimeError, or an OverflowError from Python arithmetic on huge
+    numbers) are left in place, so the error is raised when the tree is
+    evaluated, with the same message. Nodes are made by the builder *nodes*.
+    """
+
+    def __init__(self, nodes=ExprNodes):
+        self.nodes = nodes
+        self.number = nodes.number
+        self.string = nodes.string
+        self.boolean = nodes.boolean
+        self.nil = nodes.nil
+        self.literal = nodes.literal
+
+    def grouping(self, expression):
+        return expression
+
+    def unary(self, operator, right):
+        if isinstance(right, Literal):
+            try:
+                value = _interpreter._unary(operator.type, right.value)
+            except Exception:
+                pass
+            else:
+                return self._constant(value)
+        return self.nodes.unary(operator, right)
+
+    def binary(self, left, operator, right):
+        if isinstance(left, Literal) and isinstance(right, Literal):
+            try:
+                value = _interpreter._binary(operator.type, left.value, right.value)
+            except Exception:
+                pass
+            else:
+                return self._constant(value)
+        return self.nodes.binary(left, operator, right)
+
+    def _constant(self, value):
+        if value is None:
+            return self.nil()
+        if isinstance(value, bool):
+            return self.boolean(value)
+        if isinstance(value, (int, float)):
+            return self.number(value)
+        if isinstance(value, str):
+            return self.string(value)
+        return self.literal(value)
+
+def fold_constants(expr, nodes=ExprNodes):
+    """Returns a copy of the tree under *expr* with constant operations folded (see ConstantFolder).
+
+    Evaluating the result gives the same value, or raises the same
+    RuntimeError, as evaluating *expr*. Folding does not recurse.
+    """
+    return rebuild(expr, ConstantFolder(nodes))
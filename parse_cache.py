@@ -0,0 +1,121 @@
+# parse_cache.py
+
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+from ast_1 import freeze
+from optimizer import fold_constants
+from parser import Parser
+from scanner import Scanner
+
+CacheInfo = namedtuple("CacheInfo", "hits misses evictions currsize maxsize bytes max_bytes")
+
+def tree_size(expr):
+    """Returns an estimate in bytes of the memory held by the tree under *expr*."""
+    size = 0
+    pending = [expr]
+    while pending:
+        node = pending.pop()
+        size += sys.getsizeof(node)
+        operator = getattr(node, "operator", None)
+        if operator is not None:
+            size += sys.getsizeof(operator) + sys.getsizeof(operator.lexeme)
+        for child in ("left", "right", "expression"):
+            child = getattr(node, child, None)
+            if child is not None:
+                pending.append(child)
+    return size
+
+class ParseCache:
+    """A bounded, thread-safe LRU cache from source text to its parsed tree.
+
+    Repeated sources skip scanning and parsing. Cached trees are frozen (see
+    ast_1.freeze), so callers sharing one cannot change it under each other.
+    The least recently used entries are evicted once there are more than
+    *maxsize* of them or, if *max_bytes* is set, once the sources and trees
+    are estimated to take more than *max_bytes*. Sources that fail to parse
+    are not cached.
+
+    With an ast_1.NodeFactory as *factory*, trees are hash-consed through it
+    instead, so equal subtrees of different sources share memory; the size
+    estimate still counts shared nodes once per tree.
+
+    With *optimize*, trees are constant-folded (see
+    optimizer.fold_constants) before they are cached, so each evaluation of
+    a cached tree skips work that only depends on its literals.
+    """
+
+    def __init__(self, maxsize=1024, max_bytes=None, engine="classic", parser_engine="recursive", factory=None,
+                 optimize=False):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        # Fail on unknown engines now rather than on the first miss.
+        Scanner("", engine)
+        Parser([], parser_engine)
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.engine = engine
+        self.parser_engine = parser_engine
+        self.factory = factory
+        self.optimize = optimize
+        self._entries = OrderedDict()  # source -> (tree, size)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse(self, source):
+        """Returns the frozen tree for *source*, parsing it on a miss."""
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry is not None:
+                self._entries.move_to_end(source)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Parse outside the lock so other threads keep hitting meanwhile.
+        tree = Parser(Scanner(source, self.engine).scan_tokens(), self.parser_engine).parse()
+        if self.factory is None:
+            tree = freeze(fold_constants(tree) if self.optimize else tree)
+        else:
+            # Folding builds through the factory, which interns as it goes.
+            tree = fold_constants(tree, self.factory) if self.optimize else self.factory.intern(tree)
+        size = sys.getsizeof(source) + tree_size(tree)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return tree
+
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry is not None:
+                # Another thread got there first; hand out the cached tree.
+                self._entries.move_to_end(source)
+                return entry[0]
+            self._entries[source] = (tree, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+        return tree
+
+    def info(self):
+        """Returns the cache statistics as a CacheInfo."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self._entries),
+                             self.maxsize, self._bytes, self.max_bytes)
+
+    def clear(self):
+        """Drops every entry and resets the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, source):
+        return source in self._entries
@@ -1,16 +1,224 @@
 # parser.py
 
+from bisect import bisect_right
+from collections import namedtuple
+from operator import attrgetter
+
 from interpreter_token import Token, TokenType
-from ast_1 import Expr, Literal, BooleanLiteral, NilLiteral, NumberLiteral, Visitor, StringLiteral, Grouping, Unary, Binary
+from ast_1 import Expr, Literal, BooleanLiteral, NilLiteral, NumberLiteral, Visitor, StringLiteral, Grouping, Unary, Binary, ExprNodes
+from flat_ast import FlatTree
+from token_stream import TokenStream
+
+# Token kinds each rule of the recursive engine looks for, so every decision
+# is one set lookup. EOF is in none of the operator sets, so finding a token
+# there also means the parser is not at the end.
+_EQUALITY_OPERATORS = frozenset((TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL))
+_COMPARISON_OPERATORS = frozenset((TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL))
+_ADDITION_OPERATORS = frozenset((TokenType.MINUS, TokenType.PLUS))
+_MULTIPLICATION_OPERATORS = frozenset((TokenType.STAR, TokenType.DIVIDE))
+_UNARY_OPERATORS = frozenset((TokenType.BANG, TokenType.MINUS))
+
+# Tokens that may follow a complete expression.
+_EXPRESSION_FOLLOWERS = frozenset((TokenType.EOF, TokenType.RIGHT_PAREN))
+
+# Binding powers for the "pratt" engine: binary operators are left-associative
+# and a higher power binds tighter. Prefix operators bind tighter than any
+# binary operator, so their operand is a single unary or primary expression.
+# Adding an operator is one entry here plus its evaluation in the Interpreter.
+_BINARY_POWERS = {
+    TokenType.BANG_EQUAL:    1,
+    TokenType.EQUAL_EQUAL:   1,
+    TokenType.GREATER:       2,
+    TokenType.GREATER_EQUAL: 2,
+    TokenType.LESS:          2,
+    TokenType.LESS_EQUAL:    2,
+    TokenType.MINUS:         3,
+    TokenType.PLUS:          3,
+    TokenType.STAR:          4,
+    TokenType.DIVIDE:        4,
+}
+
+_PREFIX_POWERS = {
+    TokenType.BANG:  5,
+    TokenType.MINUS: 5,
+}
+
+# Binary operators that report "Expect expression after operator." when the
+# input ends right after them, as addition() does.
+_OPERAND_REQUIRED = _ADDITION_OPERATORS
+
+# Pending work on the "iterative" engine's stack, waiting for an operand.
+_UNARY_FRAME = 0     # A prefix operator
+_BINARY_FRAME = 1    # A left operand and binary operator
+_GROUP_FRAME = 2     # An opening parenthesis
+
+# Tokens that start a statement, where error recovery resumes.
+_STATEMENT_STARTS = frozenset((
+    TokenType.CLASS,
+    TokenType.FUN,
+    TokenType.VAR,
+    TokenType.FOR,
+    TokenType.IF,
+    TokenType.WHILE,
+    TokenType.PRINT,
+    TokenType.RETURN
+))
+
+# Result of Parser.parse_many(): one tree per expression (None where it
+# failed to parse) and the ParseErrors, both in source order.
+ParseResult = namedtuple("ParseResult", "expressions errors")
+
+def _end_line(token):
+    """Returns the line *token* ends on."""
+    return token.line + token.lexeme.count("\n")
+
+def _line_starts(tokens):
+    """Returns the ascending indexes of the tokens that begin a new line, other than the first.
+
+    A token begins a new line when a newline lies between the end of the
+    token before it and its own start; newlines inside a token (such as a
+    multi-line string) do not count.
+    """
+    try:
+        line_indexes = set(map(attrgetter("line_index"), tokens))
+    except AttributeError:
+        line_indexes = None
+    if not line_indexes or len(line_indexes) != 1 or None in line_indexes:
+        return [index for index, (previous, token) in enumerate(zip(tokens, tokens[1:]), 1)
+                if token.line != previous.line and token.line != _end_line(previous)]
+    # Tokens from one scan share a LineIndex: find the token after each of
+    # its newlines instead of looking up the line of every token.
+    starts = list(map(attrgetter("start"), tokens))
+    line_starts = []
+    index = 0
+    for offset in line_indexes.pop().newlines():
+        index = bisect_right(starts, offset, index)
+        if index == len(starts):
+            break
+        # Skip newlines inside a token, and further blank lines before the same one.
+        if index and tokens[index - 1].end <= offset and (not line_starts or line_starts[-1] != index):
+            line_starts.append(index)
+    return line_starts
+
+def _boundary(token, offset):
+    """Returns an EOF token at *offset*, on the line of *token*."""
+    line_index = getattr(token, "line_index", None)
+    # With a LineIndex the line is only looked up if an error is reported there.
+    return Token(TokenType.EOF, "", None if line_index is not None else token.line, None, offset, offset, line_index)
+
+def _split_expressions(tokens, newlines):
+    """Copies *tokens*, ending each expression with an EOF token where a ';' or (with *newlines*) a line break separates it from the next.
+
+    Empty expressions between two separators are left for the caller to skip.
+    """
+    types = list(map(attrgetter("type"), tokens))
+    # (index, 0) ends an expression before tokens[index] at a line break;
+    # (index, 1) replaces the ';' at tokens[index].
+    cuts = [(index, 0) for index in _line_starts(tokens)] if newlines and tokens else []
+    index = -1
+    while True:
+        try:
+            index = types.index(TokenType.SEMICOLON, index + 1)
+        except ValueError:
+            break
+        cuts.append((index, 1))
+    cuts.sort()
+    split = []
+    copied = 0
+    for index, semicolon in cuts:
+        split += tokens[copied:index]
+        if semicolon:
+            split.append(_boundary(tokens[index], tokens[index].start))
+            copied = index + 1
+        else:
+            split.append(_boundary(tokens[index - 1], tokens[index - 1].end))
+            copied = index
+    split += tokens[copied:]
+    return split
 
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    """Parses a token list, TokenBuffer or token iterator.
+
+    An iterator, such as Scanner.iter_tokens(), is read through a
+    TokenStream, so only the few tokens around the current one are held.
+    """
+
+    ENGINES = ("recursive", "pratt", "iterative")
+
+    def __init__(self, tokens, engine="recursive"):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown parser engine: {engine!r}")
+        self.engine = engine
+        self.reset(tokens)
+
+    def reset(self, tokens):
+        """Prepares the parser to parse *tokens* from the start."""
+        self.tokens = tokens if hasattr(tokens, "__getitem__") else TokenStream(tokens)
         self.current = 0
 
     def parse(self):
+        return self._parse(*self._expression_rule())
+
+    def parse_many(self, newlines=True):
+        """Parses every expression in the tokens, recovering after errors.
+
+        Expressions are separated by ';' and, if *newlines* is true, by line
+        breaks. A token iterator is read into a list first. Each separator
+        is turned into an EOF token, so an expression parses, and fails,
+        exactly as it would on its own, and after an error _synchronize()
+        skips ahead to the next separator. Errors are collected instead of
+        printed and raised. Returns a ParseResult.
+        """
+        tokens = self.tokens
+        listed = tokens if isinstance(tokens, list) else list(tokens)
+        split = self.tokens = _split_expressions(listed, newlines)
+        rule, *args = self._expression_rule()
+        last = len(split) - 1
+        expressions = []
+        errors = []
+        self.current = 0
         try:
-            expression = self.expression()
+            while self.current < last:
+                if split[self.current].type is TokenType.EOF:
+                    # A separator, or an empty expression between two of them.
+                    self.current += 1
+                    continue
+                try:
+                    expression = rule(*args)
+                    if not self._is_at_end():
+                        raise self._error(self._peek(), "Expect end of input after expression.")
+                    expressions.append(expression)
+                except ParseError as error:
+                    errors.append(error)
+                    expressions.append(None)
+                    while not self._is_at_end():
+                        self._synchronize()
+        finally:
+            self.tokens = tokens
+            self.current = len(listed) - 1
+        return ParseResult(expressions, errors)
+
+    def _expression_rule(self):
+        """Returns the engine's expression method followed by its arguments."""
+        if self.engine == "pratt":
+            return (self._pratt_expression,)
+        if self.engine == "iterative":
+            return (self._iterative_expression, ExprNodes)
+        return (self.expression,)
+
+    def parse_flat(self):
+        """Parses into a FlatTree, emitting its arrays directly instead of Expr nodes.
+
+        Always runs the iterative engine, which accepts the same input and
+        raises the same errors as the others.
+        """
+        tree = FlatTree()
+        tree.root = self._parse(self._iterative_expression, tree)
+        return tree
+
+    def _parse(self, rule, *args):
+        try:
+            expression = rule(*args)
             if not self._is_at_end():
                 raise self._error(self._peek(), "Expect end of input after expression.")
             return expression
@@ -21,7 +229,7 @@ class Parser:
 
     def expression(self):
         left = self.equality()
-        if not self._is_at_end() and self._peek().type not in [TokenType.EOF, TokenType.RIGHT_PAREN]:
+        if not self._is_at_end() and self._peek().type not in _EXPRESSION_FOLLOWERS:
             # If there's something left after a complete expression
             # and it's not a valid follower, assume a missing operator.
             # We might need to expand this list of valid followers as the grammar grows.
@@ -30,18 +238,18 @@ class Parser:
 
     def equality(self):
         left = self.comparison()
-        while self._match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
+        while self._match_any(_EQUALITY_OPERATORS):
             operator = self._previous()
             right = self.comparison()
             left = Binary(left, operator, right)
-        if not self._is_at_end() and self._peek().type not in [TokenType.EOF, TokenType.RIGHT_PAREN]:
+        if not self._is_at_end() and self._peek().type not in _EXPRESSION_FOLLOWERS:
             # Add more valid following tokens if needed for more complex grammar
             pass # For now, let lower precedence rules handle this
         return left
 
     def comparison(self):
         left = self.addition()
-        while self._match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
+        while self._match_any(_COMPARISON_OPERATORS):
             operator = self._previous()
             right = self.addition()
             left = Binary(left, operator, right)
@@ -49,7 +257,7 @@ class Parser:
 
     def addition(self):
         left = self.multiplication()
-        while self._match(TokenType.MINUS, TokenType.PLUS):
+        while self._match_any(_ADDITION_OPERATORS):
             operator = self._previous()
             if self._is_at_end():
                 raise self._error(self._previous(), "Expect expression after operator.")
@@ -59,37 +267,167 @@ class Parser:
 
     def multiplication(self):
         left = self.unary()
-        while self._match(TokenType.STAR, TokenType.DIVIDE):
+        while self._match_any(_MULTIPLICATION_OPERATORS):
             operator = self._previous()
             right = self.unary()
             left = Binary(left, operator, right)
         return left
 
     def unary(self):
-        if self._match(TokenType.BANG, TokenType.MINUS):
+        if self._match_any(_UNARY_OPERATORS):
             operator = self._previous()
             right = self.unary()
             return Unary(operator, right)
         return self.primary()
 
     def primary(self):
-        if self._match(TokenType.FALSE):
+        token = self._peek()
+        type = token.type
+        if type == TokenType.NUMBER:
+            self.current += 1
+            return NumberLiteral(token.literal)
+        if type == TokenType.STRING:
+            self.current += 1
+            return StringLiteral(token.literal)
+        if type == TokenType.FALSE:
+            self.current += 1
             return BooleanLiteral(False)
-        if self._match(TokenType.TRUE):
+        if type == TokenType.TRUE:
+            self.current += 1
             return BooleanLiteral(True)
-        if self._match(TokenType.NIL):
+        if type == TokenType.NIL:
+            self.current += 1
             return NilLiteral()
-        if self._match(TokenType.NUMBER):
-            return NumberLiteral(self._previous().literal)
-        if self._match(TokenType.STRING):
-            return StringLiteral(self._previous().literal)
-        if self._match(TokenType.LEFT_PAREN):
+        if type == TokenType.LEFT_PAREN:
+            self.current += 1
             expression = self.expression()
             self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
             return Grouping(expression)
 
         raise self._error(self._peek(), "Expect expression.") # Error if no primary is found
 
+    def _pratt_expression(self):
+        """Parses an expression by precedence climbing over _BINARY_POWERS.
+
+        Produces the same trees and errors as expression() without a Python
+        frame per precedence level.
+        """
+        left = self._pratt_binary(0)
+        if not self._is_at_end() and self._peek().type not in _EXPRESSION_FOLLOWERS:
+            raise self._error(self._peek(), "Expect operator after expression.")
+        return left
+
+    def _pratt_binary(self, min_power):
+        """Parses operators binding at least as tightly as *min_power*."""
+        left = self._pratt_prefix()
+        tokens = self.tokens
+        while True:
+            operator = tokens[self.current]
+            power = _BINARY_POWERS.get(operator.type)
+            if power is None or power < min_power:
+                return left
+            self.current += 1
+            if operator.type in _OPERAND_REQUIRED and tokens[self.current].type is TokenType.EOF:
+                raise self._error(operator, "Expect expression after operator.")
+            left = Binary(left, operator, self._pratt_binary(power + 1))
+
+    def _pratt_prefix(self):
+        token = self.tokens[self.current]
+        type = token.type
+        power = _PREFIX_POWERS.get(type)
+        if power is not None:
+            self.current += 1
+            return Unary(token, self._pratt_binary(power))
+        if type is TokenType.NUMBER:
+            self.current += 1
+            return NumberLiteral(token.literal)
+        if type is TokenType.STRING:
+            self.current += 1
+            return StringLiteral(token.literal)
+        if type is TokenType.TRUE or type is TokenType.FALSE:
+            self.current += 1
+            return BooleanLiteral(type is TokenType.TRUE)
+        if type is TokenType.NIL:
+            self.current += 1
+            return NilLiteral()
+        if type is TokenType.LEFT_PAREN:
+            self.current += 1
+            expression = self._pratt_expression()
+            self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+            return Grouping(expression)
+        raise self._error(token, "Expect expression.")
+
+    def _iterative_expression(self, nodes):
+        """Parses like _pratt_expression(), keeping pending work on a list.
+
+        Prefix operators, left operands waiting for their right-hand side,
+        and open parentheses are pushed as frames instead of recursing, so
+        nesting depth is bounded by memory rather than the recursion limit.
+        Nodes are made by the builder *nodes* (see ast_1.rebuild()), children
+        always before their parent.
+        """
+        number, string, boolean, nil = nodes.number, nodes.string, nodes.boolean, nodes.nil
+        grouping, unary, binary = nodes.grouping, nodes.unary, nodes.binary
+        tokens = self.tokens
+        stack = []
+        min_power = 0
+        while True:
+            token = tokens[self.current]
+            type = token.type
+            power = _PREFIX_POWERS.get(type)
+            if power is not None:
+                self.current += 1
+                stack.append((_UNARY_FRAME, token, min_power))
+                min_power = power
+                continue
+            if type is TokenType.LEFT_PAREN:
+                self.current += 1
+                stack.append((_GROUP_FRAME, token, min_power))
+                min_power = 0
+                continue
+            if type is TokenType.NUMBER:
+                value = number(token.literal)
+            elif type is TokenType.STRING:
+                value = string(token.literal)
+            elif type is TokenType.TRUE or type is TokenType.FALSE:
+                value = boolean(type is TokenType.TRUE)
+            elif type is TokenType.NIL:
+                value = nil()
+            else:
+                raise self._error(token, "Expect expression.")
+            self.current += 1
+
+            # Apply binary operators to the operand, and finish pending frames,
+            # until an operator starts a new right-hand side.
+            while True:
+                operator = tokens[self.current]
+                power = _BINARY_POWERS.get(operator.type)
+                if power is not None and power >= min_power:
+                    self.current += 1
+                    if operator.type in _OPERAND_REQUIRED and tokens[self.current].type is TokenType.EOF:
+                        raise self._error(operator, "Expect expression after operator.")
+                    stack.append((_BINARY_FRAME, (value, operator), min_power))
+                    min_power = power + 1
+                    break
+                if not stack or stack[-1][0] == _GROUP_FRAME:
+                    # The end of a whole expression, at top level or in parentheses.
+                    if operator.type not in _EXPRESSION_FOLLOWERS:
+                        raise self._error(operator, "Expect operator after expression.")
+                    if not stack:
+                        return value
+                    if operator.type is not TokenType.RIGHT_PAREN:
+                        raise self._error(operator, "Expect ')' after expression.")
+                    self.current += 1
+                    _, _, min_power = stack.pop()
+                    value = grouping(value)
+                    continue
+                kind, pending, min_power = stack.pop()
+                if kind == _UNARY_FRAME:
+                    value = unary(pending, value)
+                else:
+                    left, operator = pending
+                    value = binary(left, operator, value)
+
     def _consume(self, type, message):
         if self._check(type):
             return self._advance()
@@ -102,6 +440,13 @@ class Parser:
                 return True
         return False
 
+    def _match_any(self, types):
+        """Consumes the current token if its kind is in *types*, which must not contain EOF."""
+        if self.tokens[self.current].type in types:
+            self.current += 1
+            return True
+        return False
+
     def _check(self, type):
         if self._is_at_end():
             return False
@@ -110,7 +455,8 @@ class Parser:
     def _advance(self):
         if not self._is_at_end():
             self.current += 1
-        return self._previous()
+        # None at the start of the tokens, which a token stream cannot index back from.
+        return self._peek_previous()
 
     def _peek(self):
         return self.tokens[self.current]
@@ -127,31 +473,25 @@ class Parser:
         return self._peek().type == TokenType.EOF
 
     def _error(self, token, message):
-        return ParseError(token, message, token.line)
+        return ParseError(token, message)
 
     def _synchronize(self):
         self._advance()
         while not self._is_at_end():
             if self._previous().type == TokenType.SEMICOLON:
                 return
-            if self._peek().type in [
-                TokenType.CLASS,
-                TokenType.FUN,
-                TokenType.VAR,
-                TokenType.FOR,
-                TokenType.IF,
-                TokenType.WHILE,
-                TokenType.PRINT,
-                TokenType.RETURN
-            ]:
+            if self._peek().type in _STATEMENT_STARTS:
                 return
             self._advance()
 
 class ParseError(Exception):
-    def __init__(self, token, message, line):
+    def __init__(self, token, message, line=None):
         self.token = token
         self.message = message
-        self.line = line
+        # Scanned tokens only carry offsets; the line and column are looked up
+        # here, once an error is actually reported.
+        self.line = token.line if line is None else line
+        self.column = getattr(token, "column", None)
 
     def __str__(self):
         return f"ParseError at line {self.line}, {self.token}: {self.message}"
\ No newline at end of file
@@ -0,0 +1,51 @@
+# pipeline.py
+
+import threading
+
+from interpreter import Interpreter
+from parser import Parser
+from scanner import Scanner
+
+class Pipeline:
+    """A Scanner, Parser and Interpreter reused across evaluations.
+
+    Each evaluate() call resets the scanner and parser instead of building
+    new ones. A pipeline is not thread-safe; use get_pipeline() to get the
+    calling thread's own instance.
+
+    With a ParseCache as *cache*, trees come from the cache instead, so
+    repeated sources are not scanned or parsed again.
+    """
+
+    def __init__(self, engine="classic", cache=None):
+        self.scanner = Scanner("", engine)
+        self.parser = Parser([])
+        self.interpreter = Interpreter()
+        self.cache = cache
+
+    def evaluate(self, source):
+        """Scans, parses and evaluates *source*, returning its value."""
+        if self.cache is not None:
+            return self.interpreter.interpret(self.cache.parse(source))
+        scanner = self.scanner
+        parser = self.parser
+        scanner.reset(source)
+        parser.reset(scanner.scan_tokens())
+        return self.interpreter.interpret(parser.parse())
+
+_local = threading.local()
+
+def get_pipeline(engine="classic"):
+    """Returns the calling thread's pipeline for *engine*, creating it on first use."""
+    try:
+        pipelines = _local.pipelines
+    except AttributeError:
+        pipelines = _local.pipelines = {}
+    pipeline = pipelines.get(engine)
+    if pipeline is None:
+        pipeline = pipelines[engine] = Pipeline(engine)
+    return pipeline
+
+def evaluate(source, engine="classic"):
+    """Evaluates *source* with the calling thread's pooled pipeline."""
+    return get_pipeline(engine).evaluate(source)
@@ -1,41 +1,698 @@
 # scanner.py
 
+import mmap
+import os
+import re
+from bisect import bisect_left
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 from interpreter_token import TokenType, Token
+from line_index import LineIndex
+from token_buffer import TokenBuffer
+
+# Master pattern for the "regex" engine. Each alternative consumes a whole
+# lexeme per step; anything it does not recognise (non-ASCII identifiers,
+# unterminated strings/comments, stray characters) is handed to the classic
+# character-by-character path so both engines report the same tokens and errors.
+_MASTER_SOURCE = r"""
+    [ \t\r]*
+  (?:
+    (?P<SKIP>(?:[ \t\r\n]+|//[^\n]*|/\*.*?\*/)+)
+  | (?P<IDENTIFIER>[A-Za-z_]\w*)
+  | (?P<OPERATOR>(?!/\*)(?:[=!<>]=?|[(){},;+\-*/]))
+  | (?P<NUMBER>[0-9]+(?:\.[0-9]+|\.)?|\.[0-9]+(?:\.[0-9]+|\.)?)
+  | (?P<STRING>"[^"\\\n]*(?:\\[^\n][^"\\\n]*)*")
+  | (?P<FALLBACK>.)
+  )
+"""
+
+_MASTER_PATTERN = re.compile(_MASTER_SOURCE, re.VERBOSE | re.DOTALL)
+
+# The same pattern over UTF-8 bytes, where \w only covers ASCII. Lexemes that
+# touch non-ASCII bytes outside strings and comments are decoded as a short
+# run and handed to the classic scanner.
+_BYTES_PATTERN = re.compile(_MASTER_SOURCE.encode(), re.VERBOSE | re.DOTALL)
+
+_BYTES_FALLBACK_RUN = re.compile(rb'[\w.\x80-\xff]+|"(?:[^"\\\n]|\\.?)*["\n]?|.', re.DOTALL)
+
+_ENCODED_SOURCES = (bytes, bytearray, memoryview, mmap.mmap)
+
+# A lexical problem recorded, instead of raised, by a scanner created with
+# errors="collect". *offset* is where the offending lexeme starts and *line*
+# is the line there; *kind* is one of "unexpected-character",
+# "unterminated-string", "unmatched-comment" or "invalid-number".
+Diagnostic = namedtuple("Diagnostic", "kind offset line message")
+
+# Strings and comments as the lexer sees them from a token boundary. Newlines
+# inside a match are not safe places to split a source for parallel scanning.
+_PROTECTED_PATTERN = re.compile(r'"(?:[^"\\\n]|\\.)*["\n]?|//[^\n]*|/\*.*?(?:\*/|\Z)', re.DOTALL)
+
+# Sources shorter than this per worker are scanned in-process.
+DEFAULT_PARALLEL_CHUNK = 1 << 18
+
+# Characters read per call when scanning a file-like source.
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# String body up to its closing quote, a raw newline, or a backslash at the end of input.
+_STRING_BODY = re.compile(r'[^"\\\n]*(?:\\.[^"\\\n]*)*', re.DOTALL)
+
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+_KEYWORDS = {
+    "and":    TokenType.AND,
+    "class":  TokenType.CLASS,
+    "else":   TokenType.ELSE,
+    "false":  TokenType.FALSE,
+    "for":    TokenType.FOR,
+    "fun":    TokenType.FUN,
+    "if":     TokenType.IF,
+    "nil":    TokenType.NIL,
+    "or":     TokenType.OR,
+    "print":  TokenType.PRINT,
+    "return": TokenType.RETURN,
+    "super":  TokenType.SUPER,
+    "this":   TokenType.THIS,
+    "true":   TokenType.TRUE,
+    "var":    TokenType.VAR,
+    "while":  TokenType.WHILE
+}
+
+_OPERATORS = {
+    "(":  TokenType.LEFT_PAREN,
+    ")":  TokenType.RIGHT_PAREN,
+    "{":  TokenType.LEFT_BRACE,
+    "}":  TokenType.RIGHT_BRACE,
+    ",":  TokenType.COMMA,
+    ";":  TokenType.SEMICOLON,
+    "=":  TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "!":  TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "<":  TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">":  TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "/":  TokenType.DIVIDE,
+    "-":  TokenType.MINUS,
+    "+":  TokenType.PLUS,
+    "*":  TokenType.STAR,
+}
+
+# Kind bytes for TokenBuffer columns, keyed by str and by UTF-8 lexeme.
+_KEYWORD_KINDS = {text: type.value for text, type in _KEYWORDS.items()}
+_OPERATOR_KINDS = {text: type.value for text, type in _OPERATORS.items()}
+_BYTES_KEYWORD_KINDS = {text.encode(): kind for text, kind in _KEYWORD_KINDS.items()}
+_BYTES_OPERATOR_KINDS = {text.encode(): kind for text, kind in _OPERATOR_KINDS.items()}
+
+def _unescape(value):
+    """Translates the escape sequences in a string body.
+
+    Splitting on escaped backslashes first pairs them left to right, so the
+    remaining \\n, \\t and \\" sequences can be replaced in bulk; any other
+    escape keeps its backslash.
+    """
+    if '\\' not in value:
+        return value
+    return '\\'.join(part.replace('\\n', '\n').replace('\\t', '\t').replace('\\"', '"')
+                     for part in value.split('\\\\'))
+
+def _safe_boundaries(source, parts):
+    """Returns increasing offsets that split *source* into at most *parts* chunks.
+
+    Every inner offset follows a newline that lies outside strings and block
+    comments, so the lexer is at a token boundary there.
+    """
+    end = len(source)
+    boundaries = [0]
+    protected = _PROTECTED_PATTERN.finditer(source)
+    region = next(protected, None)
+    for part in range(1, parts):
+        target = max(end * part // parts, boundaries[-1])
+        while True:
+            newline = source.find('\n', target)
+            if newline == -1:
+                boundaries.append(end)
+                return boundaries
+            while region is not None and region.end() <= newline:
+                region = next(protected, None)
+            if region is None or region.start() > newline:
+                break
+            target = region.end()
+        if newline + 1 >= end:
+            break
+        boundaries.append(newline + 1)
+    boundaries.append(end)
+    return boundaries
+
+def _scan_chunk(text, errors="raise"):
+    """Worker entry point: scans *text* and returns its columns without EOF, and its diagnostics."""
+    buffer = TokenBuffer(text)
+    scanner = Scanner(text, errors=errors)
+    scanner._scan_into(buffer, 0)
+    return buffer.kinds, buffer.starts, buffer.ends, buffer.literals, scanner.diagnostics
+
+def _string_literal(lexeme):
+    """Returns the value of a scanned string lexeme, quotes included."""
+    return _unescape(lexeme[1:-1])
 
 class Scanner:
-    def __init__(self, source):
+    ENGINES = ("classic", "regex")
+    ERRORS = ("raise", "collect")
+
+    # Shared by every instance; scanners never modify it.
+    keywords = _KEYWORDS
+
+    def __init__(self, source, engine="classic", errors="raise"):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown scanner engine: {engine!r}")
+        if errors not in self.ERRORS:
+            raise ValueError(f"Unknown error handling: {errors!r}")
+        self.engine = engine
+        # With errors="collect" lexical problems are recorded in
+        # self.diagnostics and covered by an ERROR token, and scanning goes on.
+        self.errors = errors
+        self.reset(source)
+
+    def reset(self, source):
+        """Prepares the scanner to scan *source* from the start, keeping its engine.
+
+        A reset scanner behaves like a new one, so a single instance can be
+        reused for many short sources.
+        """
+        # File-like sources are scanned lazily through iter_tokens(); UTF-8
+        # bytes (including memory-mapped files) are scanned in place.
+        self.stream = None
+        if not isinstance(source, _ENCODED_SOURCES) and hasattr(source, "read"):
+            self.stream = source
+            source = ""
         self.source = source
         self.tokens = []
+        self.diagnostics = []
         self.start = 0
         self.current = 0
-        self.line = 1  # Initialize line number
+        # Lines are only needed for error messages, so they are looked up from
+        # offsets instead of being counted while scanning.
+        self.line_index = LineIndex(source)
         self.end = len(source)
-        self.keywords = {
-            "and":    TokenType.AND,
-            "class":  TokenType.CLASS,
-            "else":   TokenType.ELSE,
-            "false":  TokenType.FALSE,
-            "for":    TokenType.FOR,
-            "fun":    TokenType.FUN,
-            "if":     TokenType.IF,
-            "nil":    TokenType.NIL,
-            "or":     TokenType.OR,
-            "print":  TokenType.PRINT,
-            "return": TokenType.RETURN,
-            "super":  TokenType.SUPER,
-            "this":   TokenType.THIS,
-            "true":   TokenType.TRUE,
-            "var":    TokenType.VAR,
-            "while":  TokenType.WHILE
-        }
+
+    @classmethod
+    def from_file(cls, path, engine="classic", errors="raise"):
+        """Returns a scanner over the memory-mapped UTF-8 contents of *path*."""
+        with open(path, 'rb') as file:
+            try:
+                source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty files cannot be mapped
+                source = b""
+        return cls(source, engine, errors)
 
     def scan_tokens(self):
+        if self.stream is not None:
+            self.tokens = list(self.iter_tokens())
+            return self.tokens
+        if isinstance(self.source, _ENCODED_SOURCES):
+            buffer = self.scan_buffer()
+            self.tokens = [Token(t.type, t.lexeme, None, t.literal, t.start, t.end, buffer.line_index)
+                           for t in buffer]
+            return self.tokens
+        if self.engine == "regex":
+            return self._scan_tokens_regex()
         while not self._is_at_end():
             self.start = self.current  # 🔧 Reset start here
             self._scan_token()
-        self.tokens.append(Token(TokenType.EOF, "", self.line))
+        self.tokens.append(Token(TokenType.EOF, "", None, None, self.current, self.current, self.line_index))
         return self.tokens
 
+    def _scan_tokens_regex(self):
+        """Scans the source with the master pattern, one whole lexeme per match."""
+        source = self.source
+        end = self.end
+        tokens = self.tokens
+        append = tokens.append
+        finditer = _MASTER_PATTERN.finditer
+        keywords = self.keywords
+        operators = _OPERATORS
+        identifier = TokenType.IDENTIFIER
+        number = TokenType.NUMBER
+        line_index = self.line_index
+        pos = self.current
+
+        while pos < end:
+            for m in finditer(source, pos):
+                kind = m.lastgroup
+                if kind == "IDENTIFIER":
+                    text = m.group(kind)
+                    append(Token(keywords.get(text, identifier), text, None, None, m.start(kind), m.end(), line_index))
+                elif kind == "OPERATOR":
+                    text = m.group(kind)
+                    append(Token(operators[text], text, None, None, m.start(kind), m.end(), line_index))
+                elif kind == "SKIP":
+                    continue
+                elif kind == "NUMBER" and (m.end() == end or source[m.end()] < '\x80'):
+                    text = m.group(kind)
+                    try:
+                        value = float(text) if '.' in text else int(text)
+                    except ValueError:
+                        self.start = m.start(kind)
+                        self.current = m.end()
+                        self._handle_lexical_error(f"Invalid number format: {text}", "invalid-number")
+                        continue
+                    append(Token(number, text, None, value, m.start(kind), m.end(), line_index))
+                elif kind == "STRING":
+                    text = m.group(kind)
+                    append(Token(TokenType.STRING, text, None, _string_literal(text), m.start(kind), m.end(), line_index))
+                else:
+                    # Let the classic scanner handle whatever the pattern cannot,
+                    # then restart the pattern where it stopped.
+                    self.start = self.current = m.start(kind)
+                    self._scan_token()
+                    pos = self.current
+                    break
+            else:
+                pos = end
+
+        self.start = self.current = pos
+        tokens.append(Token(TokenType.EOF, "", None, None, pos, pos, line_index))
+        return tokens
+
+    def scan_buffer(self):
+        """Scans the source into a TokenBuffer instead of a list of Token objects."""
+        if isinstance(self.source, _ENCODED_SOURCES):
+            return self._scan_encoded_buffer()
+        buffer = TokenBuffer(self.source)
+        self._scan_into(buffer, self.current)
+        buffer.append(TokenType.EOF, self.current, self.current)
+        return buffer
+
+    def relex(self, previous, offset, removed, inserted):
+        """Applies an edit to the TokenBuffer *previous* in place and returns it.
+
+        The edit replaces *removed* characters at *offset* with *inserted*.
+        Only the damaged region is re-scanned: scanning restarts after the last
+        token that ends before the edit and stops as soon as it reaches, past
+        the edit, a position where an old token started. The new tokens are
+        spliced into the buffer's arrays, and the old tokens after them are
+        moved lazily (see TokenBuffer.splice()). The scanner's source becomes
+        the edited text. When collecting errors, self.diagnostics only covers
+        the re-scanned region; ERROR tokens mark every problem. Bytes sources
+        are re-scanned into a new buffer.
+        """
+        old_source = previous.source
+        source = old_source[:offset] + inserted + old_source[offset + removed:]
+        self.source = source
+        self.end = len(source)
+        self.line_index = LineIndex(source)
+        self.tokens = []
+        self.diagnostics = []
+        if not isinstance(source, str):
+            self.start = self.current = 0
+            return self.scan_buffer()
+
+        delta = len(inserted) - removed
+        count = len(previous) - 1  # Tokens before EOF
+        indexes = range(count)
+        first = bisect_left(indexes, offset, key=previous.end)
+        pos = previous.end(first - 1) if first else 0
+        resumed = []
+
+        def resync(start):
+            index = bisect_left(indexes, start - delta, first, key=previous.start)
+            if index < count and previous.start(index) == start - delta:
+                resumed.append(index)
+                return True
+            return False
+
+        part = TokenBuffer(source)
+        self._scan_into(part, pos, offset + len(inserted), resync)
+        if resumed:
+            tail = resumed[0]
+        else:
+            part.append(TokenType.EOF, self.current, self.current)
+            tail = len(previous)
+        previous.splice(first, tail, part, delta, source)
+        return previous
+
+    def scan_parallel(self, workers=None, executor=None, min_chunk_size=DEFAULT_PARALLEL_CHUNK):
+        """Scans the source into one TokenBuffer using several processes.
+
+        The source is split after newlines that lie outside strings and block
+        comments, the chunks are scanned by a ProcessPoolExecutor (or the
+        given *executor*, which avoids paying process start-up per call), and
+        the results are stitched back together with absolute offsets and a
+        single EOF. Sources too small to give every worker
+        *min_chunk_size* characters are scanned in-process.
+        """
+        source = self.source
+        workers = workers or os.cpu_count() or 1
+        parts = min(workers, len(source) // max(min_chunk_size, 1))
+        if parts < 2 or not isinstance(source, str):
+            return self.scan_buffer()
+        boundaries = _safe_boundaries(source, parts)
+        chunks = [source[start:stop] for start, stop in zip(boundaries, boundaries[1:])]
+        scan = partial(_scan_chunk, errors=self.errors)
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=parts) as pool:
+                return self._stitch(boundaries, pool.map(scan, chunks))
+        return self._stitch(boundaries, executor.map(scan, chunks))
+
+    def _stitch(self, boundaries, results):
+        buffer = TokenBuffer(self.source)
+        position = 0
+        for start, stop in zip(boundaries, boundaries[1:]):
+            try:
+                kinds, starts, ends, literals, diagnostics = next(results)
+            except StopIteration:
+                break
+            except Exception:
+                # Re-scan from the failing chunk here so the error reports absolute lines.
+                self._scan_into(TokenBuffer(self.source), start)
+                raise
+            buffer.kinds.extend(kinds)
+            buffer.starts.extend(map(start.__add__, starts))
+            buffer.ends.extend(map(start.__add__, ends))
+            buffer.literals.extend(literals)
+            for diagnostic in diagnostics:
+                offset = start + diagnostic.offset
+                self.diagnostics.append(diagnostic._replace(offset=offset, line=self.line_index.line(offset)))
+            position = stop
+        self.start = self.current = position
+        buffer.append(TokenType.EOF, position, position)
+        return buffer
+
+    def _scan_into(self, buffer, pos, resync_after=None, resync=None):
+        """Appends tokens from source[pos:] to *buffer*, without the EOF token.
+
+        If *resync* is given it is called with the start of every token at or
+        after *resync_after*; scanning stops before the first token for which
+        it returns True. self.current is left where it stopped.
+        """
+        source = self.source
+        end = self.end
+        kinds = buffer.kinds
+        starts = buffer.starts
+        ends = buffer.ends
+        literals = buffer.literals
+        finditer = _MASTER_PATTERN.finditer
+        identifier = TokenType.IDENTIFIER.value
+        number = TokenType.NUMBER.value
+        string = TokenType.STRING.value
+        keyword_kinds = _KEYWORD_KINDS
+        operator_kinds = _OPERATOR_KINDS
+        if resync is None:
+            resync_after = end + 1
+        pending = self.tokens = []
+
+        while pos < end:
+            for m in finditer(source, pos):
+                kind = m.lastgroup
+                if kind == "SKIP":
+                    continue
+                start = m.start(kind)
+                if start >= resync_after and resync(start):
+                    self.start = self.current = start
+                    return
+                if kind == "IDENTIFIER":
+                    kinds.append(keyword_kinds.get(m.group(kind), identifier))
+                    literals.append(None)
+                elif kind == "OPERATOR":
+                    kinds.append(operator_kinds[m.group(kind)])
+                    literals.append(None)
+                elif kind == "NUMBER" and (m.end() == end or source[m.end()] < '\x80'):
+                    text = m.group(kind)
+                    try:
+                        literals.append(float(text) if '.' in text else int(text))
+                    except ValueError:
+                        self.start = start
+                        self.current = m.end()
+                        self._handle_lexical_error(f"Invalid number format: {text}", "invalid-number")
+                        self._flush_pending(buffer)
+                        continue
+                    kinds.append(number)
+                elif kind == "STRING":
+                    literals.append(_unescape(source[start + 1:m.end() - 1]))
+                    kinds.append(string)
+                else:
+                    self.start = self.current = start
+                    self._scan_token()
+                    self._flush_pending(buffer)
+                    pos = self.current
+                    break
+                starts.append(start)
+                ends.append(m.end())
+            else:
+                pos = end
+
+        self.start = self.current = pos
+
+    def _scan_encoded_buffer(self):
+        """Scans UTF-8 bytes in place; offsets in the buffer are byte offsets.
+
+        Only lexemes that touch non-ASCII bytes outside strings and comments
+        are decoded while scanning. String literals are decoded when the
+        buffer is asked for them.
+        """
+        source = self.source
+        end = self.end
+        buffer = TokenBuffer(source, decode_string=_string_literal)
+        kinds = buffer.kinds
+        starts = buffer.starts
+        ends = buffer.ends
+        literals = buffer.literals
+        finditer = _BYTES_PATTERN.finditer
+        keyword_kinds = _BYTES_KEYWORD_KINDS
+        operator_kinds = _BYTES_OPERATOR_KINDS
+        identifier = TokenType.IDENTIFIER.value
+        number = TokenType.NUMBER.value
+        string = TokenType.STRING.value
+        self.tokens = []
+        pos = self.current
+
+        while pos < end:
+            for m in finditer(source, pos):
+                kind = m.lastgroup
+                start = m.start(kind)
+                stop = m.end()
+                if kind == "SKIP":
+                    continue
+                if kind in ("IDENTIFIER", "NUMBER") and stop < end and source[stop] >= 0x80:
+                    kind = "FALLBACK"
+                if kind == "IDENTIFIER":
+                    kinds.append(keyword_kinds.get(m.group(kind), identifier))
+                    literals.append(None)
+                elif kind == "OPERATOR":
+                    kinds.append(operator_kinds[m.group(kind)])
+                    literals.append(None)
+                elif kind == "NUMBER":
+                    text = m.group(kind)
+                    try:
+                        literals.append(float(text) if b'.' in text else int(text))
+                    except ValueError:
+                        self.start = start
+                        self.current = stop
+                        self._handle_lexical_error(f"Invalid number format: {text.decode()}", "invalid-number")
+                        self._flush_pending(buffer)
+                        continue
+                    kinds.append(number)
+                elif kind == "STRING":
+                    kinds.append(string)
+                    literals.append(None)
+                elif source[start:start + 2] == b'/*':
+                    self.start = start
+                    self.current = pos = end
+                    self._handle_unmatched_block_comment()
+                    self._flush_pending(buffer)
+                    break
+                else:
+                    pos = _BYTES_FALLBACK_RUN.match(source, start).end()
+                    self._scan_encoded_run(buffer, start, pos)
+                    break
+                starts.append(start)
+                ends.append(stop)
+            else:
+                pos = end
+
+        self.start = self.current = pos
+        buffer.append(TokenType.EOF, pos, pos)
+        return buffer
+
+    def _scan_encoded_run(self, buffer, start, stop):
+        """Decodes source[start:stop] and scans it with the classic scanner."""
+        text = str(self.source[start:stop], 'utf-8')
+        scanner = Scanner(text, errors=self.errors)
+        scanner.line_index = LineIndex(text, 0, self.line_index.line(start))
+        while not scanner._is_at_end():
+            scanner.start = scanner.current
+            scanner._scan_token()
+            for token in scanner.tokens:
+                token_start = start + len(text[:scanner.start].encode())
+                token_end = start + len(text[:scanner.current].encode())
+                buffer.append(token.type, token_start, token_end, token.literal)
+            scanner.tokens.clear()
+        for diagnostic in scanner.diagnostics:
+            offset = start + len(text[:diagnostic.offset].encode())
+            self.diagnostics.append(diagnostic._replace(offset=offset))
+
+    def iter_tokens(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yields tokens on demand, ending with EOF, without building self.tokens.
+
+        File-like sources are read *chunk_size* characters at a time. Only the
+        unscanned tail of the buffer is kept between reads, and block comments
+        are skipped as they stream past, so memory is bounded by the longest
+        string literal or line rather than by the size of the input (when
+        collecting errors, by the longest block comment too). A stream
+        cannot be indexed afterwards, so tokens get their line as they are
+        yielded; offsets are counted from the start of the stream.
+        """
+        if self.stream is not None:
+            read = partial(self.stream.read, chunk_size)
+            buffer, pos, final, refill = "", 0, False, True
+        else:
+            read = None
+            buffer, pos, final, refill = self.source, self.current, True, False
+        finditer = _MASTER_PATTERN.finditer
+        keywords = self.keywords
+        operators = _OPERATORS
+        identifier = TokenType.IDENTIFIER
+        pending = self.tokens = []
+        line = self.line_index.line(pos) if pos else 1
+        base = 0  # Stream offset of buffer[0]
+        size = len(buffer)
+
+        while True:
+            if refill:
+                chunk = read()
+                if chunk:
+                    buffer = buffer[pos:] + chunk
+                    base += pos
+                    pos = 0
+                else:
+                    final = True
+                size = len(buffer)
+                self.source = buffer
+                self.end = size
+            refill = True
+            for m in finditer(buffer, pos):
+                kind = m.lastgroup
+                start = m.start(kind)
+                stop = m.end()
+                if stop >= size and not final:
+                    # The lexeme may continue in the next chunk.
+                    if kind == "SKIP":
+                        newline = buffer.rfind('\n', start, stop)
+                        if newline != -1 and buffer.find('*/', newline, stop) == -1:
+                            line += buffer.count('\n', start, newline + 1)
+                            pos = newline + 1
+                            break
+                    pos = m.start()
+                    break
+                if kind == "IDENTIFIER":
+                    text = m.group(kind)
+                    yield Token(keywords.get(text, identifier), text, line, None, base + start, base + stop)
+                elif kind == "OPERATOR":
+                    text = m.group(kind)
+                    yield Token(operators[text], text, line, None, base + start, base + stop)
+                elif kind == "SKIP":
+                    line += buffer.count('\n', start, stop)
+                elif kind == "NUMBER" and (stop == size or buffer[stop] < '\x80'):
+                    text = m.group(kind)
+                    try:
+                        value = float(text) if '.' in text else int(text)
+                    except ValueError:
+                        self.start = start
+                        self.current = stop
+                        self.line_index = LineIndex(buffer, start, line)
+                        recorded = len(self.diagnostics)
+                        self._handle_lexical_error(f"Invalid number format: {text}", "invalid-number")
+                        yield from self._stream_pending(base, line, recorded)
+                        continue
+                    yield Token(TokenType.NUMBER, text, line, value, base + start, base + stop)
+                elif kind == "STRING":
+                    text = m.group(kind)
+                    yield Token(TokenType.STRING, text, line, _string_literal(text), base + start, base + stop)
+                elif not final and buffer.startswith('/*', start):
+                    # Skip a block comment that runs past the buffer without
+                    # holding on to it, keeping one character in case the
+                    # closing "*/" straddles two chunks. When collecting
+                    # errors, the text is kept for the ERROR token an
+                    # unterminated comment becomes.
+                    comment_start, comment_line = base + start, line
+                    skipped = [] if self.errors == "collect" else None
+                    search = start + 2
+                    close = buffer.find('*/', search)
+                    while close == -1:
+                        chunk = read()
+                        if not chunk:
+                            break
+                        keep = max(size - 1, search)
+                        line += buffer.count('\n', start, keep)
+                        if skipped is not None:
+                            skipped.append(buffer[start:keep])
+                        buffer = buffer[keep:] + chunk
+                        base += keep
+                        size = len(buffer)
+                        start = search = 0
+                        close = buffer.find('*/')
+                    if close == -1:
+                        self.line_index = LineIndex(buffer, start, line)
+                        self.current = size
+                        if self.errors == "raise":
+                            raise self._unmatched_block_comment_error()
+                        message = "Unmatched block comment"
+                        self.diagnostics.append(Diagnostic("unmatched-comment", comment_start, comment_line, message))
+                        lexeme = "".join(skipped) + buffer[start:]
+                        yield Token(TokenType.ERROR, lexeme, comment_line, message, comment_start, base + size)
+                        line += buffer.count('\n', start)
+                        pos = size
+                        final = True
+                    else:
+                        line += buffer.count('\n', start, close)
+                        pos = close + 2
+                    self.source = buffer
+                    self.end = size
+                    refill = False
+                    break
+                else:
+                    # Fall back to the classic scanner, retrying with more
+                    # input if it ran into the end of a partial buffer.
+                    self.start = self.current = start
+                    self.line_index = LineIndex(buffer, start, line)
+                    recorded = len(self.diagnostics)
+                    try:
+                        self._scan_token()
+                    except Exception:
+                        if final or self.current < size:
+                            raise
+                    if not final and self.current >= size:
+                        pending.clear()
+                        del self.diagnostics[recorded:]
+                        pos = start
+                        break
+                    yield from self._stream_pending(base, line, recorded)
+                    line += buffer.count('\n', start, self.current)
+                    pos = self.current
+                    refill = False
+                    break
+            else:
+                pos = size
+                if final:
+                    break
+
+        self.start = self.current = pos
+        yield Token(TokenType.EOF, "", line, None, base + pos, base + pos)
+
+    def _stream_pending(self, base, line, recorded):
+        """Yields the tokens the classic scanner added to a stream buffer, at stream offsets.
+
+        Diagnostics recorded since index *recorded* are moved to stream
+        offsets as well.
+        """
+        for token in self.tokens:
+            yield Token(token.type, token.lexeme, line, token.literal, base + self.start, base + self.current)
+        self.tokens.clear()
+        diagnostics = self.diagnostics
+        diagnostics[recorded:] = [d._replace(offset=base + d.offset) for d in diagnostics[recorded:]]
+
     def _scan_token(self):
         char = self._advance()
 
@@ -72,10 +729,8 @@ class Scanner:
             self._add_token(TokenType.PLUS)
         elif char == '*':
             self._add_token(TokenType.STAR)
-        elif char in [' ', '\r', '\t']:
-            pass
-        elif char == '\n':
-            self.line += 1
+        elif char in ' \r\t\n':
+            self._skip_whitespace()
         elif char == '!':
             self._add_token(TokenType.BANG_EQUAL if self._match('=') else TokenType.BANG)
         elif char == '<':
@@ -86,45 +741,23 @@ class Scanner:
             if self._peek().isdigit():
                 self._handle_number()
             else:
-                self._handle_lexical_error(f"Unexpected character: {char}")
+                self._handle_lexical_error(f"Unexpected character: {char}", "unexpected-character")
         else:
-            self._handle_lexical_error(f"Unexpected character: {char}")
+            self._handle_lexical_error(f"Unexpected character: {char}", "unexpected-character")
 
     def _handle_string(self):
-        string_value = ""
-        while self._peek() != '"' and not self._is_at_end():
-            char = self._advance()
-            if char == '\n':
-                self.line += 1
-                self._handle_lexical_error("Unterminated string literal")
-                return
-            elif char == '\\':  # Escape sequence
-                next_char = self._peek()
-                if next_char == 'n':
-                    string_value += '\n'
-                    self._advance()
-                elif next_char == 't':
-                    string_value += '\t'
-                    self._advance()
-                elif next_char == '\\':
-                    string_value += '\\'
-                    self._advance()
-                elif next_char == '"':
-                    string_value += '"'
-                    self._advance()
-                else:
-                    string_value += '\\' + next_char
-                    self._advance()
-            else:
-                string_value += char
-
-        if self._is_at_end():
-            self._handle_lexical_error("Unterminated string literal")
-            return  # Important to return after raising the error
-
-        # Consume the closing quote
-        self._advance()
-        self._add_token(TokenType.STRING, string_value)
+        """Handles string literals, matching the body in one step and translating escapes in bulk."""
+        body = _STRING_BODY.match(self.source, self.current)
+        stop = body.end()
+        if stop < self.end and self.source[stop] == '"':
+            self.current = stop + 1
+            self._add_token(TokenType.STRING, _string_literal(self.source[self.start:self.current]))
+            return
+        if stop < self.end and self.source[stop] == '\n':
+            self.current = stop + 1
+        else:
+            self.current = self.end
+        self._handle_lexical_error("Unterminated string literal", "unterminated-string")
 
     def _advance(self):
         """Advance to the next character in the source and return the character."""
@@ -142,29 +775,53 @@ class Scanner:
         """Returns True if the scanner has reached the end of the source."""
         return self.current >= len(self.source)
 
-    def _handle_lexical_error(self, message):
-        raise Exception(f"Lexical Error at line {self.line}: {message}")
+    def _handle_lexical_error(self, message, kind):
+        if self.errors == "raise":
+            raise Exception(f"Lexical Error at line {self.line_index.line(self.current)}: {message}")
+        self._record_diagnostic(kind, message)
+
+    def _record_diagnostic(self, kind, message):
+        """Records a problem with source[self.start:self.current] and covers it with an ERROR token."""
+        self.diagnostics.append(Diagnostic(kind, self.start, self.line_index.line(self.start), message))
+        self._add_token(TokenType.ERROR, message)
+
+    def _flush_pending(self, buffer):
+        """Moves the tokens the classic scanner added into *buffer*."""
+        for token in self.tokens:
+            buffer.append(token.type, self.start, self.current, token.literal)
+        self.tokens.clear()
 
     def _add_token(self, type, literal=None):
         """Adds a token to the list of tokens."""
         lexeme = self.source[self.start:self.current]
-        self.tokens.append(Token(type, lexeme, self.line, literal))
+        self.tokens.append(Token(type, lexeme, None, literal, self.start, self.current, self.line_index))
 
     def _skip_comment(self):
         """Skips over a single-line comment."""
-        while self._peek() != '\n' and not self._is_at_end():
-            self._advance()
+        newline = self.source.find('\n', self.current)
+        self.current = self.end if newline == -1 else newline
 
     def _skip_block_comment(self):
         """Skips over a multi-line comment, raises an error if the block is not properly closed."""
-        while not self._is_at_end():
-            char = self._advance()
-            if char == '*' and self._peek() == '/':
-                self._advance()  # Skip the '/'
-                return
-            elif char == '\n':
-                self.line += 1
-        raise Exception(f"Lexical Error: Unmatched block comment starting at line {self.line}")
+        close = self.source.find('*/', self.current)
+        if close == -1:
+            self.current = self.end
+            self._handle_unmatched_block_comment()
+            return
+        self.current = close + 2
+
+    def _skip_whitespace(self):
+        """Skips the rest of a whitespace run."""
+        self.current = _WHITESPACE.match(self.source, self.current).end()
+
+    def _handle_unmatched_block_comment(self):
+        """Reports a block comment from self.start that runs to the end of the source."""
+        if self.errors == "raise":
+            raise self._unmatched_block_comment_error()
+        self._record_diagnostic("unmatched-comment", "Unmatched block comment")
+
+    def _unmatched_block_comment_error(self):
+        return Exception(f"Lexical Error: Unmatched block comment starting at line {self.line_index.line(self.current)}")
 
     def _handle_identifier_or_keyword(self):
         """Handles identifiers and reserved words (keywords)."""
@@ -196,7 +853,7 @@ class Scanner:
             number_value = float(lexeme) if is_float or '.' in lexeme else int(lexeme)
             self._add_token(TokenType.NUMBER, number_value)
         except ValueError:
-            self._handle_lexical_error(f"Invalid number format: {lexeme}")
+            self._handle_lexical_error(f"Invalid number format: {lexeme}", "invalid-number")
 
     def _peek(self):
         """Returns the next character without consuming it."""
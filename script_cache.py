@@ -0,0 +1,147 @@
+# script_cache.py
+
+import hashlib
+import marshal
+import os
+import sys
+
+from ast_wire import OPERATORS, OPERATOR_CODES
+from flat_ast import BINARY, GROUPING, LAST_LITERAL, UNARY, FlatTree
+from parser import Parser, ParseResult
+from scanner import Scanner
+
+# Layout of format version 2:
+#
+#   magic b"LXC", version byte, byte-order byte (b"<" or b">")
+#   SHA-256 digest of the source bytes
+#   marshal data: a tuple with one (kinds, operators, lefts, rights,
+#   constants) tuple per expression, the first four being the raw bytes of
+#   the FlatTree arrays. Node kinds use the flat_ast numbering, which
+#   ast_wire fixes as part of its format; operators are stored as one plus
+#   ast_wire's operator code (0 for none) rather than as TokenType values,
+#   so reordering token types does not change what a cache file means.
+#
+# The arrays are stored in native byte order and marshal data is only read
+# back by the same Python version, so cache files live under a name tagged
+# with the implementation (as __pycache__ does) and are not meant to be
+# shared between machines; ast_wire is the portable format.
+MAGIC = b"LXC"
+VERSION = 2
+CACHE_DIRECTORY = "__lxcache__"
+
+_BYTE_ORDER = b"<" if sys.byteorder == "little" else b">"
+_HEADER = MAGIC + bytes([VERSION]) + _BYTE_ORDER
+
+# bytes.translate() tables between FlatTree operators and stored operator codes.
+_ENCODE_OPERATORS = bytearray(256)
+_DECODE_OPERATORS = bytearray(256)
+for _type, _code in OPERATOR_CODES.items():
+    _ENCODE_OPERATORS[_type] = _code + 1
+    _DECODE_OPERATORS[_code + 1] = _type
+
+def cache_path(path):
+    """Returns where the cached form of the script at *path* is kept."""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, CACHE_DIRECTORY, f"{name}.{sys.implementation.cache_tag}.lxc")
+
+def load_script(path, use_cache=True, engine="classic", parser_engine="recursive"):
+    """Returns the expressions of the script at *path* as a ParseResult of FlatTrees.
+
+    Expressions are separated by semicolons and newlines, as in
+    Parser.parse_many(). With *use_cache*, the parsed script is stored next
+    to it (see cache_path()) and later loads of the same contents read it
+    from there instead of scanning and parsing again. Scripts with parse
+    errors are not cached. A missing, stale, unreadable or malformed cache
+    file is ignored, as is a cache directory that cannot be written.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    digest = hashlib.sha256(data).digest()
+    if use_cache:
+        trees = _read_cache(cache_path(path), digest)
+        if trees is not None:
+            return ParseResult(trees, [])
+
+    source = data.decode("utf-8")
+    expressions, errors = Parser(Scanner(source, engine).scan_tokens(), parser_engine).parse_many()
+    trees = [None if expr is None else FlatTree.from_expr(expr) for expr in expressions]
+    if use_cache and not errors:
+        _write_cache(cache_path(path), digest, trees)
+    return ParseResult(trees, errors)
+
+def _read_cache(path, digest):
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    start = len(_HEADER) + len(digest)
+    if data[:len(_HEADER)] != _HEADER or data[len(_HEADER):start] != digest:
+        return None
+    try:
+        parts = marshal.loads(memoryview(data)[start:])
+        trees = []
+        for kinds, operators, lefts, rights, constants in parts:
+            tree = FlatTree()
+            tree.kinds.frombytes(kinds)
+            if operators and max(operators) > len(OPERATORS):
+                return None
+            tree.operators.frombytes(operators.translate(_DECODE_OPERATORS))
+            tree.lefts.frombytes(lefts)
+            tree.rights.frombytes(rights)
+            tree.constants = list(constants)
+            tree.root = len(tree.kinds) - 1
+            if not _well_formed(tree):
+                return None
+            trees.append(tree)
+    except (EOFError, ValueError, TypeError, MemoryError):
+        return None
+    return trees
+
+def _well_formed(tree):
+    """Tells whether *tree*'s arrays describe one expression with every index in range.
+
+    Literals must point into the constants pool, and each other node's
+    children must be the values that evaluating the nodes in order with a
+    stack (as Interpreter.interpret_flat() does) has just produced.
+    """
+    if not len(tree.operators) == len(tree.lefts) == len(tree.rights) == tree.root + 1:
+        return False
+    constants = len(tree.constants)
+    stack = []
+    push, pop = stack.append, stack.pop
+    try:
+        for index, kind, operator, left, right in zip(range(tree.root + 1), tree.kinds, tree.operators,
+                                                      tree.lefts, tree.rights):
+            if kind <= LAST_LITERAL:
+                if not 0 <= left < constants:
+                    return False
+            elif kind == BINARY:
+                if not operator or pop() != right or pop() != left:
+                    return False
+            elif kind == UNARY:
+                if not operator or pop() != right:
+                    return False
+            elif kind != GROUPING or pop() != left:
+                return False
+            push(index)
+    except IndexError:
+        return False
+    return stack == [tree.root]
+
+def _write_cache(path, digest, trees):
+    parts = tuple((tree.kinds.tobytes(), tree.operators.tobytes().translate(_ENCODE_OPERATORS),
+                   tree.lefts.tobytes(), tree.rights.tobytes(), tuple(tree.constants)) for tree in trees)
+    # Write to a temporary file and rename it over the old one, so a reader
+    # never sees a half-written cache.
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary, "wb") as file:
+            file.write(_HEADER + digest + marshal.dumps(parts))
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
@@ -0,0 +1,78 @@
+# tests/backend_cases.py
+#
+# Sources and checks shared by the tests of the evaluation backends
+# (closure_compiler, codegen, bytecode and optimizer), which must all give
+# the same value, or raise the same error, as Interpreter().interpret().
+
+from ast_1 import Binary, NumberLiteral, StringLiteral, Unary
+from flat_ast import FlatTree
+from interpreter import Interpreter
+from interpreter_token import Token, TokenType
+from parser import Parser
+from scanner import Scanner
+
+VALUE_SOURCES = (
+    "1 + 2 * 3", "(1 + 2) * 3", "10 / 4", "7 - 2 - 1", "7 - -2 - 1", '"a" + "b"', "-(3)", "--3", "-(-(1.5))",
+    "!true", "!nil", "!0", '!""', "!!false", "1 < 2", "2 <= 2", "3 > 4", "3 >= 4", "1 < 2 == !nil",
+    "nil == nil", "nil == false", "nil != false", "1 == nil", '"a" != nil', "1 != 1.0", '"a" != "b"',
+    '"a" + "b" == "ab"', "true + 1", "-true", "true < 2", "1.5 * 2", "((((nil))))", "(1 + 2) == (4 - 1)",
+    "(2 * 3) + (10 / 4) - -1", "((1 + 2) * (3 - (4 / 2)))", '"x"', "nil",
+)
+
+ERROR_SOURCES = (
+    '1 + "a"', '1 + (2 * "a")', '"a" - "b"', '"a" * 2', "1 / 0", "1 / (1 - 1)", "1 / 0.0", "1 / false",
+    '-"a"', "-nil", '-"a" == nil', "!(1 / 0)", "nil < 1", '"a" >= "b"', "2 * (1 - nil)",
+    "(1 / 0) == (2 + 3)", "(1 / 0.0) + (2 * 3)", "1" + "0" * 400 + " / 3",
+)
+
+def parse(source, engine="recursive"):
+    return Parser(Scanner(source).scan_tokens(), engine).parse()
+
+def outcome(evaluate):
+    try:
+        return "value", evaluate()
+    except (RuntimeError, OverflowError) as error:
+        return "error", str(error)
+
+class BackendCases:
+    """Mixin for a backend's unittest.TestCase.
+
+    evaluators(tree) returns callables that evaluate *tree* through the
+    backend; each is checked against the Interpreter.
+    """
+
+    def evaluators(self, tree):
+        raise NotImplementedError
+
+    def assertSameAsInterpreter(self, tree):
+        expected = outcome(lambda: Interpreter().interpret(tree))
+        for evaluate in self.evaluators(tree):
+            result = outcome(evaluate)
+            self.assertEqual(result, expected)
+            self.assertIs(type(result[1]), type(expected[1]))
+
+    def test_values(self):
+        for source in VALUE_SOURCES:
+            with self.subTest(source=source):
+                self.assertSameAsInterpreter(parse(source))
+
+    def test_errors(self):
+        for source in ERROR_SOURCES:
+            with self.subTest(source=source):
+                self.assertSameAsInterpreter(parse(source))
+                self.assertEqual(outcome(self.evaluators(parse(source))[0])[0], "error")
+
+    def test_other_operators(self):
+        comma = Token(TokenType.COMMA, ",")
+        self.assertSameAsInterpreter(Binary(NumberLiteral(1), comma, StringLiteral("a")))
+        self.assertSameAsInterpreter(Unary(comma, NumberLiteral(1)))
+        self.assertSameAsInterpreter(Binary(parse('1 + "a"'), comma, NumberLiteral(1)))
+
+    def test_deep_tree(self):
+        # Too deep for Interpreter.interpret(), so compare with interpret_flat().
+        for source in ("-" * 5000 + "(" * 5000 + "1 + 2" + ")" * 5000,
+                       " - ".join(["(1"] * 3000) + ")" * 3000 + " + 2"):
+            tree = parse(source, "iterative")
+            expected = Interpreter().interpret_flat(FlatTree.from_expr(tree))
+            for evaluate in self.evaluators(tree):
+                self.assertEqual(evaluate(), expected)
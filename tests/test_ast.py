@@ -0,0 +1,80 @@
+# tests/test_ast.py
+
+import pickle
+import unittest
+from ast_1 import FALSE, NIL, TRUE, Binary, BooleanLiteral, Grouping, NodeFactory, NumberLiteral, Unary
+from interpreter import Interpreter
+from interpreter_token import Token, TokenType
+from parse_cache import ParseCache
+from parser import Parser
+from scanner import Scanner
+
+def parse(source):
+    return Parser(Scanner(source).scan_tokens()).parse()
+
+class NodeFactoryTest(unittest.TestCase):
+    def test_nodes_use_slots(self):
+        for node in (parse("1 + -(2)"), TRUE):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_literal_singletons(self):
+        factory = NodeFactory()
+        self.assertIs(factory.boolean(True), TRUE)
+        self.assertIs(factory.boolean(False), FALSE)
+        self.assertIs(factory.nil(), NIL)
+        self.assertIsInstance(TRUE, BooleanLiteral)
+        self.assertIs(factory.intern(parse("nil == true")).left, NIL)
+        with self.assertRaises(AttributeError):
+            TRUE.value = False
+
+    def test_equal_subtrees_are_shared(self):
+        factory = NodeFactory()
+        tree = factory.intern(parse("(1 + 2) * (1 + 2) - -3"))
+        product = tree.left
+        self.assertIs(product.left, product.right)
+        self.assertIs(factory.intern(parse("1 + 2")), product.left.expression)
+        self.assertIs(factory.intern(tree), tree)
+        self.assertIs(factory.intern(parse("5 + 6")).operator, product.left.expression.operator)
+        self.assertEqual(Interpreter().interpret(tree), 12)
+        with self.assertRaises(AttributeError):
+            product.left = None
+
+    def test_distinct_values_stay_apart(self):
+        factory = NodeFactory()
+        self.assertIsNot(factory.number(0.0), factory.number(-0.0))
+        self.assertIsNot(factory.number(1.0), factory.string("1"))
+        self.assertIs(factory.string(""), factory.string(""))
+        minus = Token(TokenType.MINUS, "-")
+        plus = Token(TokenType.PLUS, "+")
+        one = factory.number(1.0)
+        self.assertIsNot(factory.binary(one, minus, one), factory.binary(one, plus, one))
+        self.assertIs(factory.unary(minus, one), factory.unary(Token(TokenType.MINUS, "-", 7), one))
+
+    def test_builders(self):
+        factory = NodeFactory()
+        one = factory.number(1.0)
+        tree = factory.grouping(factory.binary(one, Token(TokenType.STAR, "*"), factory.unary(Token(TokenType.MINUS, "-"), one)))
+        self.assertIsInstance(tree, Grouping)
+        self.assertIsInstance(tree.expression, Binary)
+        self.assertIsInstance(tree.expression.right, Unary)
+        self.assertIsInstance(one, NumberLiteral)
+        self.assertEqual(Interpreter().interpret(tree), -1)
+        self.assertEqual(len(factory), 4)
+
+    def test_deep_tree(self):
+        tree = NodeFactory().intern(Parser(Scanner("-" * 5000 + "1").scan_tokens(), "iterative").parse())
+        for _ in range(5000):
+            tree = tree.right
+        self.assertEqual(tree.value, 1)
+
+    def test_pickle(self):
+        tree = pickle.loads(pickle.dumps(NodeFactory().intern(parse("-(1 + 1)"))))
+        self.assertEqual(tree.operator.lexeme, "-")
+        self.assertIs(type(tree), type(NodeFactory().intern(parse("-1"))))
+
+    def test_cache_with_factory(self):
+        cache = ParseCache(factory=NodeFactory())
+        self.assertIs(cache.parse("(4 / 2) + 1").left, cache.parse("1 - (4 / 2)").right)
+
+if __name__ == '__main__':
+    unittest.main()
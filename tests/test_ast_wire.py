@@ -0,0 +1,83 @@
+# tests/test_ast_wire.py
+
+import math
+import unittest
+import ast_wire
+from ast_1 import Binary, Grouping, NodeFactory, NumberLiteral, StringLiteral, Unary
+from flat_ast import FlatTree
+from interpreter import Interpreter
+from interpreter_token import TokenType
+from parser import Parser
+from scanner import Scanner
+
+def parse(source, engine="recursive"):
+    return Parser(Scanner(source).scan_tokens(), engine).parse()
+
+class AstWireTest(unittest.TestCase):
+    def test_round_trip(self):
+        tree = parse('-(1.5 + 2) * 3 >= 4 == !nil != ("a" + "b" == "ab")')
+        data = ast_wire.dumps(tree)
+        self.assertTrue(data.startswith(ast_wire.MAGIC + bytes([ast_wire.VERSION])))
+        again = ast_wire.loads(data)
+        self.assertEqual(ast_wire.dumps(again), data)
+        self.assertIsInstance(again, Binary)
+        self.assertEqual(again.operator.type, TokenType.BANG_EQUAL)
+        self.assertEqual(again.operator.lexeme, "!=")
+        self.assertIsInstance(again.left.left.left.left, Unary)
+        self.assertIsInstance(again.left.left.left.left.right, Grouping)
+        self.assertEqual(Interpreter().interpret(again), Interpreter().interpret(tree))
+
+    def test_constants(self):
+        for value in (0.0, -0.0, float("inf"), 5e-324, "", "é\ud800", "x" * 300):
+            with self.subTest(value=value):
+                tree = Binary(NumberLiteral(value), parse("1 + 1").operator, StringLiteral(value))
+                again = ast_wire.loads(ast_wire.dumps(tree))
+                self.assertEqual(repr(again.left.value), repr(value))
+                self.assertIs(type(again.right.value), type(value))
+        nan = ast_wire.loads(ast_wire.dumps(NumberLiteral(float("nan"))))
+        self.assertTrue(math.isnan(nan.value))
+        for value in (0, -1, 2 ** 70, -(2 ** 70)):
+            with self.subTest(value=value):
+                self.assertEqual(ast_wire.loads(ast_wire.dumps(NumberLiteral(value))).value, value)
+
+    def test_constants_are_pooled(self):
+        small = ast_wire.dumps(parse('"long string"'))
+        repeated = ast_wire.dumps(parse('"long string" + "long string" + "long string"'))
+        self.assertLess(len(repeated) - len(small), 10)
+
+    def test_many_constants(self):
+        tree = parse(" + ".join(str(number) for number in range(200)))
+        data = ast_wire.dumps(tree)
+        self.assertEqual(Interpreter().interpret(ast_wire.loads(data)), sum(range(200)))
+
+    def test_flat_trees(self):
+        source = "(1 + 2) * -3 != nil"
+        tree = parse(source)
+        flat = Parser(Scanner(source).scan_tokens()).parse_flat()
+        self.assertEqual(ast_wire.dumps(flat), ast_wire.dumps(tree))
+        self.assertEqual(ast_wire.dumps(FlatTree.from_expr(tree)), ast_wire.dumps(tree))
+        loaded = ast_wire.loads_flat(ast_wire.dumps(tree))
+        self.assertEqual(list(loaded.kinds), list(flat.kinds))
+        self.assertEqual(Interpreter().interpret_flat(loaded), True)
+
+    def test_builders(self):
+        shared = ast_wire.loads(ast_wire.dumps(parse("(1 + 1) * (1 + 1)")), NodeFactory())
+        self.assertIs(shared.left, shared.right)
+
+    def test_deep_tree(self):
+        depth = 20_000
+        tree = parse("-" * depth + "1", "iterative")
+        again = ast_wire.loads(ast_wire.dumps(tree))
+        for _ in range(depth):
+            again = again.right
+        self.assertEqual(again.value, 1)
+
+    def test_malformed_data(self):
+        data = ast_wire.dumps(parse("1 + 2"))
+        for bad in (b"", b"XYZ\x01", data[:3] + b"\x09" + data[4:], data[:-1], data + b"\x00", data[:6]):
+            with self.subTest(data=bad):
+                with self.assertRaises(ValueError):
+                    ast_wire.loads(bad)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# tests/test_bytecode.py
+
+import unittest
+from functools import partial
+from ast_1 import Binary, NumberLiteral
+from backend_cases import BackendCases, parse
+from bytecode import ADD, CONSTANT, EXTENDED_ARG, VM, compile_bytecode, disassemble
+from flat_ast import FlatTree
+from interpreter_token import Token, TokenType
+
+class BytecodeTest(BackendCases, unittest.TestCase):
+    def evaluators(self, tree):
+        vm = VM()
+        chunks = (compile_bytecode(tree), compile_bytecode(FlatTree.from_expr(tree)))
+        return [partial(vm.run, chunk) for chunk in chunks for _ in range(2)]
+
+    def test_other_operator_listing(self):
+        comma = Token(TokenType.COMMA, ",")
+        self.assertIn(f"BINARY         {TokenType.COMMA.value} (COMMA)",
+                      disassemble(compile_bytecode(Binary(NumberLiteral(1), comma, NumberLiteral(2)))))
+
+    def test_code_layout(self):
+        chunk = compile_bytecode(parse('-(1 + "a") == !1'))
+        self.assertEqual(chunk.constants, (1, "a"))
+        self.assertEqual(len(chunk), 7)
+        self.assertEqual(disassemble(chunk), "\n".join([
+            "     0 CONSTANT       0 (1)",
+            "     2 CONSTANT       1 ('a')",
+            "     4 ADD",
+            "     6 NEGATE",
+            "     8 CONSTANT       0 (1)",
+            "    10 NOT",
+            "    12 EQUAL",
+        ]))
+
+    def test_extended_arguments(self):
+        tree = parse(" + ".join(f"{n}.5" for n in range(70_000)), "iterative")
+        chunk = compile_bytecode(tree)
+        self.assertEqual(len(chunk.constants), 70_000)
+        self.assertEqual(VM().run(chunk), sum(n + 0.5 for n in range(70_000)))
+        # 69999 is 0x1116f.
+        self.assertEqual(chunk.code[-8:], bytes((EXTENDED_ARG, 0x01, EXTENDED_ARG, 0x11, CONSTANT, 0x6f, ADD, 0)))
+        listing = disassemble(chunk).splitlines()
+        self.assertTrue(listing[-2].endswith("CONSTANT       69999 (69999.5)"))
+
+if __name__ == "__main__":
+    unittest.main()
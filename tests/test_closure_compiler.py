@@ -0,0 +1,35 @@
+# tests/test_closure_compiler.py
+
+import math
+import unittest
+from backend_cases import BackendCases, parse
+from closure_compiler import compile_closure
+from flat_ast import FlatTree
+from parser import Parser
+from scanner import Scanner
+
+class ClosureCompilerTest(BackendCases, unittest.TestCase):
+    def evaluators(self, tree):
+        compiled = compile_closure(tree)
+        return [compiled, compiled, compile_closure(FlatTree.from_expr(tree))]
+
+    def test_nan(self):
+        tree = parse("0.0 / 1 + 1")
+        tree.left.left.value = math.nan
+        self.assertTrue(math.isnan(compile_closure(tree)()))
+
+    def test_compiles_once(self):
+        tree = parse("1 + 2")
+        compiled = compile_closure(tree)
+        tree.left.value = 40
+        self.assertEqual(compiled(), 3)
+        self.assertEqual(compile_closure(tree)(), 42)
+
+    def test_deep_tree(self):
+        # Compiling does not recurse, but calling nests one Python call per level.
+        tree = Parser(Scanner(" + ".join(["1"] * 5000)).scan_tokens(), "iterative").parse()
+        compiled = compile_closure(tree)
+        self.assertTrue(callable(compiled))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# tests/test_codegen.py
+
+import math
+import unittest
+import warnings
+import codegen
+from backend_cases import BackendCases, parse
+from flat_ast import FlatTree
+from interpreter import Interpreter
+from optimizer import fold_constants
+
+class CodegenTest(BackendCases, unittest.TestCase):
+    def evaluators(self, tree):
+        # Generated code must not draw SyntaxWarnings, such as for "is" with a literal.
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            compiled = codegen.compile_python(tree)
+            from_flat = codegen.compile_python(FlatTree.from_expr(tree))
+        return [compiled, compiled, from_flat]
+
+    def test_source(self):
+        source, constants = codegen.to_python(parse("(1 + 2) * -3"))
+        self.assertTrue(source.startswith("def evaluate("))
+        self.assertEqual(source.count("\n    t"), 3)
+        self.assertEqual(constants, {})
+
+    def test_constants_without_literals(self):
+        tree = parse("0.0 + 1 == 2")
+        for value in (math.inf, -math.inf, math.nan):
+            with self.subTest(value=value):
+                tree.left.left.value = value
+                source, constants = codegen.to_python(tree)
+                self.assertEqual(list(constants), ["k0"])
+                self.assertEqual(codegen.compile_python(tree)(), Interpreter().interpret(tree))
+
+    def test_folded_huge_int(self):
+        tree = fold_constants(parse(" * ".join(["1" + "0" * 30] * 200) + " + 1"))
+        source, constants = codegen.to_python(tree)
+        self.assertEqual(list(constants), ["k0"])
+        self.assertEqual(codegen.compile_python(tree)(), 10 ** 6000 + 1)
+
+    def test_code_is_cached(self):
+        first = codegen.compile_python(parse("1 + 2 * 3"))
+        second = codegen.compile_python(parse("(1) + 2 * 3"))
+        self.assertIs(first.__code__, second.__code__)
+        self.assertIsNot(first.__code__, codegen.compile_python(parse("1 + 2 * 4")).__code__)
+        nan = parse("0.0 + 1")
+        nan.left.value = math.nan
+        infinity = parse("0.0 + 1")
+        infinity.left.value = math.inf
+        self.assertIs(codegen.compile_python(nan).__code__, codegen.compile_python(infinity).__code__)
+        self.assertEqual(codegen.compile_python(infinity)(), math.inf)
+
+if __name__ == "__main__":
+    unittest.main()
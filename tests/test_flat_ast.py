@@ -0,0 +1,80 @@
+# tests/test_flat_ast.py
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from ast_1 import Binary, Grouping, NodeFactory, NumberLiteral, StringLiteral, Unary
+from flat_ast import BINARY, GROUPING, NUMBER, UNARY, FlatTree
+from interpreter import Interpreter
+from interpreter_token import TokenType
+from parser import ParseError, Parser
+from scanner import Scanner
+
+def parse_flat(source, engine="recursive"):
+    return Parser(Scanner(source).scan_tokens(), engine).parse_flat()
+
+class FlatTreeTest(unittest.TestCase):
+    def test_layout(self):
+        tree = parse_flat("-(1 + 2) * 1")
+        self.assertEqual(list(tree.kinds), [NUMBER, NUMBER, BINARY, GROUPING, UNARY, NUMBER, BINARY])
+        self.assertEqual(tree.constants, [1.0, 2.0])
+        self.assertEqual(list(tree.lefts), [0, 1, 0, 2, -1, 0, 4])
+        self.assertEqual(list(tree.rights), [-1, -1, 1, -1, 3, -1, 5])
+        self.assertEqual(tree.operators[2], TokenType.PLUS)
+        self.assertEqual(tree.operators[4], TokenType.MINUS)
+        self.assertEqual(tree.root, len(tree) - 1)
+
+    def test_to_expr(self):
+        expression = parse_flat('"a" + "b" == !(nil)').to_expr()
+        self.assertIsInstance(expression, Binary)
+        self.assertEqual(expression.operator.type, TokenType.EQUAL_EQUAL)
+        self.assertEqual(expression.operator.lexeme, "==")
+        self.assertIsInstance(expression.left.left, StringLiteral)
+        self.assertIsInstance(expression.right, Unary)
+        self.assertIsInstance(expression.right.right, Grouping)
+        self.assertIsNone(expression.right.right.expression.value)
+
+    def test_round_trip(self):
+        expression = Parser(Scanner("1 - 2 * (3 / 4) >= -5").scan_tokens()).parse()
+        tree = FlatTree.from_expr(expression)
+        self.assertEqual(list(tree.kinds), list(parse_flat("1 - 2 * (3 / 4) >= -5").kinds))
+        again = tree.to_expr()
+        self.assertIsInstance(again.left.right.right.expression.left, NumberLiteral)
+        self.assertEqual(Interpreter().interpret(again), Interpreter().interpret(expression))
+
+    def test_to_expr_with_factory(self):
+        factory = NodeFactory()
+        expression = parse_flat("(1 + 1) * (1 + 1)").to_expr(factory)
+        self.assertIs(expression.left, expression.right)
+
+    def test_interpret_flat(self):
+        interpreter = Interpreter()
+        for source, value in (("1 + 2 * 3", 7), ('"a" + "b"', "ab"), ("!(1 < 2)", False),
+                              ("nil == nil", True), ("-(10 / 4)", -2.5), ("0 != -0", False)):
+            with self.subTest(source=source):
+                self.assertEqual(interpreter.interpret_flat(parse_flat(source)), value)
+
+    def test_interpret_flat_errors(self):
+        interpreter = Interpreter()
+        for source in ("1 / 0", '-"a"', '1 + "a"', '"a" < 1'):
+            with self.subTest(source=source):
+                with self.assertRaises(RuntimeError) as flat:
+                    interpreter.interpret_flat(parse_flat(source))
+                with self.assertRaises(RuntimeError) as tree:
+                    interpreter.interpret(Parser(Scanner(source).scan_tokens()).parse())
+                self.assertEqual(str(flat.exception), str(tree.exception))
+
+    def test_parse_errors(self):
+        with redirect_stdout(io.StringIO()):
+            with self.assertRaises(ParseError) as error:
+                parse_flat("(1 +")
+        self.assertEqual(error.exception.message, "Expect expression after operator.")
+
+    def test_deep_expression(self):
+        depth = 50_000
+        tree = parse_flat("(" * depth + "1" + ")" * depth + " + 1" * depth, "pratt")
+        self.assertEqual(len(tree), 3 * depth + 1)
+        self.assertEqual(Interpreter().interpret_flat(tree), depth + 1)
+
+if __name__ == '__main__':
+    unittest.main()
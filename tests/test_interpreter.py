@@ -3,6 +3,8 @@ from scanner import Scanner
 from parser import Parser
 from interpreter import Interpreter
 from ast_1 import BooleanLiteral, NilLiteral
+import interpreter
+from interpreter_token import TokenType
 
 class InterpreterTest(unittest.TestCase):
     def test_evaluate_true(self):
@@ -631,4 +633,40 @@ class InterpreterTest(unittest.TestCase):
         interpreter = Interpreter()
         with self.assertRaises(RuntimeError) as context:
             interpreter.interpret(expression)
-        self.assertEqual(str(context.exception), "Operands must be either both numbers or both strings for '+' operator. Got '<class 'NoneType'>' and '<class 'str'>'.")
\ No newline at end of file
+        self.assertEqual(str(context.exception), "Operands must be either both numbers or both strings for '+' operator. Got '<class 'NoneType'>' and '<class 'str'>'.")
+
+class DispatchTest(unittest.TestCase):
+    def test_booleans_are_numbers(self):
+        for operator in (TokenType.PLUS, TokenType.MINUS, TokenType.LESS, TokenType.EQUAL_EQUAL):
+            for left, right in ((bool, int), (int, bool), (bool, float), (bool, bool)):
+                self.assertIn((operator, left, right), interpreter._BINARY_HANDLERS)
+        self.assertIn((TokenType.MINUS, bool), interpreter._UNARY_HANDLERS)
+        evaluator = Interpreter()
+        self.assertEqual(evaluator._binary(TokenType.PLUS, True, 1), 2)
+        self.assertEqual(evaluator._binary(TokenType.STAR, 2.5, False), 0)
+        self.assertIs(evaluator._binary(TokenType.LESS, False, True), True)
+        self.assertEqual(evaluator._unary(TokenType.MINUS, True), -1)
+        with self.assertRaises(RuntimeError) as context:
+            evaluator._binary(TokenType.DIVIDE, 1, False)
+        self.assertEqual(str(context.exception), "Division by zero.")
+
+    def test_other_types_are_resolved_once(self):
+        class Text(str):
+            pass
+        evaluator = Interpreter()
+        key = (TokenType.PLUS, Text, str)
+        self.assertNotIn(key, interpreter._BINARY_HANDLERS)
+        self.assertEqual(evaluator._binary(TokenType.PLUS, Text("a"), "b"), "ab")
+        handler = interpreter._BINARY_HANDLERS[key]
+        self.assertEqual(evaluator._binary(TokenType.PLUS, Text("c"), "d"), "cd")
+        self.assertIs(interpreter._BINARY_HANDLERS[key], handler)
+        with self.assertRaises(RuntimeError) as context:
+            evaluator._binary(TokenType.MINUS, Text("a"), 1)
+        self.assertEqual(str(context.exception), f"Operands must be numbers for '-' operator. Got '{Text}' and '<class 'int'>'.")
+        self.assertIs(evaluator._unary(TokenType.BANG, Text("")), False)
+        self.assertIs(evaluator._unary(TokenType.BANG, []), False)
+
+    def test_other_operators(self):
+        evaluator = Interpreter()
+        self.assertIsNone(evaluator._binary(TokenType.COMMA, 1, "a"))
+        self.assertIsNone(evaluator._unary(TokenType.PLUS, 1))
@@ -0,0 +1,38 @@
+# tests/test_line_index.py
+
+import unittest
+from line_index import LineIndex
+
+class LineIndexTest(unittest.TestCase):
+    SOURCE = "ab\ncd\n\nefg"
+
+    def test_line(self):
+        index = LineIndex(self.SOURCE)
+        self.assertEqual([index.line(offset) for offset in range(len(self.SOURCE) + 1)],
+                         [1, 1, 1, 2, 2, 2, 3, 4, 4, 4, 4])
+
+    def test_column(self):
+        index = LineIndex(self.SOURCE)
+        self.assertEqual([index.column(offset) for offset in range(len(self.SOURCE) + 1)],
+                         [1, 2, 3, 1, 2, 3, 1, 1, 2, 3, 4])
+
+    def test_built_lazily(self):
+        index = LineIndex(self.SOURCE)
+        self.assertIsNone(index._newlines)
+        index.line(4)
+        self.assertEqual(list(index._newlines), [2, 5, 6])
+
+    def test_start_and_first_line(self):
+        index = LineIndex(self.SOURCE, start=3, first_line=10)
+        self.assertEqual(index.line(3), 10)
+        self.assertEqual(index.line(8), 12)
+        self.assertEqual(index.column(4), 2)
+
+    def test_bytes_source(self):
+        source = "é\nx".encode()
+        index = LineIndex(memoryview(source))
+        self.assertEqual(index.line(3), 2)
+        self.assertEqual(index.column(2), 3)
+
+if __name__ == '__main__':
+    unittest.main()
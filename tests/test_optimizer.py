@@ -0,0 +1,63 @@
+# tests/test_optimizer.py
+
+import unittest
+from ast_1 import (Binary, BooleanLiteral, Grouping, Literal, NilLiteral, NodeFactory, NumberLiteral,
+                   StringLiteral, Unary)
+from backend_cases import BackendCases, parse
+from interpreter import Interpreter
+from interpreter_token import Token, TokenType
+from optimizer import fold_constants
+
+class ConstantFoldingTest(BackendCases, unittest.TestCase):
+    def evaluators(self, tree):
+        return [lambda: Interpreter().interpret(fold_constants(tree))]
+
+    def assertFoldsTo(self, source, cls, value):
+        folded = fold_constants(parse(source))
+        self.assertIs(type(folded), cls)
+        self.assertEqual(folded.value, value)
+        self.assertIs(type(folded.value), type(value))
+
+    def test_folds_literal_operations(self):
+        self.assertFoldsTo("(2 * 3) + (10 / 4) - -1", NumberLiteral, 9.5)
+        self.assertFoldsTo('"a" + ("b" + "c")', StringLiteral, "abc")
+        self.assertFoldsTo("1 < 2 == !nil", BooleanLiteral, True)
+        self.assertFoldsTo("true + 1", NumberLiteral, 2)
+        self.assertFoldsTo("((nil))", NilLiteral, None)
+        self.assertFoldsTo("((4))", NumberLiteral, 4)
+
+    def test_errors_stay_unfolded(self):
+        tree = fold_constants(parse('(2 * 3) + (1 / (2 - 2)) * ("a" - 1)'))
+        self.assertIsInstance(tree, Binary)
+        self.assertEqual(tree.left.value, 6)
+        division = tree.right.left
+        self.assertIsInstance(division, Binary)
+        self.assertEqual(division.operator.type, TokenType.DIVIDE)
+        self.assertIsInstance(division.right, NumberLiteral)
+        self.assertEqual(division.right.value, 0)
+        self.assertIsInstance(tree.right.right, Binary)
+        for node in (tree, tree.right, division):
+            self.assertNotIsInstance(node, Grouping)
+
+    def test_other_operators_fold(self):
+        comma = Token(TokenType.COMMA, ",")
+        folded = fold_constants(Binary(NumberLiteral(1), comma, Unary(comma, StringLiteral("a"))))
+        self.assertIsInstance(folded, NilLiteral)
+        folded = fold_constants(Grouping(Literal(object)))
+        self.assertIs(type(folded), Literal)
+        self.assertIs(folded.value, object)
+
+    def test_through_factory(self):
+        factory = NodeFactory()
+        folded = fold_constants(parse("(1 + 2) * (4 / 0)"), factory)
+        self.assertIs(folded.left, factory.number(3))
+        self.assertIs(folded, factory.intern(folded))
+
+    def test_deep_tree_folds(self):
+        tree = parse("-" * 5000 + "(" * 5000 + "1 + 2" + ")" * 5000, "iterative")
+        folded = fold_constants(tree)
+        self.assertIsInstance(folded, NumberLiteral)
+        self.assertEqual(folded.value, 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+# tests/test_parse_cache.py
+
+import copy
+import io
+import pickle
+import threading
+import unittest
+from contextlib import redirect_stdout
+from ast_1 import Binary, NodeFactory, NumberLiteral, freeze
+from interpreter import Interpreter
+from parse_cache import ParseCache, tree_size
+from parser import ParseError, Parser
+from pipeline import Pipeline
+from scanner import Scanner
+
+class FreezeTest(unittest.TestCase):
+    def test_frozen_tree_is_immutable(self):
+        tree = freeze(Parser(Scanner("-(1 + 2) * 3").scan_tokens()).parse())
+        self.assertIsInstance(tree, Binary)
+        self.assertIsInstance(tree.right, NumberLiteral)
+        with self.assertRaises(AttributeError):
+            tree.left = None
+        with self.assertRaises(AttributeError):
+            del tree.right.value
+        with self.assertRaises(AttributeError):
+            tree.operator.lexeme = "+"
+        with self.assertRaises(AttributeError):
+            tree.left.right.expression.left.value = 5
+        self.assertEqual(tree.operator.line, 1)
+        self.assertEqual(Interpreter().interpret(tree), -9)
+
+    def test_copies_stay_frozen(self):
+        tree = freeze(Parser(Scanner("1 + 2").scan_tokens()).parse())
+        for clone in (pickle.loads(pickle.dumps(tree)), copy.deepcopy(tree)):
+            self.assertIs(type(clone), type(tree))
+            self.assertEqual(clone.operator.lexeme, "+")
+            with self.assertRaises(AttributeError):
+                clone.left = None
+
+class ParseCacheTest(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = ParseCache()
+        tree = cache.parse("1 + 2")
+        self.assertIs(cache.parse("1 + 2"), tree)
+        cache.parse("3")
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.evictions, info.currsize), (1, 2, 0, 2))
+        self.assertIn("3", cache)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.info().bytes, 0)
+
+    def test_evicts_least_recently_used(self):
+        cache = ParseCache(maxsize=2)
+        cache.parse("1")
+        cache.parse("2")
+        cache.parse("1")
+        cache.parse("3")
+        self.assertIn("1", cache)
+        self.assertNotIn("2", cache)
+        self.assertEqual(cache.info().evictions, 1)
+
+    def test_memory_cap(self):
+        size = tree_size(Parser(Scanner("1 + 2").scan_tokens()).parse())
+        cache = ParseCache(max_bytes=3 * size)
+        for number in range(10):
+            cache.parse(f"{number} + {number}")
+        info = cache.info()
+        self.assertLessEqual(info.bytes, 3 * size)
+        self.assertLess(info.currsize, 10)
+        self.assertEqual(info.evictions, 10 - info.currsize)
+        tiny = ParseCache(max_bytes=1)
+        self.assertEqual(tiny.parse("1").value, 1)
+        self.assertEqual(len(tiny), 0)
+
+    def test_errors_are_not_cached(self):
+        cache = ParseCache()
+        with redirect_stdout(io.StringIO()):
+            with self.assertRaises(ParseError):
+                cache.parse("(1")
+        self.assertEqual(len(cache), 0)
+
+    def test_threads_share_trees(self):
+        cache = ParseCache(maxsize=8)
+        sources = [f"{number} * 2" for number in range(16)]
+        results = []
+        def work():
+            results.append([Interpreter().interpret(cache.parse(source)) for source in sources * 20])
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expected = [number * 2 for number in range(16)] * 20
+        self.assertEqual(results, [expected] * 4)
+        info = cache.info()
+        self.assertEqual(info.hits + info.misses, 4 * 320)
+        self.assertLessEqual(info.currsize, 8)
+
+    def test_pipeline_uses_cache(self):
+        cache = ParseCache()
+        pipeline = Pipeline(cache=cache)
+        self.assertEqual(pipeline.evaluate("2 * 3"), 6)
+        self.assertEqual(pipeline.evaluate("2 * 3"), 6)
+        self.assertEqual(cache.info().hits, 1)
+
+    def test_optimize(self):
+        for factory in (None, NodeFactory()):
+            with self.subTest(factory=factory):
+                cache = ParseCache(factory=factory, optimize=True)
+                tree = cache.parse("(2 * 3) + 1 / (1 - 1)")
+                self.assertIsInstance(tree, Binary)
+                self.assertEqual(tree.left.value, 6)
+                self.assertIsInstance(tree.right, Binary)
+                with self.assertRaises(AttributeError):
+                    tree.left.value = 7
+                self.assertEqual(Pipeline(cache=cache).evaluate("(2 * 3) + 1"), 7)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ParseCache(maxsize=0)
+        with self.assertRaises(ValueError):
+            ParseCache(parser_engine="fast")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 # tests/test_parser.py
 
+import sys
 import unittest
 from scanner import Scanner
 from parser import Parser, ParseError
@@ -471,6 +472,15 @@ class ParserTest(unittest.TestCase):
         self.assertIsInstance(expression.right.right, NumberLiteral)
         self.assertEqual(expression.right.right.value, 2)
     
+    def test_reset(self):
+        parser = Parser(Scanner("1 +").scan_tokens())
+        with self.assertRaises(ParseError):
+            parser.parse()
+        parser.reset(Scanner("2 * 3").scan_tokens())
+        expression = parser.parse()
+        self.assertIsInstance(expression, Binary)
+        self.assertEqual(expression.operator.type, TokenType.STAR)
+
     def test_parse_empty_grouping(self): # Moved to ParserErrorTest
         pass
 
@@ -510,11 +520,172 @@ class ParserErrorTest(unittest.TestCase):
     def test_missing_operator(self):
         self.assertParseError("1 2", "Expect operator after expression.")
 
+    def test_error_position(self):
+        parser = Parser(Scanner("(1 +\n  2\n  3)").scan_tokens())
+        with self.assertRaises(ParseError) as context:
+            parser.parse()
+        self.assertEqual((context.exception.line, context.exception.column), (3, 3))
+        self.assertIn("ParseError at line 3", str(context.exception))
+
     def test_parse_empty_grouping(self): # Moved from ParserTest
         self.assertParseError("()", "Expect expression.")
 
     def test_parse_unclosed_grouping(self): # Moved from ParserTest
         self.assertParseError("(true", "Expect ')' after expression.")
 
+class PrattParserTest(unittest.TestCase):
+    ENGINE = "pratt"
+    SOURCES = [
+        "1", '"s"', "true", "false", "nil", "-1", "!!true", "--2",
+        "1 + 2 * 3 - 4 / 5", "1 - 2 - 3", "8 / 4 / 2", "-1 * -2",
+        "1 < 2 == 3 >= 4", "!(1 + 2) != (3)", "((1))", "1 == 2 != 3 == 4",
+        '"a" + "b" <= "c"', "1 + 2 < 3 * 4 == !false",
+    ]
+    ERRORS = ["", "1 +", "1 -", "1 *", "(1 + 2", "()", "1 2", "1 + 2 )",
+              "(1 2)", "(1 +)", "x", "1 + x", "!", "(", ")", "1 == == 2"]
+
+    def dump(self, expression):
+        if isinstance(expression, Binary):
+            return (self.dump(expression.left), expression.operator.lexeme, self.dump(expression.right))
+        if isinstance(expression, Unary):
+            return (expression.operator.lexeme, self.dump(expression.right))
+        if isinstance(expression, Grouping):
+            return ("group", self.dump(expression.expression))
+        return (type(expression).__name__, expression.value)
+
+    def outcome(self, source, engine):
+        parser = Parser(Scanner(source).scan_tokens(), engine)
+        try:
+            return self.dump(parser.parse())
+        except ParseError as error:
+            return (error.message, error.token.type, error.token.start, str(error))
+
+    def test_same_trees_as_recursive_descent(self):
+        for source in self.SOURCES:
+            with self.subTest(source=source):
+                self.assertEqual(self.outcome(source, self.ENGINE), self.outcome(source, "recursive"))
+
+    def test_same_errors_as_recursive_descent(self):
+        for source in self.ERRORS:
+            with self.subTest(source=source):
+                outcome = self.outcome(source, self.ENGINE)
+                self.assertTrue(outcome[0].startswith("Expect"))
+                self.assertEqual(outcome, self.outcome(source, "recursive"))
+
+    def test_precedence_and_associativity(self):
+        self.assertEqual(self.outcome("1 - 2 * 3 - 4", self.ENGINE),
+                         ((("NumberLiteral", 1), "-", (("NumberLiteral", 2), "*", ("NumberLiteral", 3))),
+                          "-", ("NumberLiteral", 4)))
+
+    def test_token_buffer(self):
+        buffer = Scanner("1 + 2 * (3 - 4)").scan_buffer()
+        expression = Parser(buffer, self.ENGINE).parse()
+        self.assertEqual(self.dump(expression), self.outcome("1 + 2 * (3 - 4)", "recursive"))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Parser([], "lalr")
+
+class IterativeParserTest(PrattParserTest):
+    ENGINE = "iterative"
+    DEPTH = 20 * sys.getrecursionlimit()
+
+    def test_deep_parentheses(self):
+        source = "(" * self.DEPTH + "1" + ")" * self.DEPTH
+        expression = Parser(Scanner(source, "regex").scan_tokens(), self.ENGINE).parse()
+        for _ in range(self.DEPTH):
+            self.assertIsInstance(expression, Grouping)
+            expression = expression.expression
+        self.assertEqual(expression.value, 1)
+
+    def test_deep_prefix_chain(self):
+        source = "!-" * self.DEPTH + "2"
+        expression = Parser(Scanner(source, "regex").scan_tokens(), self.ENGINE).parse()
+        operators = []
+        while isinstance(expression, Unary):
+            operators.append(expression.operator.type)
+            expression = expression.right
+        self.assertEqual(operators, [TokenType.BANG, TokenType.MINUS] * self.DEPTH)
+        self.assertEqual(expression.value, 2)
+
+    def test_deep_right_nested_sum(self):
+        source = "(1 + " * self.DEPTH + "1" + ")" * self.DEPTH
+        expression = Parser(Scanner(source, "regex").scan_tokens(), self.ENGINE).parse()
+        depth = 0
+        while isinstance(expression, Grouping):
+            self.assertEqual(expression.expression.operator.type, TokenType.PLUS)
+            expression = expression.expression.right
+            depth += 1
+        self.assertEqual(depth, self.DEPTH)
+
+    def test_deep_unclosed_parentheses(self):
+        tokens = Scanner("(" * self.DEPTH + "1", "regex").scan_tokens()
+        with self.assertRaises(ParseError) as context:
+            Parser(tokens, self.ENGINE).parse()
+        self.assertEqual(context.exception.message, "Expect ')' after expression.")
+        self.assertEqual(context.exception.token.type, TokenType.EOF)
+
+class ParseManyTest(unittest.TestCase):
+    SOURCE = "1 + 2; !true\n(3 *\n\n;; 4 5\n-1"
+
+    def test_expressions_and_errors(self):
+        for engine in Parser.ENGINES:
+            with self.subTest(engine=engine):
+                result = Parser(Scanner(self.SOURCE).scan_tokens(), engine).parse_many()
+                expressions, errors = result
+                self.assertEqual(len(expressions), 5)
+                self.assertIsInstance(expressions[0], Binary)
+                self.assertIsInstance(expressions[1], Unary)
+                self.assertIsNone(expressions[2])
+                self.assertIsNone(expressions[3])
+                self.assertIsInstance(expressions[4], Unary)
+                self.assertEqual([(error.message, error.line) for error in errors],
+                                 [("Expect expression.", 2), ("Expect operator after expression.", 4)])
+                self.assertEqual(errors[1].token.lexeme, "5")
+
+    def test_token_buffer(self):
+        scanner = Scanner("1 +\n2 3; 4")
+        expected = Parser(scanner.scan_tokens()).parse_many()
+        result = Parser(Scanner("1 +\n2 3; 4").scan_buffer()).parse_many()
+        self.assertEqual([error.message for error in result.errors], [error.message for error in expected.errors])
+        self.assertEqual([error.line for error in result.errors], [1, 2])
+        self.assertEqual(result.expressions[2].value, 4)
+
+    def test_token_containers_agree(self):
+        for source in ('"a\nb" ; 2', '"a\nb"\n2', '"a\nb" 2\n3', '1 +\n2 3; 4', '"a\n"\n\n"b\n" 1'):
+            results = []
+            for scan in (Scanner.scan_tokens, Scanner.scan_buffer, Scanner.iter_tokens):
+                expressions, errors = Parser(scan(Scanner(source, errors="collect"))).parse_many()
+                results.append(([type(expression).__name__ for expression in expressions],
+                                [(error.message, error.line) for error in errors]))
+            with self.subTest(source=source):
+                self.assertEqual(results[1], results[0])
+                self.assertEqual(results[2], results[0])
+
+    def test_semicolons_only(self):
+        expressions, errors = Parser(Scanner("1 +\n2; (3\n)").scan_tokens()).parse_many(newlines=False)
+        self.assertEqual(errors, [])
+        self.assertIsInstance(expressions[0], Binary)
+        self.assertEqual(expressions[0].right.value, 2)
+        self.assertIsInstance(expressions[1], Grouping)
+
+    def test_does_not_print(self):
+        from io import StringIO
+        from contextlib import redirect_stdout
+        with redirect_stdout(StringIO()) as output:
+            result = Parser(Scanner("(\n)").scan_tokens()).parse_many()
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(len(result.errors), 2)
+
+    def test_empty(self):
+        self.assertEqual(Parser(Scanner(" ;\n; ").scan_tokens()).parse_many(), ([], []))
+
+    def test_parser_is_left_at_end(self):
+        tokens = Scanner("1; 2").scan_tokens()
+        parser = Parser(tokens)
+        parser.parse_many()
+        self.assertIs(parser.tokens, tokens)
+        self.assertEqual(parser.current, len(tokens) - 1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,49 @@
+# tests/test_pipeline.py
+
+import threading
+import unittest
+from parser import ParseError
+from pipeline import Pipeline, evaluate, get_pipeline
+
+class PipelineTest(unittest.TestCase):
+    def test_evaluate(self):
+        pipeline = Pipeline()
+        self.assertEqual(pipeline.evaluate("1 + 2 * 3"), 7)
+        self.assertEqual(pipeline.evaluate('"a" + "b"'), "ab")
+        self.assertIs(pipeline.evaluate("!(1 < 2)"), False)
+
+    def test_reuses_objects(self):
+        pipeline = Pipeline("regex")
+        scanner, parser = pipeline.scanner, pipeline.parser
+        pipeline.evaluate("1")
+        pipeline.evaluate("2")
+        self.assertIs(pipeline.scanner, scanner)
+        self.assertIs(pipeline.parser, parser)
+        self.assertEqual(scanner.engine, "regex")
+
+    def test_recovers_after_errors(self):
+        pipeline = Pipeline()
+        with self.assertRaises(ParseError):
+            pipeline.evaluate("(1 +")
+        with self.assertRaises(RuntimeError):
+            pipeline.evaluate("1 / 0")
+        self.assertEqual(pipeline.evaluate("4 - 1"), 3)
+
+    def test_pool_is_per_thread(self):
+        self.assertIs(get_pipeline(), get_pipeline())
+        self.assertIsNot(get_pipeline(), get_pipeline("regex"))
+        other = []
+        thread = threading.Thread(target=lambda: other.append(get_pipeline()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], get_pipeline())
+
+    def test_module_evaluate(self):
+        self.assertEqual(evaluate("10 / 4"), 2.5)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            get_pipeline("fast")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,8 +3,11 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+import tempfile
 import unittest
-from scanner import Scanner
+from concurrent.futures import ProcessPoolExecutor
+from scanner import Diagnostic, Scanner
 from interpreter_token import TokenType
 
 class ScannerTest(unittest.TestCase):
@@ -304,5 +307,462 @@ class ScannerTest(unittest.TestCase):
         self.assertEqual(tokens[1].lexeme, "whileLoop")
         self.assertEqual(tokens[2].type, TokenType.EOF)
 
+class ResetTest(unittest.TestCase):
+    def test_reset_scans_new_source(self):
+        for engine in Scanner.ENGINES:
+            with self.subTest(engine=engine):
+                scanner = Scanner("a\nb", engine)
+                first = scanner.scan_tokens()
+                scanner.reset("1 + 2")
+                second = scanner.scan_tokens()
+                self.assertIsNot(first, second)
+                self.assertEqual([t.lexeme for t in first], ["a", "b", ""])
+                self.assertEqual([(t.lexeme, t.line) for t in second], [("1", 1), ("+", 1), ("2", 1), ("", 1)])
+
+    def test_reset_after_error(self):
+        scanner = Scanner("@")
+        with self.assertRaises(Exception):
+            scanner.scan_tokens()
+        scanner.reset("x")
+        self.assertEqual([t.type for t in scanner.scan_tokens()], [TokenType.IDENTIFIER, TokenType.EOF])
+
+    def test_keywords_shared(self):
+        self.assertIs(Scanner("").keywords, Scanner("x").keywords)
+
+class RegexEngineTest(unittest.TestCase):
+    SOURCES = [
+        "",
+        "(){},;",
+        "== = != ! <= < >= >",
+        "a / b // trailing comment\nc",
+        "/* block\ncomment */ x = 10;",
+        '"Hello, World!" "He said \\"Hi\\"!" "tab\\tnew\\nline\\q"',
+        "123 45.67 0.001 .5 5. 1.2.3",
+        "if else while true false nil ifelse whileLoop _value count123",
+        "var1   var_two\tvar3\n_var4\r\n",
+        "caf\u00e9 = \u00e9t\u00e9;",
+    ]
+
+    def tokens(self, source, engine):
+        return [(t.type, t.lexeme, t.line, t.literal)
+                for t in Scanner(source, engine=engine).scan_tokens()]
+
+    def error(self, source, engine):
+        with self.assertRaises(Exception) as context:
+            Scanner(source, engine=engine).scan_tokens()
+        return str(context.exception)
+
+    def test_matches_classic_engine(self):
+        for source in self.SOURCES:
+            with self.subTest(source=source):
+                self.assertEqual(self.tokens(source, "regex"), self.tokens(source, "classic"))
+
+    def test_line_numbers_across_skipped_regions(self):
+        tokens = Scanner("a\n// c\n/* d\n e */ b\n\n c", engine="regex").scan_tokens()
+        self.assertEqual([t.line for t in tokens], [1, 4, 6, 6])
+
+    def test_lexical_errors_match_classic_engine(self):
+        for source in ["1 $ 2", "a\n\n@", '"unterminated', '"broken\nstring"',
+                       "/* never closed\n", ". 5", "1\u00b2"]:
+            with self.subTest(source=source):
+                message = self.error(source, "regex")
+                self.assertIn("Lexical Error", message)
+                self.assertEqual(message, self.error(source, "classic"))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Scanner("1", engine="fortran")
+
+class IterTokensTest(unittest.TestCase):
+    SOURCE = ('var greeting = "Hello, \\"World\\"!"; // comment\n'
+              '/* a block\n   comment */ total = 12.5 >= count_2;\n'
+              'print greeting != nil;')
+
+    def tokens(self, tokens):
+        return [(t.type, t.lexeme, t.line, t.literal) for t in tokens]
+
+    def test_yields_same_tokens_as_scan_tokens(self):
+        expected = self.tokens(Scanner(self.SOURCE).scan_tokens())
+        self.assertEqual(self.tokens(Scanner(self.SOURCE).iter_tokens()), expected)
+
+    def test_ends_with_eof(self):
+        tokens = list(Scanner("").iter_tokens())
+        self.assertEqual(len(tokens), 1)
+        self.assertEqual(tokens[0].type, TokenType.EOF)
+
+    def test_stream_in_small_chunks(self):
+        expected = self.tokens(Scanner(self.SOURCE).scan_tokens())
+        for chunk_size in (1, 2, 3, 5, 8, 64):
+            with self.subTest(chunk_size=chunk_size):
+                scanner = Scanner(io.StringIO(self.SOURCE))
+                self.assertEqual(self.tokens(scanner.iter_tokens(chunk_size=chunk_size)), expected)
+
+    def test_scan_tokens_on_stream(self):
+        tokens = Scanner(io.StringIO("a == b")).scan_tokens()
+        self.assertEqual([t.type for t in tokens],
+                         [TokenType.IDENTIFIER, TokenType.EQUAL_EQUAL, TokenType.IDENTIFIER, TokenType.EOF])
+
+    def test_is_lazy(self):
+        stream = io.StringIO("first " + "x " * 10000)
+        tokens = Scanner(stream).iter_tokens(chunk_size=16)
+        self.assertEqual(next(tokens).lexeme, "first")
+        self.assertLess(stream.tell(), 100)
+
+    def test_block_comment_longer_than_chunk(self):
+        source = "/*" + "*\n" * 50 + "*/ a"
+        tokens = list(Scanner(io.StringIO(source)).iter_tokens(chunk_size=4))
+        self.assertEqual(tokens[0].lexeme, "a")
+        self.assertEqual(tokens[0].line, 51)
+
+    def test_errors_in_stream(self):
+        for source in ['"unterminated', "/* never closed\n\n", "a\n@"]:
+            with self.subTest(source=source):
+                with self.assertRaises(Exception) as expected:
+                    Scanner(source).scan_tokens()
+                with self.assertRaises(Exception) as context:
+                    list(Scanner(io.StringIO(source)).iter_tokens(chunk_size=2))
+                self.assertEqual(str(context.exception), str(expected.exception))
+
+    def test_unterminated_comment_collected_in_chunks(self):
+        def tokens(tokens):
+            return [(t.type, t.lexeme, t.line, t.literal, t.start, t.end) for t in tokens]
+
+        for source in ["/*- ", "a\n/* x\ny \nzzzz"]:
+            expected = tokens(Scanner(source, errors="collect").scan_tokens())
+            for chunk_size in (1, 2, 3, 5, 100):
+                with self.subTest(source=source, chunk_size=chunk_size):
+                    scanner = Scanner(io.StringIO(source), errors="collect")
+                    self.assertEqual(tokens(scanner.iter_tokens(chunk_size=chunk_size)), expected)
+                    self.assertEqual(len(scanner.diagnostics), 1)
+
+class EncodedSourceTest(unittest.TestCase):
+    SOURCE = ('var caf\u00e9 = "na\u00efve \\"quote\\"";\n'
+              '/* \u00fcber */ print caf\u00e9 + 1.5 >= .5; // \u2603\n'
+              'x\u00b2 = "\u00e9t\u00e9";')
+
+    def tokens(self, tokens):
+        return [(t.type, t.lexeme, t.line, t.literal) for t in tokens]
+
+    def scan_file(self, text, errors="raise"):
+        with tempfile.NamedTemporaryFile('wb', delete=False) as file:
+            file.write(text.encode('utf-8'))
+        self.addCleanup(os.unlink, file.name)
+        return Scanner.from_file(file.name, errors=errors)
+
+    def test_bytes_match_decoded_source(self):
+        expected = self.tokens(Scanner(self.SOURCE).scan_tokens())
+        for source in (self.SOURCE.encode(), memoryview(self.SOURCE.encode())):
+            with self.subTest(type=type(source).__name__):
+                self.assertEqual(self.tokens(Scanner(source).scan_buffer()), expected)
+                self.assertEqual(self.tokens(Scanner(source).scan_tokens()), expected)
+
+    def test_from_file_uses_byte_offsets(self):
+        buffer = self.scan_file('"\u00e9" caf\u00e9').scan_buffer()
+        self.assertEqual(list(buffer.starts), [0, 5, 10])
+        self.assertEqual(buffer.lexeme(1), "caf\u00e9")
+        self.assertEqual(buffer.literal(0), "\u00e9")
+
+    def test_from_file_matches_decoded_source(self):
+        expected = self.tokens(Scanner(self.SOURCE).scan_tokens())
+        self.assertEqual(self.tokens(self.scan_file(self.SOURCE).scan_buffer()), expected)
+
+    def test_from_file_collects_errors(self):
+        scanner = self.scan_file("1 $ 2", errors="collect")
+        buffer = scanner.scan_buffer()
+        self.assertEqual([buffer.type(index) for index in range(len(buffer))],
+                         [TokenType.NUMBER, TokenType.ERROR, TokenType.NUMBER, TokenType.EOF])
+        self.assertEqual(len(scanner.diagnostics), 1)
+
+    def test_empty_file(self):
+        tokens = self.scan_file("").scan_tokens()
+        self.assertEqual([t.type for t in tokens], [TokenType.EOF])
+
+    def test_lexical_errors(self):
+        for source in ["1 $ 2", '"unterminated', "a /* never closed\n", "\u00e9 \u2603"]:
+            with self.subTest(source=source):
+                with self.assertRaises(Exception) as expected:
+                    Scanner(source).scan_tokens()
+                with self.assertRaises(Exception) as context:
+                    Scanner(source.encode()).scan_buffer()
+                self.assertEqual(str(context.exception), str(expected.exception))
+
+class BulkScanningTest(unittest.TestCase):
+    def test_long_string_literal(self):
+        body = "lorem ipsum " * 20000
+        tokens = Scanner('"' + body + '"').scan_tokens()
+        self.assertEqual(tokens[0].literal, body)
+
+    def test_escape_sequences(self):
+        cases = {
+            r'"a\nb"': "a\nb",
+            r'"a\tb"': "a\tb",
+            r'"say \"hi\""': 'say "hi"',
+            r'"back\\slash"': "back\\slash",
+            r'"\\n"': "\\n",
+            r'"\\\n"': "\\\n",
+            r'"\q"': "\\q",
+        }
+        for source, literal in cases.items():
+            with self.subTest(source=source):
+                self.assertEqual(Scanner(source).scan_tokens()[0].literal, literal)
+
+    def test_large_block_comment_counts_lines(self):
+        header = "/*\n" + "Licensed under the MIT License.\n" * 5000 + "*/\nx"
+        tokens = Scanner(header).scan_tokens()
+        self.assertEqual(tokens[0].lexeme, "x")
+        self.assertEqual(tokens[0].line, 5003)
+
+    def test_whitespace_run_counts_lines(self):
+        tokens = Scanner("a \t\r\n\n  \n\tb").scan_tokens()
+        self.assertEqual(tokens[1].line, 4)
+
+    def test_comment_at_end_of_input(self):
+        tokens = Scanner("a // trailing").scan_tokens()
+        self.assertEqual([t.type for t in tokens], [TokenType.IDENTIFIER, TokenType.EOF])
+
+    def test_trailing_backslash_is_unterminated(self):
+        with self.assertRaises(Exception) as context:
+            Scanner('"abc\\').scan_tokens()
+        self.assertIn("Unterminated string literal", str(context.exception))
+
+    def test_newline_in_string_reports_next_line(self):
+        with self.assertRaises(Exception) as context:
+            Scanner('"abc\ndef"').scan_tokens()
+        self.assertIn("line 2", str(context.exception))
+
+class RelexTest(unittest.TestCase):
+    SOURCE = 'var total = count + 1;\nprint "sum: " + total; // done\nx = y;'
+
+    def layout(self, buffer):
+        return (list(buffer.kinds), list(buffer.starts), list(buffer.ends),
+                [t.line for t in buffer], buffer.literals)
+
+    def assertRelexed(self, source, offset, removed, inserted):
+        previous = Scanner(source).scan_buffer()
+        scanner = Scanner(source)
+        buffer = scanner.relex(previous, offset, removed, inserted)
+        edited = source[:offset] + inserted + source[offset + removed:]
+        self.assertEqual(scanner.source, edited)
+        self.assertEqual(buffer.source, edited)
+        self.assertEqual(self.layout(buffer), self.layout(Scanner(edited).scan_buffer()))
+        return buffer
+
+    def test_edit_inside_identifier(self):
+        buffer = self.assertRelexed(self.SOURCE, 9, 0, "_sum")
+        self.assertEqual(buffer.lexeme(1), "total_sum")
+
+    def test_append_to_token_end(self):
+        self.assertRelexed("a = b", 3, 0, "=")
+        self.assertRelexed("count + 1", 5, 0, "er")
+
+    def test_inserted_newline_shifts_tail_lines(self):
+        buffer = self.assertRelexed(self.SOURCE, 0, 0, "\n\n")
+        self.assertEqual(buffer[-1].line, 5)
+
+    def test_deletion_across_tokens(self):
+        self.assertRelexed(self.SOURCE, 4, 14, "")
+
+    def test_comment_opened_by_edit(self):
+        buffer = self.assertRelexed(self.SOURCE + " /* */", 10, 0, "/*")
+        self.assertEqual(len(buffer), 3)
+
+    def test_replace_everything(self):
+        self.assertRelexed(self.SOURCE, 0, len(self.SOURCE), "1 + 2")
+
+    def test_edit_in_empty_source(self):
+        self.assertRelexed("", 0, 0, "nil")
+
+    def test_edits_applied_in_place(self):
+        previous = Scanner(self.SOURCE).scan_buffer()
+        self.assertIs(Scanner(self.SOURCE).relex(previous, 9, 0, "_sum"), previous)
+
+    def test_successive_edits(self):
+        source = self.SOURCE * 3
+        buffer = Scanner(source).scan_buffer()
+        scanner = Scanner(source)
+        edits = [(9, 0, "_sum"), (60, 0, "\n\n"), (4, 3, ""), (30, 0, "1 + "),
+                 (len(source) - 5, 2, ""), (0, 0, "// note\n"), (45, 1, "")]
+        for offset, removed, inserted in edits:
+            source = source[:offset] + inserted + source[offset + removed:]
+            buffer = scanner.relex(buffer, offset, removed, inserted)
+            self.assertEqual([(t.type, t.lexeme, t.start, t.end, t.line) for t in buffer],
+                             [(t.type, t.lexeme, t.start, t.end, t.line) for t in Scanner(source).scan_buffer()])
+        self.assertEqual(self.layout(buffer), self.layout(Scanner(source).scan_buffer()))
+
+    def test_chained_edits_at_shifted_tokens(self):
+        # Each edit starts at a token that an earlier edit left with a pending shift.
+        for source, edits in [("count = 1;", [(0, 0, "\n"), (0, 2, "")]),
+                              ("1", [(0, 0, " "), (0, 1, "aa")]),
+                              (self.SOURCE, [(9, 0, "  "), (4, 0, "\n\n"), (6, 8, "x"), (0, 3, ""), (0, 0, "// c\n")])]:
+            with self.subTest(source=source):
+                buffer = Scanner(source).scan_buffer()
+                scanner = Scanner(source)
+                for offset, removed, inserted in edits:
+                    source = source[:offset] + inserted + source[offset + removed:]
+                    buffer = scanner.relex(buffer, offset, removed, inserted)
+                self.assertEqual(self.layout(buffer), self.layout(Scanner(source).scan_buffer()))
+
+    def test_lexical_error_in_edit(self):
+        previous = Scanner(self.SOURCE).scan_buffer()
+        with self.assertRaises(Exception) as context:
+            Scanner(self.SOURCE).relex(previous, 4, 0, '"')
+        self.assertIn("Unterminated string literal", str(context.exception))
+
+class ParallelScanTest(unittest.TestCase):
+    SOURCE = "\n".join([
+        'var a = "text with // and /* inside";',
+        '/* block comment',
+        '   spanning "lines" */ print a;',
+        'b = "escaped \\',
+        'newline";',
+        'c = 12.5 >= .5; // trailing',
+    ] * 20)
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def layout(self, buffer):
+        return (list(buffer.kinds), list(buffer.starts), list(buffer.ends),
+                [t.line for t in buffer], buffer.literals)
+
+    def test_matches_serial_scan(self):
+        expected = self.layout(Scanner(self.SOURCE).scan_buffer())
+        for workers in (2, 3, 7):
+            with self.subTest(workers=workers):
+                buffer = Scanner(self.SOURCE).scan_parallel(workers, executor=self.pool, min_chunk_size=1)
+                self.assertEqual(self.layout(buffer), expected)
+
+    def test_single_eof(self):
+        buffer = Scanner(self.SOURCE).scan_parallel(4, executor=self.pool, min_chunk_size=1)
+        self.assertEqual([t.type for t in buffer].count(TokenType.EOF), 1)
+        self.assertEqual(buffer[-1].line, self.SOURCE.count("\n") + 1)
+
+    def test_small_source_scanned_in_process(self):
+        buffer = Scanner("1 + 2").scan_parallel(4)
+        self.assertEqual(len(buffer), 4)
+
+    def test_error_reports_absolute_line(self):
+        source = self.SOURCE + "\n@"
+        with self.assertRaises(Exception) as expected:
+            Scanner(source).scan_buffer()
+        with self.assertRaises(Exception) as context:
+            Scanner(source).scan_parallel(3, executor=self.pool, min_chunk_size=1)
+        self.assertEqual(str(context.exception), str(expected.exception))
+
+class PositionTest(unittest.TestCase):
+    SOURCE = 'a = "x\\\ny"\n  /* c\n */ 12 @'
+
+    def test_tokens_carry_offsets(self):
+        tokens = Scanner("ab + 1.5").scan_tokens()
+        self.assertEqual([(t.start, t.end) for t in tokens], [(0, 2), (3, 4), (5, 8), (8, 8)])
+
+    def test_lines_and_columns_from_offsets(self):
+        for engine in Scanner.ENGINES:
+            with self.subTest(engine=engine):
+                tokens = Scanner("a\n  bc\n\n d", engine).scan_tokens()
+                self.assertEqual([(t.line, t.column) for t in tokens], [(1, 1), (2, 3), (4, 2), (4, 3)])
+
+    def test_escaped_newline_in_string_counts_as_a_line(self):
+        tokens = Scanner('"a\\\nb" c').scan_tokens()
+        self.assertEqual(tokens[1].line, 2)
+
+    def test_no_line_bookkeeping_while_scanning(self):
+        scanner = Scanner("a\nb\nc")
+        scanner.scan_tokens()
+        self.assertIsNone(scanner.line_index._newlines)
+
+    def test_error_lines(self):
+        cases = {
+            "a\n\n  @": "Lexical Error at line 3: Unexpected character: @",
+            'a\n"b\nc"': "Lexical Error at line 3: Unterminated string literal",
+            "a /* b\n\n": "Lexical Error: Unmatched block comment starting at line 3",
+        }
+        for source, message in cases.items():
+            for engine in Scanner.ENGINES:
+                with self.subTest(source=source, engine=engine):
+                    with self.assertRaises(Exception) as context:
+                        Scanner(source, engine).scan_tokens()
+                    self.assertEqual(str(context.exception), message)
+
+    def test_stream_offsets(self):
+        source = 'var s = "a\\\nb"; /* x\n */ é + 2'
+        expected = [(t.start, t.end, t.line) for t in Scanner(source).scan_tokens()]
+        for chunk_size in (1, 3, 64):
+            with self.subTest(chunk_size=chunk_size):
+                tokens = Scanner(io.StringIO(source)).iter_tokens(chunk_size=chunk_size)
+                self.assertEqual([(t.start, t.end, t.line) for t in tokens], expected)
+
+class DiagnosticsTest(unittest.TestCase):
+    SOURCE = 'a @ b\n"open\nc /* x\n'
+
+    def scan(self, source, engine="classic"):
+        scanner = Scanner(source, engine, errors="collect")
+        return scanner.scan_tokens(), scanner.diagnostics
+
+    def test_collects_every_error_in_one_pass(self):
+        tokens, diagnostics = self.scan(self.SOURCE)
+        self.assertEqual(diagnostics, [
+            Diagnostic("unexpected-character", 2, 1, "Unexpected character: @"),
+            Diagnostic("unterminated-string", 6, 2, "Unterminated string literal"),
+            Diagnostic("unmatched-comment", 14, 3, "Unmatched block comment"),
+        ])
+        self.assertEqual([(t.type, t.lexeme) for t in tokens], [
+            (TokenType.IDENTIFIER, "a"), (TokenType.ERROR, "@"), (TokenType.IDENTIFIER, "b"),
+            (TokenType.ERROR, '"open\n'), (TokenType.IDENTIFIER, "c"), (TokenType.ERROR, "/* x\n"),
+            (TokenType.EOF, ""),
+        ])
+        self.assertEqual(tokens[1].literal, "Unexpected character: @")
+
+    def test_all_paths_agree(self):
+        expected = self.scan(self.SOURCE)
+        layout = lambda tokens: [(t.type, t.lexeme, t.line, t.start) for t in tokens]
+        scanners = {
+            "regex": Scanner(self.SOURCE, "regex", errors="collect"),
+            "buffer": Scanner(self.SOURCE, errors="collect"),
+            "bytes": Scanner(self.SOURCE.encode(), errors="collect"),
+            "stream": Scanner(io.StringIO(self.SOURCE), errors="collect"),
+        }
+        for name, scanner in scanners.items():
+            with self.subTest(path=name):
+                tokens = scanner.scan_buffer() if name == "buffer" else scanner.scan_tokens()
+                self.assertEqual(layout(tokens), layout(expected[0]))
+                self.assertEqual(scanner.diagnostics, expected[1])
+
+    def test_clean_source_matches_raise_mode(self):
+        source = 'x = "s" + 1.5; // done'
+        tokens, diagnostics = self.scan(source)
+        self.assertEqual(diagnostics, [])
+        self.assertEqual([(t.type, t.lexeme, t.literal) for t in tokens],
+                         [(t.type, t.lexeme, t.literal) for t in Scanner(source).scan_tokens()])
+
+    def test_stream_in_small_chunks(self):
+        expected = self.scan(self.SOURCE)[1]
+        for chunk_size in (1, 2, 3):
+            with self.subTest(chunk_size=chunk_size):
+                scanner = Scanner(io.StringIO(self.SOURCE), errors="collect")
+                list(scanner.iter_tokens(chunk_size=chunk_size))
+                self.assertEqual(scanner.diagnostics, expected)
+
+    def test_non_ascii_bytes_offsets(self):
+        scanner = Scanner("é ²".encode(), errors="collect")
+        scanner.scan_buffer()
+        self.assertEqual(scanner.diagnostics, [Diagnostic("invalid-number", 3, 1, "Invalid number format: ²")])
+
+    def test_reset_clears_diagnostics(self):
+        scanner = Scanner("@", errors="collect")
+        scanner.scan_tokens()
+        scanner.reset("a")
+        scanner.scan_tokens()
+        self.assertEqual(scanner.diagnostics, [])
+
+    def test_unknown_error_handling(self):
+        with self.assertRaises(ValueError):
+            Scanner("", errors="ignore")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
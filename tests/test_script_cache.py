@@ -0,0 +1,163 @@
+# tests/test_script_cache.py
+
+import hashlib
+import io
+import marshal
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+import ast_wire
+import script_cache
+from flat_ast import BINARY
+from interpreter_token import TokenType
+from main import run_file
+
+SCRIPT = '1 + 2 * 3\n"a" + "b"; !nil\n(4 - 1) >= 3\n'
+
+class ScriptCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "script.lox")
+        self.write(SCRIPT)
+
+    def write(self, source):
+        with open(self.path, "w") as file:
+            file.write(source)
+
+    def load(self, **options):
+        with mock.patch.object(script_cache.Parser, "parse_many", autospec=True,
+                               side_effect=script_cache.Parser.parse_many) as parse_many:
+            result = script_cache.load_script(self.path, **options)
+        return result, parse_many.call_count
+
+    def test_cache_hit(self):
+        first, parsed = self.load()
+        self.assertEqual(parsed, 1)
+        self.assertTrue(os.path.exists(script_cache.cache_path(self.path)))
+        second, parsed = self.load()
+        self.assertEqual(parsed, 0)
+        self.assertEqual(second.errors, [])
+        self.assertEqual([ast_wire.dumps(tree) for tree in second.expressions],
+                         [ast_wire.dumps(tree) for tree in first.expressions])
+        self.assertEqual([tree.root for tree in second.expressions], [4, 2, 1, 5])
+
+    def test_cache_path(self):
+        path = script_cache.cache_path(self.path)
+        self.assertEqual(os.path.dirname(path), os.path.join(os.path.dirname(self.path), "__lxcache__"))
+        self.assertTrue(os.path.basename(path).startswith("script.lox."))
+
+    def test_changed_source_is_parsed_again(self):
+        self.load()
+        self.write(SCRIPT + "5 * 5\n")
+        result, parsed = self.load()
+        self.assertEqual(parsed, 1)
+        self.assertEqual(len(result.expressions), 5)
+        _, parsed = self.load()
+        self.assertEqual(parsed, 0)
+
+    def test_bad_cache_files_are_ignored(self):
+        self.load()
+        path = script_cache.cache_path(self.path)
+        with open(path, "rb") as file:
+            data = file.read()
+        header = len(script_cache.MAGIC) + 2 + 32
+        for bad in (b"", data[:header], data[:-5], b"XXX" + data[3:], data[:3] + b"\x63" + data[4:],
+                    data[:header] + b"\x00" * 20):
+            with self.subTest(bad=bad[:8]):
+                with open(path, "wb") as file:
+                    file.write(bad)
+                result, parsed = self.load()
+                self.assertEqual(parsed, 1)
+                self.assertEqual(len(result.expressions), 4)
+
+    def test_flipped_bytes_are_ignored(self):
+        self.load()
+        path = script_cache.cache_path(self.path)
+        with open(path, "rb") as file:
+            data = file.read()
+        # Some flips in the marshal data claim sizes too large to allocate.
+        for index in range(len(script_cache.MAGIC) + 2 + 32, len(data)):
+            damaged = bytearray(data)
+            damaged[index] ^= 1
+            with open(path, "wb") as file:
+                file.write(damaged)
+            result, _ = self.load()
+            self.assertEqual(len(result.expressions), 4)
+
+    def test_malformed_trees_are_ignored(self):
+        def drop_root(tree):
+            for values in (tree.kinds, tree.operators, tree.lefts, tree.rights):
+                values.pop()
+
+        def damage(name, index, value):
+            return lambda tree: getattr(tree, name).__setitem__(index, value)
+
+        # SCRIPT's first expression, 1 + 2 * 3, is nodes 1, 2, 3, *, + in post-order.
+        changes = {
+            "constant": damage("lefts", 0, 7),
+            "negative constant": damage("lefts", 0, -1),
+            "child": damage("rights", 4, 9),
+            "swapped children": damage("lefts", 4, 3),
+            "missing operand": damage("kinds", 0, BINARY),
+            "missing operator": damage("operators", 4, 0),
+            "unknown kind": damage("kinds", 4, 99),
+            "two roots": drop_root,
+        }
+        with open(self.path, "rb") as file:
+            digest = hashlib.sha256(file.read()).digest()
+        for name, change in changes.items():
+            with self.subTest(name):
+                result, _ = self.load()
+                change(result.expressions[0])
+                script_cache._write_cache(script_cache.cache_path(self.path), digest, result.expressions)
+                result, parsed = self.load()
+                self.assertEqual(parsed, 1)
+                self.assertEqual(run_file(self.path), [7, "ab", True, True])
+
+    def test_operators_stored_as_wire_codes(self):
+        self.write("-1 + 2")
+        self.load()
+        with open(script_cache.cache_path(self.path), "rb") as file:
+            data = file.read()
+        (_, operators, _, _, _), = marshal.loads(data[len(script_cache.MAGIC) + 2 + 32:])
+        codes = ast_wire.OPERATOR_CODES
+        self.assertEqual(operators, bytes([0, codes[TokenType.MINUS] + 1, 0, codes[TokenType.PLUS] + 1]))
+
+    def test_errors_are_not_cached(self):
+        self.write("1 +\n2")
+        result, parsed = self.load()
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(result.expressions[0], None)
+        self.assertFalse(os.path.exists(script_cache.cache_path(self.path)))
+
+    def test_without_cache(self):
+        result, parsed = self.load(use_cache=False)
+        self.assertEqual(len(result.expressions), 4)
+        self.assertFalse(os.path.exists(os.path.dirname(script_cache.cache_path(self.path))))
+
+    def test_unwritable_cache_directory(self):
+        with open(os.path.join(os.path.dirname(self.path), "__lxcache__"), "w"):
+            pass
+        result, parsed = self.load()
+        self.assertEqual(len(result.expressions), 4)
+        self.assertEqual(sorted(os.listdir(os.path.dirname(self.path))), ["__lxcache__", "script.lox"])
+
+    def test_run_file(self):
+        self.write(SCRIPT + '-"x"\n1 +\n')
+        for _ in range(2):
+            with redirect_stdout(io.StringIO()) as output:
+                values = run_file(self.path)
+            self.assertEqual(values, [7, "ab", True, True, None, None])
+            self.assertIn("Operand must be a number", output.getvalue())
+            self.assertIn("Expect expression", output.getvalue())
+        self.write(SCRIPT)
+        with redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(run_file(self.path), [7, "ab", True, True])
+            self.assertEqual(run_file(self.path), [7, "ab", True, True])
+        self.assertEqual(output.getvalue(), "")
+
+if __name__ == "__main__":
+    unittest.main()
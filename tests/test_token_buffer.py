@@ -0,0 +1,61 @@
+# tests/test_token_buffer.py
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+from scanner import Scanner
+from parser import Parser
+from interpreter import Interpreter
+from interpreter_token import TokenType
+from token_buffer import TokenBuffer
+
+class TokenBufferTest(unittest.TestCase):
+    SOURCE = 'var x = "a\\"b" + 12.5; // note\n/* block\n*/ print x >= .5;'
+
+    def test_matches_scan_tokens(self):
+        expected = [(t.type, t.lexeme, t.line, t.literal) for t in Scanner(self.SOURCE).scan_tokens()]
+        buffer = Scanner(self.SOURCE).scan_buffer()
+        self.assertIsInstance(buffer, TokenBuffer)
+        self.assertEqual([(t.type, t.lexeme, t.line, t.literal) for t in buffer], expected)
+
+    def test_struct_of_arrays_layout(self):
+        buffer = Scanner('x = "hi";').scan_buffer()
+        self.assertEqual(buffer.kinds.typecode, 'B')
+        self.assertEqual(buffer.starts.typecode, 'I')
+        self.assertEqual(buffer.ends.typecode, 'I')
+        self.assertEqual(list(buffer.starts), [0, 2, 4, 8, 9])
+        self.assertEqual(list(buffer.ends), [1, 3, 8, 9, 9])
+        self.assertEqual(buffer.literals, [None, None, "hi", None, None])
+
+    def test_accessors(self):
+        buffer = Scanner("a\n12").scan_buffer()
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.type(1), TokenType.NUMBER)
+        self.assertEqual(buffer.lexeme(1), "12")
+        self.assertEqual(buffer.line(1), 2)
+        self.assertEqual(buffer.column(1), 1)
+        self.assertEqual(buffer.literal(1), 12)
+        self.assertIsNone(buffer.literal(0))
+        self.assertEqual(buffer[-1].type, TokenType.EOF)
+        with self.assertRaises(IndexError):
+            buffer[3]
+
+    def test_view_repr_matches_token(self):
+        source = '"s" 1'
+        tokens = Scanner(source).scan_tokens()
+        buffer = Scanner(source).scan_buffer()
+        self.assertEqual([repr(t) for t in buffer], [repr(t) for t in tokens])
+
+    def test_parser_consumes_buffer(self):
+        buffer = Scanner("(1 + 2) * 3 >= 9 == !false").scan_buffer()
+        expression = Parser(buffer).parse()
+        self.assertEqual(Interpreter().interpret(expression), True)
+
+    def test_lexical_errors(self):
+        with self.assertRaises(Exception) as context:
+            Scanner("1 $ 2").scan_buffer()
+        self.assertIn("Unexpected character: $", str(context.exception))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# tests/test_token_stream.py
+
+import io
+import unittest
+from ast_1 import Binary, Grouping
+from interpreter import Interpreter
+from interpreter_token import TokenType
+from parser import Parser
+from scanner import Scanner
+from token_stream import TokenStream
+
+class TokenStreamTest(unittest.TestCase):
+    def test_reads_lazily(self):
+        pulled = []
+        def tokens():
+            for token in Scanner("1 + 2 * 3").scan_tokens():
+                pulled.append(token)
+                yield token
+        stream = TokenStream(tokens())
+        self.assertEqual(pulled, [])
+        self.assertEqual(stream[1].type, TokenType.PLUS)
+        self.assertEqual(len(pulled), 2)
+        self.assertEqual(stream[0].lexeme, "1")
+
+    def test_releases_old_tokens(self):
+        stream = TokenStream(Scanner("1 + 2 + 3 + 4").scan_tokens(), capacity=3)
+        self.assertEqual(len(stream._ring), 4)
+        self.assertEqual(stream[4].lexeme, "3")
+        self.assertEqual(stream.released, 1)
+        self.assertEqual(stream[1].lexeme, "+")
+        with self.assertRaises(IndexError):
+            stream[0]
+
+    def test_requires_eof(self):
+        stream = TokenStream(Scanner("1").scan_tokens()[:1])
+        with self.assertRaises(IndexError):
+            stream[1]
+
+class StreamingParserTest(unittest.TestCase):
+    SOURCE = "(1 + 2) * -3 == 4 / 5 != true"
+
+    def test_engines_parse_iterators(self):
+        expected = Parser(Scanner(self.SOURCE).scan_tokens()).parse()
+        for engine in Parser.ENGINES:
+            with self.subTest(engine=engine):
+                parser = Parser(Scanner(io.StringIO(self.SOURCE)).iter_tokens(chunk_size=4), engine)
+                self.assertIsInstance(parser.tokens, TokenStream)
+                expression = parser.parse()
+                self.assertIsInstance(expression, Binary)
+                self.assertIsInstance(expression.left.left.left, Grouping)
+                self.assertEqual(Interpreter().interpret(expression), Interpreter().interpret(expected))
+
+    def test_lists_are_not_wrapped(self):
+        tokens = Scanner("1").scan_tokens()
+        self.assertIs(Parser(tokens).tokens, tokens)
+
+    def test_large_input_holds_few_tokens(self):
+        count = 20_000
+        stream = Scanner(io.StringIO(" + ".join(["1"] * count))).iter_tokens()
+        parser = Parser(stream, "iterative")
+        tree = parser.parse_flat()
+        self.assertEqual(Interpreter().interpret_flat(tree), count)
+        self.assertEqual(parser.tokens.released, 2 * count - len(parser.tokens._ring))
+
+    def test_errors(self):
+        from contextlib import redirect_stdout
+        for engine in Parser.ENGINES:
+            with self.subTest(engine=engine):
+                with redirect_stdout(io.StringIO()):
+                    with self.assertRaisesRegex(Exception, "Expect expression after operator."):
+                        Parser(iter(Scanner("1 +").scan_tokens()), engine).parse()
+                    with self.assertRaisesRegex(Exception, "Expect expression."):
+                        Parser(iter(Scanner("").scan_tokens()), engine).parse()
+
+    def test_parse_many(self):
+        expressions, errors = Parser(Scanner(io.StringIO("1\n2 +\n3")).iter_tokens()).parse_many()
+        self.assertEqual(len(expressions), 3)
+        self.assertEqual([error.line for error in errors], [2])
+
+if __name__ == '__main__':
+    unittest.main()
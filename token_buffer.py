@@ -0,0 +1,210 @@
+# token_buffer.py
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+from interpreter_token import TOKEN_TYPES, TokenType
+from line_index import LineIndex
+
+_STRING = TokenType.STRING.value
+# Pending offset shifts are applied to the whole arrays once there are this many.
+_MAX_SHIFTS = 32
+
+class TokenBuffer:
+    """Compact struct-of-arrays token storage.
+
+    Token kinds live in an array('B'), start/end offsets in array('I'), and
+    NUMBER/STRING literal values in a side list aligned with them (None for
+    other tokens). Lexemes are sliced from the source only when asked for,
+    and lines are looked up from the start offsets through a LineIndex that
+    is built on first use.
+
+    The source may also be UTF-8 bytes (or an mmap/memoryview over them), in
+    which case offsets are byte offsets and lexemes are decoded on access.
+    String literals missing from the side list are then produced from their
+    lexeme by *decode_string*.
+
+    splice() moves the tokens after an edit lazily: their stored offsets are
+    left as they are and the move is recorded as a pending shift, which
+    start(), end() and the other per-token accessors add in. Reading the
+    starts or ends array applies all pending shifts first.
+    """
+
+    def __init__(self, source, decode_string=None):
+        self.source = source
+        self.decode_string = decode_string
+        self.kinds = array('B')
+        self._starts = array('I')
+        self._ends = array('I')
+        self.literals = []
+        self.line_index = LineIndex(source)
+        # Tokens from _shift_indexes[i] on (up to the next entry) are off by _shift_totals[i].
+        self._shift_indexes = []
+        self._shift_totals = []
+        # Parsers peek at the same token several times; hand out one view for it.
+        self._view = None
+
+    @property
+    def starts(self):
+        if self._shift_indexes:
+            self._apply_shifts()
+        return self._starts
+
+    @property
+    def ends(self):
+        if self._shift_indexes:
+            self._apply_shifts()
+        return self._ends
+
+    def append(self, type, start, end, literal=None):
+        self.kinds.append(type.value)
+        self.literals.append(literal)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def _shift(self, index):
+        position = bisect_right(self._shift_indexes, index)
+        return self._shift_totals[position - 1] if position else 0
+
+    def _apply_shifts(self):
+        bounds = self._shift_indexes + [len(self.kinds)]
+        for low, high, total in zip(bounds, bounds[1:], self._shift_totals):
+            for values in (self._starts, self._ends):
+                values[low:high] = array('I', map(total.__add__, values[low:high]))
+        self._shift_indexes = []
+        self._shift_totals = []
+
+    def splice(self, first, stop, part, delta, source):
+        """Replaces tokens first..stop-1 with those of the TokenBuffer *part*.
+
+        *source* is the edited text; the tokens from *stop* on are moved by
+        *delta* characters without touching their stored offsets.
+        """
+        indexes, totals = self._shift_indexes, self._shift_totals
+        # Shifts from *first* on belong to replaced or moved tokens; the new
+        # tokens take the shift of the token before them.
+        kept = bisect_left(indexes, first)
+        base = totals[kept - 1] if kept else 0
+        moved = bisect_right(indexes, stop)
+        tail_total = (totals[moved - 1] if moved else 0) + delta
+        tail_index = first + len(part)
+        growth = tail_index - stop
+        shift_indexes = indexes[:kept]
+        shift_totals = totals[:kept]
+        if tail_total != (shift_totals[-1] if shift_totals else 0):
+            shift_indexes.append(tail_index)
+            shift_totals.append(tail_total)
+        shift_indexes += [index + growth for index in indexes[moved:]]
+        shift_totals += [total + delta for total in totals[moved:]]
+
+        starts, ends = part.starts, part.ends
+        if base:
+            starts = array('I', [start - base for start in starts])
+            ends = array('I', [end - base for end in ends])
+        self.kinds[first:stop] = part.kinds
+        self._starts[first:stop] = starts
+        self._ends[first:stop] = ends
+        self.literals[first:stop] = part.literals
+        self._shift_indexes = shift_indexes
+        self._shift_totals = shift_totals
+        self.source = source
+        self.line_index = LineIndex(source)
+        self._view = None
+        if len(shift_indexes) > _MAX_SHIFTS:
+            self._apply_shifts()
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        view = self._view
+        if view is not None and view.index == index:
+            return view
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("token index out of range")
+        view = self._view = TokenView(self, index)
+        return view
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield TokenView(self, index)
+
+    def type(self, index):
+        return TOKEN_TYPES[self.kinds[index]]
+
+    def start(self, index):
+        start = self._starts[index]
+        if self._shift_indexes:
+            start += self._shift(index)
+        return start
+
+    def end(self, index):
+        end = self._ends[index]
+        if self._shift_indexes:
+            end += self._shift(index)
+        return end
+
+    def lexeme(self, index):
+        start, end = self._starts[index], self._ends[index]
+        if self._shift_indexes:
+            shift = self._shift(index)
+            start += shift
+            end += shift
+        lexeme = self.source[start:end]
+        if not isinstance(lexeme, str):
+            lexeme = str(lexeme, 'utf-8')
+        return lexeme
+
+    def line(self, index):
+        return self.line_index.line(self.start(index))
+
+    def column(self, index):
+        return self.line_index.column(self.start(index))
+
+    def literal(self, index):
+        literal = self.literals[index]
+        if literal is None and self.decode_string is not None and self.kinds[index] == _STRING:
+            literal = self.decode_string(self.lexeme(index))
+        return literal
+
+class TokenView:
+    """Token-like view of one entry in a TokenBuffer, for existing callers."""
+
+    __slots__ = ("buffer", "index")
+
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def type(self):
+        return TOKEN_TYPES[self.buffer.kinds[self.index]]
+
+    @property
+    def lexeme(self):
+        return self.buffer.lexeme(self.index)
+
+    @property
+    def start(self):
+        return self.buffer.start(self.index)
+
+    @property
+    def end(self):
+        return self.buffer.end(self.index)
+
+    @property
+    def line(self):
+        return self.buffer.line(self.index)
+
+    @property
+    def column(self):
+        return self.buffer.column(self.index)
+
+    @property
+    def literal(self):
+        return self.buffer.literal(self.index)
+
+    def __repr__(self):
+        return f'{self.type} {self.lexeme} {self.literal}'
@@ -0,0 +1,43 @@
+# token_stream.py
+
+class TokenStream:
+    """Indexable window over a token iterator, for parsers.
+
+    Tokens are pulled from *tokens* only as the parser reaches them and
+    kept in a ring buffer of *capacity* slots (rounded up to a power of
+    two), so a token is released once *capacity* newer tokens have been
+    read. The parsers look at most one token behind and one ahead of the
+    one they are on, so the default capacity is ample; reaching back past
+    the window raises IndexError. The iterator must end with an EOF token,
+    as Scanner.iter_tokens() does.
+    """
+
+    def __init__(self, tokens, capacity=4):
+        size = 1
+        while size < capacity:
+            size *= 2
+        self._tokens = iter(tokens)
+        self._ring = [None] * size
+        self._mask = size - 1
+        self._read = 0  # Number of tokens pulled from the iterator so far
+
+    def __getitem__(self, index):
+        read = self._read
+        if index < read:
+            if index < read - len(self._ring) or index < 0:
+                raise IndexError(f"token {index} has been released")
+            return self._ring[index & self._mask]
+        ring, mask = self._ring, self._mask
+        for token in self._tokens:
+            ring[read & mask] = token
+            read += 1
+            if read > index:
+                self._read = read
+                return token
+        self._read = read
+        raise IndexError("token stream ended without EOF")
+
+    @property
+    def released(self):
+        """Number of tokens that have dropped out of the window."""
+        return max(self._read - len(self._ring), 0)